@@ -3,14 +3,17 @@ from streamlit.components.v1 import html as scv1html
 from streamlit_float import *
 import datetime
 import h3
-from app.chatbot.chatbot import DisasterAgent
+from app.chatbot.async_agent import SyncDisasterAgent
 from app.chatbot.tools.ddg_search import get_search, get_news_search
 from app.chatbot.tools.nws_alerts import get_nws_alerts
 from app.chatbot.tools.openfema import get_fema_disaster_declarations, get_fema_assistance_data
 from app.chatbot.tools.nasa_eonet import get_nasa_eonet_events
+from app.chatbot.tools.county_need import get_county_need_index
 from app.prediction.scanner import DisasterScanner
-from app.prediction.geospatial import get_h3_location_bundles
-from app.common import load_scan_cache, save_scan_cache, create_pydeck_map, sign_out
+from app.prediction.scan_planner import ScanPlanRunner, build_scan_queries, run_scan_query, describe_scan_query
+from app.prediction.scan_worker import get_worker_status
+from app.prediction.nws_ingest import get_nws_cell_results, merge_nws_results
+from app.common import load_scan_cache, save_scan_cache, dedupe_scan_results, create_pydeck_map, sign_out
 import app.initialize as session_init
 from st_supabase_connection import SupabaseConnection
 import json
@@ -26,46 +29,33 @@ def heatmap():
     with st.sidebar:
         pass
 
-    # Load cached scan data from disk on first run
-    if not st.session_state.scan_results and not st.session_state.last_scan_time:
-        cached_data = load_scan_cache()
+    # Load cached scan data from disk on first run, and again whenever the
+    # scan worker has published a newer scan than the one in this session
+    cached_data = load_scan_cache()
+    cached_time = cached_data["last_scan_time"]
+    if (not st.session_state.scan_results and not st.session_state.last_scan_time) or \
+            (cached_time and (not st.session_state.last_scan_time or cached_time > st.session_state.last_scan_time)):
         st.session_state.scan_results = cached_data["scan_results"]
-        st.session_state.last_scan_time = cached_data["last_scan_time"]
+        st.session_state.last_scan_time = cached_time
 
         # If we loaded cached data, mark scan as complete
         if st.session_state.scan_results:
             st.session_state.scan_index = len(
                 st.session_state.get("scan_queries", []))
 
-    # Initialize scan_queries with cell-based queries if empty
-    if not st.session_state.scan_queries:
-        # Define US Bounding Box (Roughly)
-        min_lat, max_lat = 24, 50
-        min_lon, max_lon = -125, -66
-        us_outline = [(min_lat, min_lon), (max_lat, min_lon),
-                      (max_lat, max_lon), (min_lat, max_lon)]
-        polygon = h3.LatLngPoly(us_outline)
-        cells = h3.polygon_to_cells(polygon, 2)
-
-        queries = []
-        # Add initial global query
-        queries.append(
-            {"type": "general", "query": "active natural disasters US major emergency"})
-
-        # Resolve location bundles for all cells to enable targeted news searches
-        with st.spinner("Resolving initial location metadata..."):
-            bundles = get_h3_location_bundles(cells)
-            for bundle in bundles:
-                queries.append({"type": "cell", "bundle": bundle})
+    # NWS warnings change within minutes, so they are refreshed on every load
+    # instead of waiting for the next scan. The render never waits on the NWS API:
+    # it uses the last snapshot and a stale one is reloaded in the background
+    st.session_state.scan_results = merge_nws_results(st.session_state.scan_results, get_nws_cell_results(wait=False))
 
-        st.session_state.scan_queries = queries
+    # A separate scan worker process (app/prediction/scan_worker.py) owns the scan while it runs
+    worker_status = get_worker_status()
 
     st.title("Disaster Heatmap")
 
-    # Initial fetch for NASA events (if not already in session state)
-    if "nasa_events" not in st.session_state:
-        from app.common import fetch_nasa_eonet_events_for_map
-        st.session_state.nasa_events = fetch_nasa_eonet_events_for_map()
+    # NASA events come from the shared EONET store, which refetches at most every 15 minutes
+    from app.common import fetch_nasa_eonet_events_for_map
+    st.session_state.nasa_events = fetch_nasa_eonet_events_for_map()
 
     # Containers for persistent UI
     scan_status_container = st.empty()
@@ -88,9 +78,23 @@ def heatmap():
                 next_scan = 30 - minutes_ago
                 st.caption(f"Next scan in ~{next_scan} minutes")
 
-    # Automatic Background Scan (only if cache is invalid)
-    if not cache_valid and st.session_state.scan_index < len(st.session_state.scan_queries):
+    if worker_status and not cache_valid:
+        with st.sidebar:
+            st.info("Scan worker is updating the heatmap")
+            st.progress(worker_status["index"] / max(1, worker_status["total"]))
+            st.caption("The map refreshes with the new scan once the worker publishes it.")
+
+    # Initialize scan_queries with plan-based queries if empty (only needed for in-page scans)
+    if not cache_valid and not worker_status and not st.session_state.scan_queries:
+        with st.spinner("Resolving initial location metadata..."):
+            st.session_state.scan_queries = build_scan_queries()
+
+    # Automatic Background Scan (only if cache is invalid and no worker is scanning)
+    if not cache_valid and not worker_status and st.session_state.scan_index < len(st.session_state.scan_queries):
         scanner = DisasterScanner()
+        # One national FEMA fetch replaces the per-cell county/state queries
+        scanner.prefetch_fema(days=30)
+        plan_runner = ScanPlanRunner(scanner)
 
         with st.sidebar:
             st.subheader("Background Scanning...")
@@ -108,17 +112,9 @@ def heatmap():
             q_item = st.session_state.scan_queries[i]
 
             # Update status
-            if q_item['type'] == 'general':
-                status_text.text(f"Global: {q_item['query']}")
-                raw_news = get_news_search(q_item['query'])
-                texts = [line.strip()
-                         for line in raw_news.split("\n\n") if line.strip()]
-                st.session_state.scan_results.extend(scanner.scan_texts(texts))
-            else:
-                status_text.text(f"Cell: {q_item['bundle']['h3']}")
-                cell_res = scanner.scan_bundle_news(q_item['bundle'])
-                if cell_res['severity'] >= 0:
-                    st.session_state.scan_results.append(cell_res)
+            status_text.text(describe_scan_query(q_item))
+            st.session_state.scan_results.extend(
+                run_scan_query(q_item, scanner, plan_runner))
 
             # Update state and progress
             st.session_state.scan_index = i + 1
@@ -126,11 +122,8 @@ def heatmap():
             # Update UI every 3 items to reduce lag (throttling)
             if i % 3 == 0 or (i + 1) == len(st.session_state.scan_queries):
                 # Deduplicate results
-                unique_res = {}
-                for r in st.session_state.scan_results:
-                    key = r.get('cell') or r.get('text')
-                    unique_res[key] = r
-                st.session_state.scan_results = list(unique_res.values())
+                st.session_state.scan_results = dedupe_scan_results(
+                    st.session_state.scan_results)
 
                 # Update map and progress bar live
                 map_container.pydeck_chart(create_pydeck_map())
@@ -138,6 +131,8 @@ def heatmap():
                     (i + 1) / len(st.session_state.scan_queries))
 
         status_text.success("Initial Scan Complete")
+        with st.sidebar:
+            st.caption(plan_runner.summary())
         st.session_state.last_scan_time = datetime.datetime.now()
         save_scan_cache(st.session_state.scan_results,
                         st.session_state.last_scan_time)
@@ -175,7 +170,7 @@ def chatbot_widget():
 
                 # Initialize agent if needed
                 if st.session_state.global_agent is None:
-                    st.session_state.global_agent = DisasterAgent(
+                    st.session_state.global_agent = SyncDisasterAgent(
                         model_id=st.session_state.hf_model_id,
                         api_token=st.session_state.hf_api_key,
                         tools={
@@ -184,7 +179,8 @@ def chatbot_widget():
                             "get_nws_alerts": get_nws_alerts,
                             "get_fema_disaster_declarations": get_fema_disaster_declarations,
                             "get_fema_assistance_data": get_fema_assistance_data,
-                            "get_nasa_eonet_events": get_nasa_eonet_events
+                            "get_nasa_eonet_events": get_nasa_eonet_events,
+                            "get_county_need_index": get_county_need_index
                         }
                     )
 
@@ -0,0 +1,315 @@
+"""
+Async variant of DisasterAgent, so one event loop can serve many conversations.
+
+AsyncDisasterAgent has the same get_response / get_response_stream semantics
+as DisasterAgent, but its model calls go through AsyncOpenAI and its tools run
+as tasks on the event loop. A tool registered as a plain function is replaced
+by its "<name>_async" sibling from the same module when there is one (e.g.
+get_search -> get_search_async); other blocking tools run in a worker thread
+through app.transport.run_in_thread. Side-effecting tools (SERIAL_TOOLS) share
+DisasterAgent's single-worker pool, so they never run concurrently with each other.
+
+SyncDisasterAgent wraps it for Streamlit pages: every agent in the process
+shares one background event loop, and the page thread only waits for results.
+"""
+import asyncio
+import contextvars
+import inspect
+import sys
+import threading
+import time
+
+from app.resilience import deadline_at
+from app.transport import run_in_thread
+from app.chatbot.llm_client import get_async_llm_client
+from app.chatbot.chatbot import (
+    DisasterAgent, CHAT_TURN_BUDGET_SECONDS, NOVITA_BASE_URL, SERIAL_TOOLS, _serial_tool_pool,
+)
+from app.chatbot.tool_call_stream import ToolCallAccumulator
+
+
+def get_async_tool(func):
+    """
+    Returns the coroutine function to call for a tool: the tool itself if it is
+    async, its "<name>_async" sibling if it has one, else None.
+    """
+    if inspect.iscoroutinefunction(func):
+        return func
+    module = sys.modules.get(getattr(func, "__module__", None))
+    variant = getattr(module, f"{getattr(func, '__name__', '')}_async", None)
+    return variant if inspect.iscoroutinefunction(variant) else None
+
+
+class AsyncDisasterAgent(DisasterAgent):
+    """
+    DisasterAgent whose get_response is a coroutine and get_response_stream an async generator.
+    """
+    def _create_client(self, token):
+        # The pooled client is borrowed per event loop when it is used (see the client property)
+        self._token = token
+        return None
+
+    @property
+    def client(self):
+        if self._client is not None or not getattr(self, "_token", None):
+            return self._client
+        return get_async_llm_client(NOVITA_BASE_URL, self._token)
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    async def get_response(self, user_input, history=None, return_raw=False, tools=None):
+        """
+        Generate a response from the chatbot.
+
+        Args:
+            user_input (str): The user's message.
+            history (list): List of previous messages (optional, for context).
+            return_raw (bool): If True, return a dict with {"text": ..., "visuals": ...}.
+                               If False, return only the text str.
+            tools (list): Names of the tools to offer for this request (default: all of self.tools).
+
+        Returns:
+            str|dict: The chatbot's response.
+        """
+        if not self.client:
+            return "Error: API Token is missing. Please provide a Novita API Token."
+
+        messages = self._build_messages(user_input, history)
+        tool_options = self._tool_options(tools)
+        offered = self._offered_tools(tool_options)
+
+        try:
+            collected_visuals = []
+            max_iterations = 5
+            turn_ends = time.monotonic() + CHAT_TURN_BUDGET_SECONDS
+
+            for iteration in range(max_iterations):
+                completion = await self.client.chat.completions.create(
+                    model=self.model_id,
+                    messages=messages,
+                    max_tokens=2000,
+                    timeout=self._llm_timeout(turn_ends),
+                    **tool_options,
+                )
+
+                response_message = completion.choices[0].message
+                if not response_message.tool_calls:
+                    break
+
+                messages.append(response_message)
+
+                # Run every tool call of this message concurrently, results keep the call order
+                results = await asyncio.gather(*(
+                    self._execute_tool_async(tool_call.function.name, tool_call.function.arguments, turn_ends, offered)
+                    for tool_call in response_message.tool_calls
+                ))
+                for tool_call, (tool_content, visual) in zip(response_message.tool_calls, results):
+                    if visual:
+                        collected_visuals.append(visual)
+                    messages.append({
+                        "tool_call_id": tool_call.id,
+                        "role": "tool",
+                        "name": tool_call.function.name,
+                        "content": tool_content,
+                    })
+
+            final_text = self._clean_response(response_message.content)
+            if return_raw:
+                return {"text": final_text, "visuals": collected_visuals}
+            return final_text
+
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            return f"Error connecting to chatbot: {str(e)}"
+
+    async def get_response_stream(self, user_input, history=None, return_raw=False, tools=None):
+        """
+        Async generator that streams the response from the chatbot.
+
+        Args:
+            user_input (str): The user's message.
+            history (list): List of previous messages (optional, for context).
+            return_raw (bool): If True, yields dicts with {"type": "text"|"visual"|"status", "data": ...}.
+                               If False, yields only the text content strings.
+            tools (list): Names of the tools to offer for this request (default: all of self.tools).
+
+        Yields:
+            str|dict: Chunks of the response or structured event data.
+        """
+        if not self.client:
+            msg = "Error: API Token is missing. Please provide a Novita API Token."
+            yield {"type": "text", "data": msg} if return_raw else msg
+            return
+
+        messages = self._build_messages(user_input, history)
+        tool_options = self._tool_options(tools)
+        offered = self._offered_tools(tool_options)
+        tasks = {}
+
+        try:
+            max_iterations = 5
+            turn_ends = time.monotonic() + CHAT_TURN_BUDGET_SECONDS
+
+            for iteration in range(max_iterations):
+                stream = await self.client.chat.completions.create(
+                    model=self.model_id,
+                    messages=messages,
+                    max_tokens=2000,
+                    stream=True,
+                    timeout=self._llm_timeout(turn_ends),
+                    **tool_options,
+                )
+
+                # Tool calls start as soon as their arguments are complete
+                tool_calls = ToolCallAccumulator()
+                tasks = {}
+                content_buffer = ""
+
+                async for chunk in stream:
+                    if not chunk.choices: continue
+                    delta = chunk.choices[0].delta
+
+                    if delta.content:
+                        content_buffer += delta.content
+                        yield {"type": "text", "data": delta.content} if return_raw else delta.content
+
+                    if delta.tool_calls:
+                        for tool_delta in delta.tool_calls:
+                            for tool_call in tool_calls.add(tool_delta):
+                                tasks[self._start_tool_task(tool_call, turn_ends, offered)] = tool_call
+                                if return_raw:
+                                    yield {"type": "status", "data": f"Using tool: {tool_call['function']['name']}..."}
+
+                for tool_call in tool_calls.finish():
+                    tasks[self._start_tool_task(tool_call, turn_ends, offered)] = tool_call
+                    if return_raw:
+                        yield {"type": "status", "data": f"Using tool: {tool_call['function']['name']}..."}
+
+                if not tasks:
+                    break
+
+                messages.append({
+                    "role": "assistant",
+                    "content": content_buffer if content_buffer else None,
+                    "tool_calls": list(tasks.values())
+                })
+
+                # Report each tool as it finishes
+                pending = set(tasks)
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        tool_content, visual = task.result()
+                        if return_raw:
+                            yield {"type": "status", "data": f"Finished tool: {tasks[task]['function']['name']}"}
+                            if visual:
+                                yield {"type": "visual", "data": visual}
+
+                # Results go back in the same order as the tool_calls above
+                for task, tool_call in tasks.items():
+                    messages.append({
+                        "tool_call_id": tool_call["id"],
+                        "role": "tool",
+                        "name": tool_call["function"]["name"],
+                        "content": task.result()[0],
+                    })
+
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            err = f"Error connecting to chatbot: {str(e)}"
+            yield {"type": "text", "data": err} if return_raw else err
+        finally:
+            # The consumer may stop early (or the stream fail) while tools are still running
+            for task in tasks:
+                task.cancel()
+
+    def _start_tool_task(self, tool_call, turn_ends, offered):
+        return asyncio.create_task(
+            self._execute_tool_async(tool_call["function"]["name"], tool_call["function"]["arguments"], turn_ends, offered)
+        )
+
+    async def _execute_tool_async(self, function_name, raw_args, turn_ends, offered):
+        """
+        Runs one tool call on the event loop (or in a worker thread for blocking tools).
+
+        Returns:
+            tuple: (content for the tool message, visual or None)
+        """
+        function_args, error = self._parse_tool_args(function_name, raw_args, offered)
+        if error:
+            return error, None
+
+        print(f"🤖 AI calling tool: {function_name} with args: {function_args}")
+        tool = self.tools[function_name]
+        async_tool = get_async_tool(tool)
+        try:
+            # Tools get whatever is left of the turn's budget as their timeout
+            with deadline_at(turn_ends):
+                if function_name in SERIAL_TOOLS:
+                    ctx = contextvars.copy_context()
+                    tool_result = await asyncio.wrap_future(_serial_tool_pool.submit(ctx.run, tool, **function_args))
+                elif async_tool:
+                    tool_result = await async_tool(**function_args)
+                else:
+                    tool_result = await run_in_thread(tool, **function_args)
+            print(f"✅ Tool {function_name} returned data.")
+        except Exception as tool_err:
+            tool_result = f"Error executing tool: {str(tool_err)}"
+            print(f"❌ Tool {function_name} error: {tool_err}")
+        return self._tool_output(function_name, tool_result, function_args)
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_agent_loop():
+    """
+    Returns the process-wide event loop the sync adapters run agents on, starting it on first use.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="agent-loop", daemon=True).start()
+        return _loop
+
+
+def _run(coro):
+    return asyncio.run_coroutine_threadsafe(coro, get_agent_loop()).result()
+
+
+class SyncDisasterAgent:
+    """
+    Blocking facade over AsyncDisasterAgent with DisasterAgent's interface, for Streamlit pages.
+    """
+    def __init__(self, model_id="deepseek/deepseek-v3-turbo", api_token=None, tools=None):
+        self.agent = AsyncDisasterAgent(model_id=model_id, api_token=api_token, tools=tools)
+
+    @property
+    def tools(self):
+        return self.agent.tools
+
+    def get_response(self, user_input, history=None, return_raw=False, tools=None):
+        """
+        Same as DisasterAgent.get_response; the work runs on the shared agent loop.
+        """
+        return _run(self.agent.get_response(user_input, history=history, return_raw=return_raw, tools=tools))
+
+    def get_response_stream(self, user_input, history=None, return_raw=False, tools=None):
+        """
+        Same as DisasterAgent.get_response_stream; chunks are produced on the shared agent loop.
+        """
+        stream = self.agent.get_response_stream(user_input, history=history, return_raw=return_raw, tools=tools)
+        try:
+            while True:
+                try:
+                    yield _run(stream.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            _run(stream.aclose())
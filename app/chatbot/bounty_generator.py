@@ -2,6 +2,7 @@ import json
 import os
 import datetime
 from .chatbot import DisasterAgent
+from app.prediction.need_index import get_county_need
 
 class DisasterBountyGenerator:
     def __init__(self, api_token=None):
@@ -23,7 +24,7 @@ CONTEXT:
 User Location: {county_name} (FIPS: {fips_code})
 Target State: {state_code}
 Current Date: {datetime.datetime.now().strftime("%Y-%m-%d")}
-
+{self._need_context(fips_code)}
 TASK:
 1. You MUST first use `get_fema_disaster_declarations` for state='{state_code}'.
 2. You MUST then use `get_news_search` or `get_search` to find news about current disasters, executive orders, or urgent relief needs in {state_code}.
@@ -58,20 +59,24 @@ Do NOT wrap in ```json or ``` tags. Just the pure JSON array starting with [ and
         from .tools.ddg_search import get_news_search, get_search
         from .tools.nws_alerts import get_nws_alerts
         from .tools.openfema import get_fema_disaster_declarations
+        from .tools.county_need import get_county_need_index
         
-        self.agent.tools.update({
+        bounty_tools = {
             "get_news_search": get_news_search,
             "get_search": get_search,
             "get_nws_alerts": get_nws_alerts,
-            "get_fema_disaster_declarations": get_fema_disaster_declarations
-        })
+            "get_fema_disaster_declarations": get_fema_disaster_declarations,
+            "get_county_need_index": get_county_need_index
+        }
+        self.agent.tools.update(bounty_tools)
         
         
         print(f"\n=== AI Bounty Generator Debug ===")
         print(f"Agent client initialized: {self.agent.client is not None}")
         
         try:
-            response = self.agent.get_response(prompt)
+            # Only the tools the task needs, not the RAG knowledge base
+            response = self.agent.get_response(prompt, tools=list(bounty_tools))
         except Exception as e:
             print(f"❌ Error calling get_response: {e}")
             import traceback
@@ -143,6 +148,17 @@ Do NOT wrap in ```json or ``` tags. Just the pure JSON array starting with [ and
             print(f"=== End Debug ===")
             return []
 
+    def _need_context(self, fips_code):
+        """
+        One prompt line with the county's FEMA need index, or "" if the county isn't in the index.
+        """
+        row = get_county_need(fips_code)
+        if not row:
+            return ""
+        return (f"County Need Index: {row['need_index']}/10 (${row['approved_dollars']:,.0f} FEMA housing assistance "
+                f"approved for {row['registrations']:,} registrations, latest disaster declared {row['last_declaration']}). "
+                f"Use it to weigh urgency.\n")
+
     def repair_json_fragment(self, json_str):
         """
         Attempts to repair a malformed JSON string by:
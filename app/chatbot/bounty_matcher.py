@@ -40,7 +40,8 @@ class DisasterBountyMatcher:
         print(f"Number of bounties to match: {len(bounties)}")
         
         try:
-            response = self.agent.get_response(prompt)
+            # Matching only needs the bounties in the prompt, so no tool schemas are sent
+            response = self.agent.get_response(prompt, tools=[])
         except Exception as e:
             print(f"❌ Error calling get_response: {e}")
             import traceback
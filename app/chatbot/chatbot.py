@@ -1,8 +1,29 @@
 import os
-from openai import OpenAI
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from app.replay import is_replaying
+from app.chatbot.llm_client import get_llm_client
+from app.resilience import deadline_at, budget_timeout
+from app.chatbot.compaction import ToolOutputCompactor
+from app.chatbot.tool_call_stream import ToolCallAccumulator
+from app.chatbot.tool_registry import get_tool_schemas
 import json
 from datetime import date
 
+# Overall time budget for one chat turn (all model calls and tool calls together)
+CHAT_TURN_BUDGET_SECONDS = 90
+LLM_TIMEOUT = 60
+# Tool calls from one model message run concurrently; the pool is shared by all sessions
+TOOL_WORKERS = int(os.environ.get("CHAT_TOOL_WORKERS", 8))
+NOVITA_BASE_URL = "https://api.novita.ai/v3/openai"
+
+# Tools with side effects; they run one at a time, in the order the model asked for them
+SERIAL_TOOLS = {"post_disaster_alert"}
+
+_tool_pool = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="tool")
+_serial_tool_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="serial-tool")
+
 class DisasterAgent:
     def __init__(self, model_id="deepseek/deepseek-v3-turbo", api_token=None, tools=None):
         """
@@ -25,20 +46,25 @@ class DisasterAgent:
                 self.tools["get_rag_context"] = query_vector_store
             except ImportError:
                 print("Warning: Could not import rag_utils. RAG tool will not be available.")
+
+        # Large tool outputs are trimmed to a token budget; the model can fetch what was left out
+        self.compactor = ToolOutputCompactor()
+        self.tools["get_dropped_tool_output"] = self.compactor.get_dropped
         
         # Use provided token or fall back to environment variable
         token = api_token # or os.environ.get("HF_TOKEN") or os.environ.get("HUGGINGFACEHUB_API_TOKEN")
+        if not token and is_replaying():
+            # Replayed sessions never reach Novita, so no real token is needed
+            token = "replay"
         
-        if not token:
-            # We can't initialize the client properly without a token for this endpoint
-            self.client = None
-        else:
-            self.client = OpenAI(
-                base_url="https://api.novita.ai/v3/openai",
-                api_key=token,
-            )
+        # We can't initialize the client properly without a token for this endpoint
+        self.client = self._create_client(token) if token else None
 
-    def get_response(self, user_input, history=None, return_raw=False):
+    def _create_client(self, token):
+        # Borrowed from the process-wide pool, so connections are reused across agents and sessions
+        return get_llm_client(NOVITA_BASE_URL, token)
+
+    def get_response(self, user_input, history=None, return_raw=False, tools=None):
         """
         Generate a response from the chatbot.
         
@@ -48,6 +74,8 @@ class DisasterAgent:
                             Format: [{"role": "user", "content": "..."}, {"role": "assistant", "content": "..."}]
             return_raw (bool): If True, return a dict with {"text": ..., "visuals": ...}.
                                If False, return only the text str.
+            tools (list): Names of the tools to offer for this request (default: all of self.tools).
+                          An empty list sends no tools.
         
         Returns:
             str|dict: The chatbot's response.
@@ -55,209 +83,14 @@ class DisasterAgent:
         if not self.client:
             return "Error: API Token is missing. Please provide a Novita API Token."
 
-        # Construct messages list
-        messages = []
-        
-        # System prompt
-        system_prompt = (
-            "You are a helpful assistant that helps identify areas of most need during natural disaster events. "
-            "You are an expert in disaster coordination, volunteering, and donation logistics. "
-            "IMPORTANT: Always search for up-to-date data using the provided tools (RAG Knowledge Base, OpenFEMA, DuckDuckGo Search, NWS Alerts) "
-            "before making claims about specific community needs, disaster status, or preparedness protocols. "
-            "Use the 'get_rag_context' tool specifically for 2025-2026 preparedness guides, emergency protocols, and general disaster trends. "
-            "If you do not have data from a tool for a specific inquiry about a location's needs or a protocol, "
-            "clearly state that you don't have that information instead of speculating or fabricating needs. "
-            "Keep answers concise, structured, and helpful."
-            f"The year is {date.today().year}."
-        )
-        messages.append({"role": "system", "content": system_prompt})
-        
-        # History
-        if history:
-            # Ensure history format matches OpenAI expectations (role/content)
-            messages.extend(history)
-        
-        # Current user input
-        messages.append({"role": "user", "content": user_input})
-        
-        # Define tools schema
-        tools_schema = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "post_disaster_alert",
-                    "description": "Post a verified disaster alert to the public Bounty Board for volunteers to see.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "location": {
-                                "type": "string",
-                                "description": "Location of the event (e.g., 'Miami, FL')."
-                            },
-                            "summary": {
-                                "type": "string",
-                                "description": "Brief summary of the need or threat."
-                            },
-                            "severity": {
-                                "type": "integer",
-                                "description": "Severity level from 1 to 10."
-                            },
-                            "disaster_type": {
-                                "type": "string",
-                                "description": "Type: 'Flood', 'Hurricane', 'Fire', 'Earthquake', etc."
-                            }
-                        },
-                        "required": ["location", "summary", "severity"] 
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_search",
-                    "description": "General web search using DuckDuckGo.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "The search query."
-                            }
-                        },
-                        "required": ["query"] 
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_news_search",
-                    "description": "Search DuckDuckGo News for recent news and information.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "The search query (e.g., 'Nashville flood news')."
-                            }
-                        },
-                        "required": ["query"] 
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_nws_alerts",
-                    "description": "Get active weather alerts from the National Weather Service for a specific latitude and longitude.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "lat": {
-                                "type": "number",
-                                "description": "Latitude of the location."
-                            },
-                            "lon": {
-                                "type": "number",
-                                "description": "Longitude of the location."
-                            }
-                        },
-                        "required": ["lat", "lon"] 
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_rag_context",
-                    "description": "Get up-to-date (2025-2026) information on natural disaster preparedness, emergency protocols, and disaster trends from the knowledge base.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "The specific preparedness topic or disaster trend to search for."
-                            }
-                        },
-                        "required": ["query"] 
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_fema_disaster_declarations",
-                    "description": "Get recent FEMA disaster declarations for a specific state and optionally a county.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "state": {
-                                "type": "string",
-                                "description": "The two-letter state abbreviation (e.g., 'TN')."
-                            },
-                            "county": {
-                                "type": "string",
-                                "description": "The county name (e.g., 'Davidson')."
-                            },
-                            "days": {
-                                "type": "integer",
-                                "description": "Number of days to look back (default is 365)."
-                            }
-                        },
-                        "required": ["state"] 
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_fema_assistance_data",
-                    "description": "Get summary data for FEMA Individual Assistance approved in a state/county to gauge community need.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "state": {
-                                "type": "string",
-                                "description": "The two-letter state abbreviation (e.g., 'TN')."
-                            },
-                            "county": {
-                                "type": "string",
-                                "description": "The county name (e.g., 'Davidson')."
-                            }
-                        },
-                        "required": ["state"] 
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_nasa_eonet_events",
-                    "description": "Get recent natural events (wildfires, storms, volcanoes, etc.) from NASA EONET.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "limit": {
-                                "type": "integer",
-                                "description": "Maximum number of events to return (default is 10)."
-                            },
-                            "days": {
-                                "type": "integer",
-                                "description": "Number of days to look back (default is 20)."
-                            },
-                            "status": {
-                                "type": "string",
-                                "description": "Status of events to return: 'open' or 'closed' (default is 'open')."
-                            }
-                        }
-                    }
-                }
-            }
-        ]
-        
+        messages = self._build_messages(user_input, history)
+        tool_options = self._tool_options(tools)
+        offered = self._offered_tools(tool_options)
+
         try:
             collected_visuals = []
             max_iterations = 5
+            turn_ends = time.monotonic() + CHAT_TURN_BUDGET_SECONDS
             
             # Loop allowing up to 5 consecutive model calls with tool execution
             for iteration in range(max_iterations):
@@ -265,9 +98,9 @@ class DisasterAgent:
                 completion = self.client.chat.completions.create(
                     model=self.model_id,
                     messages=messages,
-                    tools=tools_schema,
-                    tool_choice="auto",
                     max_tokens=2000,
+                    timeout=self._llm_timeout(turn_ends),
+                    **tool_options,
                 )
                 
                 response_message = completion.choices[0].message
@@ -277,60 +110,21 @@ class DisasterAgent:
                     # Add the assistant's response (with tool calls) to history
                     messages.append(response_message)
                     
-                    # Process each tool call
-                    for tool_call in response_message.tool_calls:
-                        function_name = tool_call.function.name
-                        raw_args = tool_call.function.arguments
-                        
-                        try:
-                            function_args = self._safe_json_loads(raw_args)
-                        except Exception as json_err:
-                            print(f"Error parsing tool arguments for {function_name}: {json_err}")
-                            print(f"Raw arguments: {raw_args}")
-                            messages.append({
-                                "tool_call_id": tool_call.id,
-                                "role": "tool",
-                                "name": function_name,
-                                "content": f"Error: Invalid JSON arguments returned by model for tool '{function_name}'.",
-                            })
-                            continue
-
-                        if function_name in self.tools:
-                            # Execute tool
-                            tool_func = self.tools[function_name]
-                            print(f"🤖 AI calling tool: {function_name} with args: {function_args}")
-                            try:
-                                tool_result = tool_func(**function_args)
-                                print(f"✅ Tool {function_name} returned data.")
-                            except Exception as tool_err:
-                                tool_result = f"Error executing tool: {str(tool_err)}"
-                                print(f"❌ Tool {function_name} error: {tool_err}")
-                            
-                            # Handle structured results for visualizations
-                            if isinstance(tool_result, dict):
-                                summary = tool_result.get("summary", str(tool_result))
-                                visual = tool_result.get("visuals")
-                                if visual:
-                                    collected_visuals.append(visual)
-                                tool_content = summary
-                            else:
-                                tool_content = str(tool_result)
-
-                            # Add tool result to messages
-                            messages.append({
-                                "tool_call_id": tool_call.id,
-                                "role": "tool",
-                                "name": function_name,
-                                "content": tool_content,
-                            })
-                        else:
-                            # Handle unknown tool
-                            messages.append({
-                                "tool_call_id": tool_call.id,
-                                "role": "tool",
-                                "name": function_name,
-                                "content": f"Error: Tool '{function_name}' not found.",
-                            })
+                    # Run every tool call of this message concurrently
+                    futures = [self._start_tool(tool_call.function.name, tool_call.function.arguments, turn_ends, offered)
+                               for tool_call in response_message.tool_calls]
+                    
+                    # Add tool results to messages in the original order
+                    for tool_call, future in zip(response_message.tool_calls, futures):
+                        tool_content, visual = self._wait_for_tool(future, tool_call.function.name, turn_ends)
+                        if visual:
+                            collected_visuals.append(visual)
+                        messages.append({
+                            "tool_call_id": tool_call.id,
+                            "role": "tool",
+                            "name": tool_call.function.name,
+                            "content": tool_content,
+                        })
                     
                     # Continue to next iteration to allow more tool calls
                     continue
@@ -352,6 +146,50 @@ class DisasterAgent:
             traceback.print_exc()
             return f"Error connecting to chatbot: {str(e)}"
 
+    def _build_messages(self, user_input, history=None):
+        """
+        Returns the message list for a new turn: system prompt, history, then the user's message.
+        """
+        system_prompt = (
+            "You are a helpful assistant that helps identify areas of most need during natural disaster events. "
+            "You are an expert in disaster coordination, volunteering, and donation logistics. "
+            "IMPORTANT: Always search for up-to-date data using the provided tools (RAG Knowledge Base, OpenFEMA, DuckDuckGo Search, NWS Alerts) "
+            "before making claims about specific community needs, disaster status, or preparedness protocols. "
+            "Use the 'get_rag_context' tool specifically for 2025-2026 preparedness guides, emergency protocols, and general disaster trends. "
+            "If you do not have data from a tool for a specific inquiry about a location's needs or a protocol, "
+            "clearly state that you don't have that information instead of speculating or fabricating needs. "
+            "Keep answers concise, structured, and helpful."
+            f"The year is {date.today().year}."
+        )
+        messages = [{"role": "system", "content": system_prompt}]
+        if history:
+            # Ensure history format matches OpenAI expectations (role/content)
+            messages.extend(history)
+        messages.append({"role": "user", "content": user_input})
+        return messages
+
+    def _tool_options(self, tool_names=None):
+        """
+        Returns the tools/tool_choice arguments for a model call, limited to tools this agent can run.
+
+        Args:
+            tool_names (list): Optional subset of tool names for this request.
+        """
+        names = [name for name in self.tools
+                 if name != "get_dropped_tool_output" and (tool_names is None or name in tool_names)]
+        if not get_tool_schemas(names):
+            return {}
+        # Shortened outputs point the model at get_dropped_tool_output, so it comes with any other tool
+        if "get_dropped_tool_output" in self.tools:
+            names.append("get_dropped_tool_output")
+        return {"tools": get_tool_schemas(names), "tool_choice": "auto"}
+
+    def _offered_tools(self, tool_options):
+        """
+        Returns the names of the tools sent with a request; the model may only call these.
+        """
+        return {schema["function"]["name"] for schema in tool_options.get("tools", [])}
+
     def _safe_json_loads(self, s):
         """
         Attempt to parse JSON while handling potential extra data from reasoning models.
@@ -372,7 +210,7 @@ class DisasterAgent:
                     pass
             raise
 
-    def get_response_stream(self, user_input, history=None, return_raw=False):
+    def get_response_stream(self, user_input, history=None, return_raw=False, tools=None):
         """
         Generator that streams the response from the chatbot.
         
@@ -381,6 +219,7 @@ class DisasterAgent:
             history (list): List of previous messages (optional, for context).
             return_raw (bool): If True, yields dicts with {"type": "text"|"visual"|"status", "data": ...}.
                                If False, yields only the text content strings.
+            tools (list): Names of the tools to offer for this request (default: all of self.tools).
         
         Yields:
             str|dict: Chunks of the response or structured event data.
@@ -390,168 +229,30 @@ class DisasterAgent:
             yield {"type": "text", "data": msg} if return_raw else msg
             return
 
-        # Construct messages list
-        messages = []
-        
-        # System prompt
-        system_prompt = (
-            "You are a helpful assistant that helps identify areas of most need during natural disaster events. "
-            "You are an expert in disaster coordination, volunteering, and donation logistics. "
-            "IMPORTANT: Always search for up-to-date data using the provided tools (RAG Knowledge Base, OpenFEMA, DuckDuckGo Search, NWS Alerts) "
-            "before making claims about specific community needs, disaster status, or preparedness protocols. "
-            "Use the 'get_rag_context' tool specifically for 2025-2026 preparedness guides, emergency protocols, and general disaster trends. "
-            "If you do not have data from a tool for a specific inquiry about a location's needs or a protocol, "
-            "clearly state that you don't have that information instead of speculating or fabricating needs. "
-            "Keep answers concise, structured, and helpful."
-            f"The year is {date.today().year}."
-        )
-        messages.append({"role": "system", "content": system_prompt})
-        
-        if history:
-            messages.extend(history)
-        
-        messages.append({"role": "user", "content": user_input})
-        
-        # Define tools schema (Same as your original)
-        tools_schema = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "post_disaster_alert",
-                    "description": "Post a verified disaster alert to the public Bounty Board for volunteers to see.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "location": {"type": "string", "description": "Location of the event (e.g., 'Miami, FL')."},
-                            "summary": {"type": "string", "description": "Brief summary of the need or threat."},
-                            "severity": {"type": "integer", "description": "Severity level from 1 to 10."},
-                            "disaster_type": {"type": "string", "description": "Type: 'Flood', 'Hurricane', 'Fire', 'Earthquake', etc."}
-                        },
-                        "required": ["location", "summary", "severity"] 
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_search",
-                    "description": "General web search using DuckDuckGo.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "query": {"type": "string", "description": "The search query."}
-                        },
-                        "required": ["query"] 
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_news_search",
-                    "description": "Search DuckDuckGo News for recent news and information.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "query": {"type": "string", "description": "The search query (e.g., 'Nashville flood news')."}
-                        },
-                        "required": ["query"] 
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_nws_alerts",
-                    "description": "Get active weather alerts from the National Weather Service for a specific latitude and longitude.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "lat": {"type": "number", "description": "Latitude of the location."},
-                            "lon": {"type": "number", "description": "Longitude of the location."}
-                        },
-                        "required": ["lat", "lon"] 
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_rag_context",
-                    "description": "Get up-to-date (2025-2026) information on natural disaster preparedness, emergency protocols, and disaster trends from the knowledge base.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "query": {"type": "string", "description": "The specific preparedness topic or disaster trend to search for."}
-                        },
-                        "required": ["query"] 
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_fema_disaster_declarations",
-                    "description": "Get recent FEMA disaster declarations for a specific state and optionally a county.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "state": {"type": "string", "description": "The two-letter state abbreviation (e.g., 'TN')."},
-                            "county": {"type": "string", "description": "The county name (e.g., 'Davidson')."},
-                            "days": {"type": "integer", "description": "Number of days to look back (default is 365)."}
-                        },
-                        "required": ["state"] 
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_fema_assistance_data",
-                    "description": "Get summary data for FEMA Individual Assistance approved in a state/county to gauge community need.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "state": {"type": "string", "description": "The two-letter state abbreviation (e.g., 'TN')."},
-                            "county": {"type": "string", "description": "The county name (e.g., 'Davidson')."}
-                        },
-                        "required": ["state"] 
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_nasa_eonet_events",
-                    "description": "Get recent natural events (wildfires, storms, volcanoes, etc.) from NASA EONET.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "limit": {"type": "integer", "description": "Maximum number of events to return (default is 10)."},
-                            "days": {"type": "integer", "description": "Number of days to look back (default is 20)."},
-                            "status": {"type": "string", "description": "Status of events to return: 'open' or 'closed' (default is 'open')."}
-                        }
-                    }
-                }
-            }
-        ]
-        
+        messages = self._build_messages(user_input, history)
+        tool_options = self._tool_options(tools)
+        offered = self._offered_tools(tool_options)
+
         try:
             max_iterations = 5
+            # Not a `with deadline(...)` around the loop: the budget must not leak to the caller across yields
+            turn_ends = time.monotonic() + CHAT_TURN_BUDGET_SECONDS
             
             for iteration in range(max_iterations):
                 # Request a stream from the API
                 stream = self.client.chat.completions.create(
                     model=self.model_id,
                     messages=messages,
-                    tools=tools_schema,
-                    tool_choice="auto",
                     max_tokens=2000,
-                    stream=True  # ENABLE STREAMING
+                    stream=True,  # ENABLE STREAMING
+                    timeout=self._llm_timeout(turn_ends),
+                    **tool_options,
                 )
                 
-                # Buffers for tool calls and content
-                tool_calls_buffer = []
+                # Tool calls are started as soon as their arguments are complete,
+                # while the rest of the stream is still arriving
+                tool_calls = ToolCallAccumulator()
+                futures = {}
                 content_buffer = ""
                 
                 # Iterate over the stream chunks
@@ -570,28 +271,19 @@ class DisasterAgent:
                     # Handle Tool Call Accumulation
                     if delta.tool_calls:
                         for tool_delta in delta.tool_calls:
-                            # If a new tool call is starting
-                            if len(tool_calls_buffer) <= tool_delta.index:
-                                tool_calls_buffer.append({
-                                    "id": tool_delta.id,
-                                    "function": {
-                                        "name": tool_delta.function.name,
-                                        "arguments": ""
-                                    },
-                                    "type": "function"
-                                })
-                            
-                            # Append name/arguments fragments
-                            t_call = tool_calls_buffer[tool_delta.index]
-                            if tool_delta.function.name:
-                                t_call["function"]["name"] = tool_delta.function.name
-                            if tool_delta.function.arguments:
-                                t_call["function"]["arguments"] += tool_delta.function.arguments
-
-                # End of current stream response.
+                            for tool_call in tool_calls.add(tool_delta):
+                                futures[self._start_tool(tool_call["function"]["name"], tool_call["function"]["arguments"], turn_ends, offered)] = tool_call
+                                if return_raw:
+                                    yield {"type": "status", "data": f"Using tool: {tool_call['function']['name']}..."}
+
+                # End of current stream response; start whatever was still incomplete
+                for tool_call in tool_calls.finish():
+                    futures[self._start_tool(tool_call["function"]["name"], tool_call["function"]["arguments"], turn_ends, offered)] = tool_call
+                    if return_raw:
+                        yield {"type": "status", "data": f"Using tool: {tool_call['function']['name']}..."}
                 
                 # If no tools were called, we are done
-                if not tool_calls_buffer:
+                if not futures:
                     break
                 
                 # If tools were called, we must execute them and loop again
@@ -601,58 +293,28 @@ class DisasterAgent:
                 messages.append({
                     "role": "assistant",
                     "content": content_buffer if content_buffer else None,
-                    "tool_calls": tool_calls_buffer
+                    "tool_calls": list(futures.values())
                 })
                 
-                # Process the tools
-                for tool_call in tool_calls_buffer:
-                    function_name = tool_call["function"]["name"]
-                    raw_args = tool_call["function"]["arguments"]
-                    
-                    if return_raw:
-                        yield {"type": "status", "data": f"Using tool: {function_name}..."}
-                    
-                    try:
-                        function_args = self._safe_json_loads(raw_args)
-                    except Exception as json_err:
-                        messages.append({
-                            "tool_call_id": tool_call["id"],
-                            "role": "tool",
-                            "name": function_name,
-                            "content": f"Error: Invalid JSON arguments: {json_err}",
-                        })
-                        continue
-
-                    if function_name in self.tools:
-                        print(f"🤖 AI calling tool: {function_name} with args: {function_args}")
-                        try:
-                            tool_result = self.tools[function_name](**function_args)
-                        except Exception as tool_err:
-                            tool_result = f"Error executing tool: {str(tool_err)}"
-                        
-                        # Handle structured results (visuals)
-                        if isinstance(tool_result, dict):
-                            summary = tool_result.get("summary", str(tool_result))
-                            visual = tool_result.get("visuals")
-                            if visual and return_raw:
+                # Report each tool as it finishes
+                try:
+                    for future in as_completed(futures, timeout=max(0, turn_ends - time.monotonic())):
+                        tool_content, visual = future.result()
+                        if return_raw:
+                            yield {"type": "status", "data": f"Finished tool: {futures[future]['function']['name']}"}
+                            if visual:
                                 yield {"type": "visual", "data": visual}
-                            tool_content = summary
-                        else:
-                            tool_content = str(tool_result)
-
-                        messages.append({
-                            "tool_call_id": tool_call["id"],
-                            "role": "tool",
-                            "name": function_name,
-                            "content": tool_content,
-                        })
-                    else:
-                        messages.append({
-                            "tool_call_id": tool_call["id"],
-                            "role": "tool",
-                            "name": function_name,
-                            "content": f"Error: Tool '{function_name}' not found.",
-                        })
+                except FuturesTimeout:
+                    pass  # Tools still queued or running are reported as errors below
+                
+                # Results go back in the same order as the tool_calls above
+                for future, tool_call in futures.items():
+                    messages.append({
+                        "tool_call_id": tool_call["id"],
+                        "role": "tool",
+                        "name": tool_call["function"]["name"],
+                        "content": self._wait_for_tool(future, tool_call["function"]["name"], turn_ends)[0],
+                    })
                 
                 # Loop continues to next iteration to send tool results back to model
             
@@ -665,6 +327,93 @@ class DisasterAgent:
             else:
                 yield err
 
+    def _start_tool(self, function_name, raw_args, turn_ends, offered):
+        """
+        Submits one tool call to the shared tool pool.
+
+        Returns:
+            Future: Resolves to (tool message content, visual or None).
+        """
+        pool = _serial_tool_pool if function_name in SERIAL_TOOLS else _tool_pool
+        # copy_context keeps the caller's context variables (e.g. an outer deadline) in the worker thread
+        return pool.submit(contextvars.copy_context().run, self._execute_tool, function_name, raw_args, turn_ends, offered)
+
+    def _wait_for_tool(self, future, function_name, turn_ends):
+        """
+        Waits for a started tool call, at most until the turn's budget runs out.
+        The pool is shared by every session, so a call can still be queued behind others then.
+
+        Returns:
+            tuple: (content for the tool message, visual or None)
+        """
+        try:
+            return future.result(timeout=max(0, turn_ends - time.monotonic()))
+        except FuturesTimeout:
+            future.cancel()  # Never starts it if it is still queued
+            print(f"❌ Tool {function_name} error: did not finish within the turn's time budget")
+            return f"Error executing tool: '{function_name}' did not finish within the time budget.", None
+
+    def _execute_tool(self, function_name, raw_args, turn_ends, offered):
+        """
+        Runs one tool call and turns its result into tool message content.
+
+        Returns:
+            tuple: (content for the tool message, visual or None)
+        """
+        function_args, error = self._parse_tool_args(function_name, raw_args, offered)
+        if error:
+            return error, None
+
+        print(f"🤖 AI calling tool: {function_name} with args: {function_args}")
+        try:
+            # Tools get whatever is left of the turn's budget as their timeout
+            with deadline_at(turn_ends):
+                tool_result = self.tools[function_name](**function_args)
+            print(f"✅ Tool {function_name} returned data.")
+        except Exception as tool_err:
+            tool_result = f"Error executing tool: {str(tool_err)}"
+            print(f"❌ Tool {function_name} error: {tool_err}")
+        return self._tool_output(function_name, tool_result, function_args)
+
+    def _parse_tool_args(self, function_name, raw_args, offered):
+        """
+        Parses a tool call's arguments and checks the tool was offered in this request.
+
+        Returns:
+            tuple: (arguments dict, None) or (None, error message for the model)
+        """
+        try:
+            function_args = self._safe_json_loads(raw_args)
+        except Exception as json_err:
+            print(f"Error parsing tool arguments for {function_name}: {json_err}")
+            print(f"Raw arguments: {raw_args}")
+            return None, f"Error: Invalid JSON arguments returned by model for tool '{function_name}'."
+
+        # A tools=[...] subset must hold even if the model names a tool it wasn't given
+        if function_name not in self.tools or function_name not in offered:
+            return None, f"Error: Tool '{function_name}' not found."
+        return function_args, None
+
+    def _tool_output(self, function_name, tool_result, function_args):
+        """
+        Turns a tool result into (compacted tool message content, visual or None).
+        """
+        # Handle structured results for visualizations
+        visual = None
+        if isinstance(tool_result, dict):
+            tool_content = tool_result.get("summary", str(tool_result))
+            visual = tool_result.get("visuals")
+        else:
+            tool_content = str(tool_result)
+        return self.compactor.compact(function_name, tool_content, function_args), visual
+
+    def _llm_timeout(self, turn_ends):
+        """
+        Timeout for the next model call: LLM_TIMEOUT, capped by what is left of the turn.
+        """
+        with deadline_at(turn_ends):
+            return budget_timeout(LLM_TIMEOUT)
+
     def _clean_response(self, content):
         """
         Remove <think>...</think> tags and clean up the response.
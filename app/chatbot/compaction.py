@@ -0,0 +1,177 @@
+"""
+Token-budgeted compaction of tool outputs before they enter the chat context.
+
+Tool outputs are lists of items (search results, alerts, events, RAG chunks)
+joined by blank lines or "---" separators. When an output is over its tool's
+token budget, items are ranked by how many of the call's query terms they
+mention, the best ones are kept (in their original order) and the rest are
+set aside under a reference id. The model is told how much was left out and
+can fetch it with the get_dropped_tool_output tool.
+
+Token counts use tiktoken when it is installed and can load its encoding,
+and fall back to ~4 characters per token otherwise.
+"""
+import re
+import threading
+from collections import OrderedDict
+
+DEFAULT_TOOL_TOKEN_BUDGET = 1500
+TOOL_TOKEN_BUDGETS = {
+    "get_search": 1200,
+    "get_news_search": 1200,
+    "get_rag_context": 1500,
+    "get_nasa_eonet_events": 1000,
+    "get_nws_alerts": 1200,
+    "get_dropped_tool_output": 2000,
+}
+MAX_DROPPED_OUTPUTS = 20  # per agent; the oldest set-aside outputs are forgotten first
+NOTE_TOKENS = 60  # Room left for the note that points at the set-aside items
+CHARS_PER_TOKEN = 4
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                # Not installed, or the encoding file can't be downloaded
+                _encoding = False
+        return _encoding
+
+
+def count_tokens(text):
+    """
+    Returns the (approximate) number of tokens in text.
+    """
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def split_at_tokens(text, max_tokens):
+    """
+    Splits text into (head, rest) after about max_tokens tokens, with head + rest == text.
+    """
+    encoding = _get_encoding()
+    if encoding:
+        tokens = encoding.encode(text, disallowed_special=())
+        # Token bytes are a prefix of the UTF-8 text; a character cut in half is left to the rest
+        head = encoding.decode_bytes(tokens[:max_tokens]).decode("utf-8", errors="ignore")
+    else:
+        head = text[:max_tokens * CHARS_PER_TOKEN]
+    return head, text[len(head):]
+
+
+def split_items(text):
+    """
+    Splits a tool output into (items, separator).
+    """
+    if "\n\n---\n\n" in text:
+        return text.split("\n\n---\n\n"), "\n\n---\n\n"
+    return [item for item in re.split(r"\n\s*\n", text) if item.strip()], "\n\n"
+
+
+def _query_terms(args):
+    words = " ".join(str(v) for v in (args or {}).values() if isinstance(v, (str, int, float)))
+    return {w for w in re.findall(r"[a-z0-9]+", words.lower()) if len(w) > 2}
+
+
+def rank_items(items, args):
+    """
+    Returns item indices, most relevant to the call's arguments first (ties keep the tool's order).
+    """
+    terms = _query_terms(args)
+
+    def score(i):
+        item_words = set(re.findall(r"[a-z0-9]+", items[i].lower()))
+        return -len(terms & item_words), i
+
+    return sorted(range(len(items)), key=score)
+
+
+class ToolOutputCompactor:
+    """
+    Compacts one agent's tool outputs and keeps what was left out, so it can be fetched later.
+    """
+    def __init__(self, budgets=None, default_budget=DEFAULT_TOOL_TOKEN_BUDGET):
+        self.budgets = budgets if budgets is not None else TOOL_TOKEN_BUDGETS
+        self.default_budget = default_budget
+        self._dropped = OrderedDict()  # ref -> {"tool", "items", "separator"}
+        self._next_ref = 1
+        self._lock = threading.Lock()
+
+    def _set_aside(self, tool_name, items, separator):
+        with self._lock:
+            ref = f"{tool_name}-{self._next_ref}"
+            self._next_ref += 1
+            self._dropped[ref] = {"tool": tool_name, "items": items, "separator": separator}
+            while len(self._dropped) > MAX_DROPPED_OUTPUTS:
+                self._dropped.popitem(last=False)
+        return ref
+
+    def compact(self, tool_name, text, args=None):
+        """
+        Fits a tool output into the tool's token budget.
+
+        Args:
+            tool_name (str): The tool that produced the output.
+            text (str): The tool output (the summary for structured results).
+            args (dict): The tool call arguments, used to rank items.
+
+        Returns:
+            str: The output itself if it fits, else the most relevant items plus a note
+                 on how to fetch the rest.
+        """
+        budget = self.budgets.get(tool_name, self.default_budget)
+        if count_tokens(text) <= budget:
+            return text
+
+        items, separator = split_items(text)
+        # Leave room for the note at the end, but never the whole budget
+        item_budget = max(1, budget - min(NOTE_TOKENS, budget // 2))
+        remaining = item_budget
+        kept, dropped = set(), []
+        for i in rank_items(items, args):
+            cost = count_tokens(items[i] + separator)
+            if cost <= remaining:
+                kept.add(i)
+                remaining -= cost
+            else:
+                dropped.append(i)
+
+        if kept:
+            kept_text = separator.join(items[i] for i in sorted(kept))
+            dropped_items = [items[i] for i in sorted(dropped)]
+        else:
+            # Even the best item is over budget: keep its beginning, set the rest of it aside
+            best = dropped.pop(0)
+            kept_text, rest = split_at_tokens(items[best], item_budget)
+            dropped_items = [rest] + [items[i] for i in sorted(dropped)]
+
+        ref = self._set_aside(tool_name, dropped_items, separator)
+        print(f"Compacted {tool_name} output to {count_tokens(kept_text)} tokens, set aside {len(dropped_items)} item(s) as {ref}.")
+        return (f"{kept_text}\n\n[{len(dropped_items)} more item(s) left out to save context. "
+                f"Call get_dropped_tool_output with ref '{ref}' if you need them.]")
+
+    def get_dropped(self, ref: str) -> str:
+        """
+        Returns the tool output items that were left out of the context under ref.
+
+        Args:
+            ref (str): The reference given in the compacted tool output.
+
+        Returns:
+            str: The left-out items, or a message if the reference is unknown.
+        """
+        with self._lock:
+            entry = self._dropped.get(ref)
+        if entry is None:
+            return f"No left-out tool output found for ref '{ref}'."
+        return entry["separator"].join(entry["items"])
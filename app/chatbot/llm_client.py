@@ -0,0 +1,144 @@
+"""
+Process-wide registry of pooled LLM clients.
+
+Agents are created per chat session, per bounty generation, per recommendation
+request and per audio transcript. Instead of each one opening its own OpenAI
+client (and so new connections and TLS handshakes to Novita), they borrow a
+shared client from here:
+
+    client = get_llm_client(NOVITA_BASE_URL, token)
+
+There is one OpenAI client per (base URL, token), and all clients for the same
+base URL share one httpx connection pool, so a new session's first call reuses
+connections opened by earlier ones. Clients are keyed by a hash of the token,
+and only the MAX_CLIENTS most recently used are kept. Async clients are kept
+per event loop, since httpx connections can't move between loops; a loop that
+is about to finish should await close_async_llm_clients().
+
+The replay mode is part of the key, so switching REPLAY_MODE (e.g. in tests)
+never hands out a client that records or replays when it shouldn't.
+"""
+import asyncio
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from app import replay
+
+MAX_CONNECTIONS = 32  # Across all sessions and agents in the process
+MAX_KEEPALIVE_CONNECTIONS = 16
+KEEPALIVE_EXPIRY = 120  # Seconds an idle connection is kept; chats pause between turns
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 600  # Per-call timeouts are set by the agent; this is only the ceiling
+MAX_CLIENTS = 64  # Per event loop for async clients; evicted clients still work for agents holding them
+
+_lock = threading.Lock()
+_clients = OrderedDict()  # (base_url, token hash, mode) -> OpenAI, least recently used first
+_http_clients = {}  # (base_url, mode) -> httpx.Client
+_async_clients = weakref.WeakKeyDictionary()  # loop -> OrderedDict {(base_url, token hash, mode): AsyncOpenAI}
+_async_http_clients = weakref.WeakKeyDictionary()  # loop -> {(base_url, mode): httpx.AsyncClient}
+
+
+def _client_key(base_url, api_key, mode):
+    # Tokens are not kept in the registry itself, only a digest to tell them apart
+    return base_url, hashlib.sha256((api_key or "").encode("utf-8")).hexdigest(), mode
+
+
+def _remember(clients, key, client):
+    clients[key] = client
+    while len(clients) > MAX_CLIENTS:
+        clients.popitem(last=False)
+
+
+def _limits():
+    return httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=KEEPALIVE_EXPIRY)
+
+
+def _timeout():
+    return httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+
+
+def get_llm_client(base_url, api_key):
+    """
+    Returns the shared OpenAI client for a base URL and token.
+
+    Args:
+        base_url (str): OpenAI-compatible API root, e.g. Novita's.
+        api_key (str): API token.
+
+    Returns:
+        OpenAI: A client whose connections are pooled with every other client for base_url.
+    """
+    mode = replay.get_mode()
+    key = _client_key(base_url, api_key, mode)
+    with _lock:
+        client = _clients.get(key)
+        if client is not None:
+            _clients.move_to_end(key)
+        else:
+            http_client = _http_clients.get((base_url, mode))
+            if http_client is None or http_client.is_closed:
+                http_client = httpx.Client(
+                    transport=replay.wrap_transport(httpx.HTTPTransport(limits=_limits(), retries=1)),
+                    timeout=_timeout(),
+                    follow_redirects=True,
+                )
+                _http_clients[(base_url, mode)] = http_client
+            client = OpenAI(base_url=base_url, api_key=api_key, http_client=http_client)
+            _remember(_clients, key, client)
+        return client
+
+
+def get_async_llm_client(base_url, api_key):
+    """
+    Returns the shared AsyncOpenAI client for a base URL and token on the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    mode = replay.get_mode()
+    key = _client_key(base_url, api_key, mode)
+    with _lock:
+        clients = _async_clients.setdefault(loop, OrderedDict())
+        client = clients.get(key)
+        if client is not None:
+            clients.move_to_end(key)
+        else:
+            http_clients = _async_http_clients.setdefault(loop, {})
+            http_client = http_clients.get((base_url, mode))
+            if http_client is None or http_client.is_closed:
+                http_client = httpx.AsyncClient(
+                    transport=replay.wrap_async_transport(httpx.AsyncHTTPTransport(limits=_limits(), retries=1)),
+                    timeout=_timeout(),
+                    follow_redirects=True,
+                )
+                http_clients[(base_url, mode)] = http_client
+            client = AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=http_client)
+            _remember(clients, key, client)
+        return client
+
+
+def close_llm_clients():
+    """
+    Closes the pooled sync clients, e.g. on shutdown or between tests.
+    """
+    with _lock:
+        for http_client in _http_clients.values():
+            http_client.close()
+        _http_clients.clear()
+        _clients.clear()
+
+
+async def close_async_llm_clients():
+    """
+    Closes the running loop's pooled async clients, e.g. before the loop shuts down.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        _async_clients.pop(loop, None)
+        http_clients = _async_http_clients.pop(loop, {})
+    for http_client in http_clients.values():
+        await http_client.aclose()
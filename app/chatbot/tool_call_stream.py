@@ -0,0 +1,73 @@
+"""
+Incremental parsing of tool calls from a streamed chat completion.
+
+A streamed completion delivers each tool call as fragments: the first delta
+for an index carries its id and name, later ones append pieces of the JSON
+arguments. ToolCallAccumulator rebuilds the calls and reports each one as
+soon as it is complete, i.e. when its arguments parse as a JSON object or the
+next call's index starts, so the agent can start that tool while the model is
+still generating the rest.
+"""
+import json
+
+
+class ToolCallAccumulator:
+    """
+    Rebuilds streamed tool calls into OpenAI-style dicts and hands out each finished call once.
+    """
+    def __init__(self):
+        self.calls = []  # [{"id", "type", "function": {"name", "arguments"}}] in index order
+        self._dispatched = set()
+
+    def add(self, tool_delta):
+        """
+        Applies one tool-call delta.
+
+        Returns:
+            list: Calls that became complete with this delta (usually none or one).
+        """
+        index = tool_delta.index
+        completed = []
+        if len(self.calls) <= index:
+            # A new index starting means every earlier call has received all its arguments
+            completed.extend(self._take(range(len(self.calls))))
+            while len(self.calls) <= index:
+                self.calls.append({"id": None, "type": "function", "function": {"name": None, "arguments": ""}})
+
+        call = self.calls[index]
+        if tool_delta.id:
+            call["id"] = tool_delta.id
+        if tool_delta.function:
+            if tool_delta.function.name:
+                call["function"]["name"] = tool_delta.function.name
+            if tool_delta.function.arguments:
+                call["function"]["arguments"] += tool_delta.function.arguments
+
+        if index not in self._dispatched and _is_complete(call):
+            completed.extend(self._take([index]))
+        return completed
+
+    def finish(self):
+        """
+        Returns the calls not handed out yet, once the stream has ended.
+        """
+        return self._take(range(len(self.calls)))
+
+    def _take(self, indices):
+        # Calls that never got a name can't be run and are dropped
+        taken = []
+        for i in indices:
+            if i not in self._dispatched and self.calls[i]["function"]["name"]:
+                self._dispatched.add(i)
+                taken.append(self.calls[i])
+        return taken
+
+
+def _is_complete(call):
+    arguments = call["function"]["arguments"].strip()
+    if not (call["id"] and call["function"]["name"] and arguments.endswith("}")):
+        return False
+    try:
+        return isinstance(json.loads(arguments), dict)
+    except json.JSONDecodeError:
+        return False
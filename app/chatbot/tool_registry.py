@@ -0,0 +1,138 @@
+"""
+Function-calling schemas for the agent's tools, built once at import.
+
+Each tool is declared with register_tool; its OpenAI "function" schema is
+derived from that declaration and kept here, so agents don't rebuild it per
+call. An agent sends only the schemas of tools it actually has implementations
+for (and a request can narrow that further), which keeps prompts short for
+narrow tasks like bounty matching.
+
+    register_tool("get_search", "General web search using DuckDuckGo.",
+                  {"query": ("string", "The search query.")}, required=["query"])
+    get_tool_schemas(["get_search"])
+"""
+_schemas = {}  # name -> schema, in registration order
+
+
+def register_tool(name, description, parameters=None, required=None):
+    """
+    Registers (or replaces) the schema of a tool.
+
+    Args:
+        name (str): Tool name, as used in DisasterAgent.tools.
+        description (str): What the tool does, for the model.
+        parameters (dict): {parameter name: (JSON type, description)}.
+        required (list): Names of the required parameters.
+
+    Returns:
+        dict: The OpenAI tool schema.
+    """
+    properties = {
+        param: {"type": param_type, "description": param_description}
+        for param, (param_type, param_description) in (parameters or {}).items()
+    }
+    schema = {"type": "object", "properties": properties}
+    if required:
+        schema["required"] = list(required)
+    _schemas[name] = {
+        "type": "function",
+        "function": {"name": name, "description": description, "parameters": schema},
+    }
+    return _schemas[name]
+
+
+def get_tool_schemas(names):
+    """
+    Returns the schemas of the given tools that are registered, in registration order.
+    """
+    names = set(names)
+    return [schema for name, schema in _schemas.items() if name in names]
+
+
+register_tool(
+    "post_disaster_alert",
+    "Post a verified disaster alert to the public Bounty Board for volunteers to see.",
+    {
+        "location": ("string", "Location of the event (e.g., 'Miami, FL')."),
+        "summary": ("string", "Brief summary of the need or threat."),
+        "severity": ("integer", "Severity level from 1 to 10."),
+        "disaster_type": ("string", "Type: 'Flood', 'Hurricane', 'Fire', 'Earthquake', etc."),
+    },
+    required=["location", "summary", "severity"],
+)
+register_tool(
+    "get_search",
+    "General web search using DuckDuckGo.",
+    {
+        "query": ("string", "The search query."),
+        "max_results": ("integer", "How many results to return (1-30, default 30). Ask for fewer for a quick check."),
+    },
+    required=["query"],
+)
+register_tool(
+    "get_news_search",
+    "Search DuckDuckGo News for recent news and information.",
+    {
+        "query": ("string", "The search query (e.g., 'Nashville flood news')."),
+        "max_results": ("integer", "How many results to return (1-30, default 30). Ask for fewer for a quick check."),
+    },
+    required=["query"],
+)
+register_tool(
+    "get_nws_alerts",
+    "Get active weather alerts from the National Weather Service for a specific latitude and longitude.",
+    {
+        "lat": ("number", "Latitude of the location."),
+        "lon": ("number", "Longitude of the location."),
+    },
+    required=["lat", "lon"],
+)
+register_tool(
+    "get_dropped_tool_output",
+    "Get the items that were left out of an earlier, shortened tool output.",
+    {"ref": ("string", "The ref given in the shortened tool output.")},
+    required=["ref"],
+)
+register_tool(
+    "get_rag_context",
+    "Get up-to-date (2025-2026) information on natural disaster preparedness, emergency protocols, and disaster trends from the knowledge base.",
+    {"query": ("string", "The specific preparedness topic or disaster trend to search for.")},
+    required=["query"],
+)
+register_tool(
+    "get_fema_disaster_declarations",
+    "Get recent FEMA disaster declarations for a specific state and optionally a county.",
+    {
+        "state": ("string", "The two-letter state abbreviation (e.g., 'TN')."),
+        "county": ("string", "The county name (e.g., 'Davidson')."),
+        "days": ("integer", "Number of days to look back (default is 365)."),
+    },
+    required=["state"],
+)
+register_tool(
+    "get_fema_assistance_data",
+    "Get summary data for FEMA Individual Assistance approved in a state/county to gauge community need.",
+    {
+        "state": ("string", "The two-letter state abbreviation (e.g., 'TN')."),
+        "county": ("string", "The county name (e.g., 'Davidson')."),
+    },
+    required=["state"],
+)
+register_tool(
+    "get_county_need_index",
+    "Rank counties by a precomputed need index (FEMA housing assistance dollars, registrations and recency). One call answers 'where is need highest' for a state or the whole US.",
+    {
+        "state": ("string", "Optional two-letter state abbreviation (e.g., 'TN')."),
+        "county": ("string", "Optional county name (e.g., 'Davidson')."),
+        "limit": ("integer", "Maximum number of counties to return (default is 10)."),
+    },
+)
+register_tool(
+    "get_nasa_eonet_events",
+    "Get recent natural events (wildfires, storms, volcanoes, etc.) from NASA EONET.",
+    {
+        "limit": ("integer", "Maximum number of events to return (default is 10)."),
+        "days": ("integer", "Number of days to look back (default is 20)."),
+        "status": ("string", "Status of events to return: 'open' or 'closed' (default is 'open')."),
+    },
+)
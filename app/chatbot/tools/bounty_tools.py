@@ -1,9 +1,14 @@
 import json
 import datetime
 import os
+import threading
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from app.common import load_scan_cache, save_scan_cache, SCAN_CACHE_FILE
 
+# Posting is a read-modify-write of the scan cache; concurrent posts would lose each other's alert
+_post_lock = threading.Lock()
+
 def post_disaster_alert(location: str, summary: str, severity: int, disaster_type: str = "General"):
     """
     Posts a disaster alert to the public Bounty Board.
@@ -18,10 +23,6 @@ def post_disaster_alert(location: str, summary: str, severity: int, disaster_typ
         str: Result message.
     """
     try:
-        # Load existing cache
-        cache = load_scan_cache()
-        scan_results = cache.get("scan_results", [])
-        
         # Create new entry
         new_alert = {
             "location": location,
@@ -33,16 +34,20 @@ def post_disaster_alert(location: str, summary: str, severity: int, disaster_typ
             "timestamp": datetime.datetime.now().isoformat()
         }
         
-        # Append and save
-        scan_results.insert(0, new_alert) # Add to top
-        save_scan_cache(scan_results, cache.get("last_scan_time"))
+        # Load, append and save
+        with _post_lock:
+            cache = load_scan_cache()
+            scan_results = cache.get("scan_results", [])
+            scan_results.insert(0, new_alert) # Add to top
+            save_scan_cache(scan_results, cache.get("last_scan_time"))
         
-        # Try to update session state if available (for immediate UI update)
-        try:
+        # Update session state for an immediate UI update; tool threads have no
+        # Streamlit session, and pages pick the alert up from the scan cache instead
+        if get_script_run_ctx(suppress_warning=True) is not None:
             if "scan_results" in st.session_state:
                 st.session_state.scan_results.insert(0, new_alert)
-        except:
-            pass
+        else:
+            print(f"Posted alert for {location} outside a Streamlit session; it shows on the next cache load.")
             
         return f"Successfully posted alert for {location} to the Bounty Board."
     except Exception as e:
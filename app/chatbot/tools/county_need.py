@@ -0,0 +1,55 @@
+from app.prediction.need_index import load_need_index, top_need_counties
+from app.chatbot.tools.openfema import _area_key
+
+def get_county_need_index(state=None, county=None, limit=10):
+    """
+    Rank counties by the precomputed FEMA need index (see app/prediction/need_index.py).
+
+    Answered from a local table, so one call covers a whole state or the country.
+    
+    Args:
+        state (str): Optional two-letter state code, e.g. 'TN'.
+        county (str): Optional county name within the state, e.g. 'Davidson'.
+        limit (int): Maximum number of counties to return.
+        
+    Returns:
+        dict: {"summary": str, "visuals": chart or None}
+    """
+    if not load_need_index():
+        return {
+            "summary": "The county need index has not been built yet (run `python -m app.prediction.need_index build`).",
+            "visuals": None
+        }
+
+    counties = top_need_counties(state=state, limit=None)
+    if county:
+        counties = [row for row in counties if _area_key(row["county"]) == _area_key(county)]
+    counties = counties[:limit]
+    where = " ".join(part for part in (county, state) if part) or "the US"
+    if not counties:
+        return {
+            "summary": f"No FEMA housing assistance need data found for {where}.",
+            "visuals": None
+        }
+
+    result = f"County need index for {where} (0-10, from FEMA housing assistance, recent disasters weigh more):\n"
+    chart_data = []
+    for row in counties:
+        result += (f"- {row['county']}, {row['state']} (FIPS {row['fips']}): need index {row['need_index']}, "
+                   f"${row['approved_dollars']:,.0f} approved for {row['registrations']:,} registrations "
+                   f"across {row['disasters']} disaster(s), latest declared {row['last_declaration']}.\n")
+        # Same columns as the assistance chart, which the chat pages know how to draw
+        chart_data.append({
+            "Location": f"{row['county']}, {row['state']}",
+            "Approved Funding ($)": row["approved_dollars"],
+            "Registrations": row["registrations"],
+            "Need Index": row["need_index"],
+        })
+
+    return {
+        "summary": result,
+        "visuals": {
+            "type": "chart",
+            "data": chart_data
+        }
+    }
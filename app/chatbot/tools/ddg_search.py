@@ -1,67 +1,87 @@
-from ddgs import DDGS
-import streamlit as st
+from app.transport import run_in_thread
+from app.singleflight import coalesce
+from app.chatbot.tools.ddg_store import search, DDG_FETCH_RESULTS
 
-@st.cache_data
-def get_search(query: str) -> str:
+def _format_results(results, query):
+    if not results:
+        return f"No recent results found for '{query}'."
+        
+    formatted_results = []
+    for r in results:
+        title = r.get('title', 'No Title')
+        link = r.get('url', r.get('href', 'No Link'))
+        date = r.get('date', 'No Date')
+        snippet = r.get('body', r.get('snippet', 'No Snippet'))
+        source = r.get('source', 'Unknown Source')
+        formatted_results.append(f"Title: {title}\nSource: {source}\nDate: {date}\nLink: {link}\nSnippet: {snippet}")
+        
+    return "\n\n".join(formatted_results)
+
+def _clamp_results(max_results):
+    try:
+        return max(1, min(int(max_results), DDG_FETCH_RESULTS))
+    except (TypeError, ValueError):
+        return DDG_FETCH_RESULTS
+
+def _search(query, max_results=DDG_FETCH_RESULTS):
+    try:
+        results = search("text", query, _clamp_results(max_results))
+        return _format_results(results, query)
+        
+    except Exception as e:
+        return f"Error performing DuckDuckGo search: {str(e)}"
+
+def _news_search(query, max_results=DDG_FETCH_RESULTS):
+    try:
+        results = search("news", query, _clamp_results(max_results))
+        return _format_results(results, query)
+        
+    except Exception as e:
+        return f"Error performing DuckDuckGo search: {str(e)}"
+
+# Results are cached (with a TTL and URL dedupe) in ddg_store, not @memoize
+@coalesce
+def get_search(query: str, max_results: int = DDG_FETCH_RESULTS) -> str:
     """
-    Search DuckDuckGo for a given query and return recent results (past week).
+    Search DuckDuckGo for a given query and return recent results (past month).
     
     Args:
         query (str): The search query.
+        max_results (int): How many results to return (1-30).
     
     Returns:
         str: A formatted string of the top search results.
     """
-    try:
-        results = DDGS().text(query=query, region="wt-wt", safesearch="off", timelimit="m", max_results=30)
-        # print(results)
-        if not results:
-            return f"No recent results found for '{query}'."
-            
-        formatted_results = []
-        for r in results:
-            title = r.get('title', 'No Title')
-            link = r.get('url', r.get('href', 'No Link'))
-            date = r.get('date', 'No Date')
-            snippet = r.get('body', r.get('snippet', 'No Snippet'))
-            source = r.get('source', 'Unknown Source')
-            formatted_results.append(f"Title: {title}\nSource: {source}\nDate: {date}\nLink: {link}\nSnippet: {snippet}")
-            
-        return "\n\n".join(formatted_results)
-        
-    except Exception as e:
-        return f"Error performing DuckDuckGo search: {str(e)}"
+    return _search(query, max_results)
 
-@st.cache_data
-def get_news_search(query: str) -> str:
+@coalesce
+def get_news_search(query: str, max_results: int = DDG_FETCH_RESULTS) -> str:
     """
-    Search DuckDuckGo News for a given query and return recent results (past week).
+    Search DuckDuckGo News for a given query and return recent results (past month).
     
     Args:
         query (str): The search query.
+        max_results (int): How many results to return (1-30).
     
     Returns:
         str: A formatted string of the top search results.
     """
-    try:
-        results = DDGS().news(query=query, region="wt-wt", safesearch="off", timelimit="m", max_results=30)
-        # print(results)
-        if not results:
-            return f"No recent results found for '{query}'."
-            
-        formatted_results = []
-        for r in results:
-            title = r.get('title', 'No Title')
-            link = r.get('url', r.get('href', 'No Link'))
-            date = r.get('date', 'No Date')
-            snippet = r.get('body', r.get('snippet', 'No Snippet'))
-            source = r.get('source', 'Unknown Source')
-            formatted_results.append(f"Title: {title}\nSource: {source}\nDate: {date}\nLink: {link}\nSnippet: {snippet}")
-            
-        return "\n\n".join(formatted_results)
-        
-    except Exception as e:
-        return f"Error performing DuckDuckGo search: {str(e)}"
+    return _news_search(query, max_results)
+
+@coalesce
+async def get_search_async(query: str, max_results: int = DDG_FETCH_RESULTS) -> str:
+    """
+    Async variant of get_search. The ddgs client is blocking, so the search runs
+    in a worker thread under the shared async concurrency bound.
+    """
+    return await run_in_thread(_search, query, max_results)
+
+@coalesce
+async def get_news_search_async(query: str, max_results: int = DDG_FETCH_RESULTS) -> str:
+    """
+    Async variant of get_news_search.
+    """
+    return await run_in_thread(_news_search, query, max_results)
 
 if __name__ == "__main__":
-    print(searc("Tennessee"))
+    print(get_search("Tennessee"))
@@ -0,0 +1,178 @@
+"""
+Rate-limited DuckDuckGo client with a shared result store.
+
+Every search goes through one token bucket, so bursts of tool calls and scan
+queries are spaced out instead of getting the whole app throttled. Results are
+normalized into articles and stored once per URL (tracking parameters and
+"www." ignored), so the same story found by several queries is kept once.
+A query is answered from the store for RESULT_TTL_SECONDS; queries that only
+differ in case, spacing or word order share an entry. When DuckDuckGo is
+unavailable, the last results for a query are served for up to
+STALE_MAX_AGE_SECONDS.
+"""
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, urlencode, parse_qsl
+
+from ddgs import DDGS
+from ddgs.exceptions import RatelimitException, TimeoutException
+
+from app.replay import replay_call
+from app.resilience import TokenBucket, get_circuit_breaker, budget_timeout
+
+DDG_TIMEOUT = 10  # seconds
+DDG_FETCH_RESULTS = 30  # Always fetch this many, callers slice what they need
+RESULT_TTL_SECONDS = 900
+STALE_MAX_AGE_SECONDS = 24 * 3600
+
+# DuckDuckGo starts throttling at roughly one request per second sustained
+DDG_RATE_PER_SECOND = 0.5
+DDG_BURST = 3
+DDG_MAX_WAIT_SECONDS = 20
+
+_bucket = TokenBucket(DDG_RATE_PER_SECOND, DDG_BURST)
+
+
+def _ddg_call(method, query):
+    """
+    Runs one ddgs search ('text' or 'news') behind the rate limiter and the DuckDuckGo circuit breaker.
+    """
+    def search():
+        _bucket.acquire(DDG_MAX_WAIT_SECONDS)
+        # ddgs takes whole seconds; stay within the caller's remaining time budget
+        ddgs = DDGS(timeout=max(1, int(budget_timeout(DDG_TIMEOUT))))
+        return getattr(ddgs, method)(query=query, region="wt-wt", safesearch="off", timelimit="m",
+                                     max_results=DDG_FETCH_RESULTS)
+
+    # "No results" is also raised as an exception, so only rate limits and timeouts trip the breaker
+    breaker = get_circuit_breaker("duckduckgo.com")
+    return replay_call("ddg", {"method": method, "query": query},
+                       lambda: breaker.call(search, failures=(RatelimitException, TimeoutException)))
+
+
+def query_key(query):
+    """
+    Normalizes a query so reordered or re-cased variants share one store entry.
+    """
+    return " ".join(sorted(set(query.lower().split())))
+
+
+def url_key(url):
+    """
+    Normalizes an article URL for deduplication: no scheme, "www.", fragment,
+    trailing slash or utm_* parameters.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not k.lower().startswith("utm_")])
+    return urlunsplit(("", host, parts.path.rstrip("/"), query, "")).lstrip("/")
+
+
+def normalize_article(result):
+    """
+    Maps a ddgs text or news result onto {"title", "url", "date", "body", "source"}, or None without a URL.
+    """
+    url = result.get("url") or result.get("href")
+    if not url:
+        return None
+    return {
+        "title": result.get("title", "No Title"),
+        "url": url,
+        "date": result.get("date", "No Date"),
+        "body": result.get("body") or result.get("snippet") or "No Snippet",
+        "source": result.get("source", "Unknown Source"),
+    }
+
+
+# Defaults normalize_article fills in for missing fields
+_PLACEHOLDERS = (None, "No Title", "No Date", "No Snippet", "Unknown Source")
+
+_queries = {}  # (method, query key) -> (fetched_at, [url keys])
+_articles = {}  # url key -> article
+_store_lock = threading.Lock()
+_stats = {"searches": 0, "upstream": 0, "stale": 0}
+
+
+def _store_results(key, results):
+    keys = []
+    with _store_lock:
+        for result in results or []:
+            article = normalize_article(result)
+            if article is None:
+                continue
+            k = url_key(article["url"])
+            if k in keys:
+                continue
+            known = _articles.get(k)
+            # Keep what other queries already learned about the article, fill in the gaps
+            if known:
+                article = {field: value if value not in _PLACEHOLDERS else known[field]
+                           for field, value in article.items()}
+            _articles[k] = article
+            keys.append(k)
+        _queries[key] = (time.time(), keys)
+        _prune()
+    return keys
+
+
+def _prune():
+    # Called with _store_lock held
+    now = time.time()
+    for key in [k for k, (fetched_at, _) in _queries.items() if now - fetched_at > STALE_MAX_AGE_SECONDS]:
+        del _queries[key]
+    referenced = {k for _, keys in _queries.values() for k in keys}
+    for k in [k for k in _articles if k not in referenced]:
+        del _articles[k]
+
+
+def _count(stat):
+    with _store_lock:
+        _stats[stat] += 1
+
+
+def _articles_for(keys, max_results):
+    with _store_lock:
+        return [_articles[k] for k in keys[:max_results] if k in _articles]
+
+
+def search(method, query, max_results=DDG_FETCH_RESULTS):
+    """
+    Returns up to max_results articles for a query, from the store when possible.
+
+    Args:
+        method (str): 'text' for web search, 'news' for DuckDuckGo News.
+        query (str): The search query.
+        max_results (int): How many articles to return (at most DDG_FETCH_RESULTS).
+
+    Returns:
+        list: Article dicts, best match first.
+    """
+    key = (method, query_key(query))
+    with _store_lock:
+        _stats["searches"] += 1
+        cached = _queries.get(key)
+    if cached and time.time() - cached[0] < RESULT_TTL_SECONDS:
+        return _articles_for(cached[1], max_results)
+
+    try:
+        _count("upstream")
+        results = _ddg_call(method, query)
+    except Exception as e:
+        # Keep serving the last results while DuckDuckGo is throttling us or unreachable
+        if cached is None:
+            raise
+        _count("stale")
+        print(f"Serving DuckDuckGo results for '{query}' from {int(time.time() - cached[0])}s ago: {e}")
+        return _articles_for(cached[1], max_results)
+    return _articles_for(_store_results(key, results), max_results)
+
+
+def get_store_stats():
+    """
+    Returns search counts (total, sent upstream, served stale) and the store size.
+    """
+    with _store_lock:
+        return dict(_stats, queries=len(_queries), articles=len(_articles))
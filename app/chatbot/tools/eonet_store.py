@@ -0,0 +1,189 @@
+"""
+Shared store of NASA EONET natural events.
+
+The heatmap layer and the chatbot tool both read from here, so EONET is
+fetched and parsed once per refresh interval instead of once per consumer.
+Only events inside the US bounding box are requested, and each event is kept
+as an EonetEvent with its full geometry track.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from app.transport import http_get, async_http_get
+from app.singleflight import coalesce
+
+EONET_EVENTS_URL = "https://eonet.gsfc.nasa.gov/api/v3/events"
+REFRESH_INTERVAL_SECONDS = 900  # Matches the EONET policy in app/http_cache.py
+STORE_DAYS = 90  # How far back the store looks; tools filter shorter windows locally
+
+# EONET bbox is min lon, max lat, max lon, min lat; covers Alaska, Hawaii and the lower 48
+US_BBOX = (-180.0, 72.0, -64.0, 17.0)
+
+# Severity mapping based on EONET categories
+EONET_SEVERITY_SCORES = {
+    "Severe Storms": 10,
+    "Wildfires": 9,
+    "Floods": 9,
+    "Earthquakes": 10,
+    "Volcanoes": 8,
+    "Landslides": 7,
+    "Temp Extremes": 6,
+    "Sea and Lake Ice": 4,
+    "Drought": 5,
+}
+DEFAULT_EONET_SEVERITY = 5
+
+
+@dataclass
+class EonetEvent:
+    """
+    One EONET event with every geometry reported for it, oldest first.
+    """
+    id: str
+    title: str
+    categories: list = field(default_factory=list)
+    sources: list = field(default_factory=list)  # [{"id": ..., "url": ...}]
+    geometries: list = field(default_factory=list)  # [{"date": ..., "type": ..., "coordinates": ...}]
+    closed: str = None
+
+    @classmethod
+    def from_api(cls, event):
+        return cls(
+            id=event.get("id"),
+            title=event.get("title", "Unknown Event"),
+            categories=[cat.get("title", "") for cat in event.get("categories", [])],
+            sources=[{"id": src.get("id", ""), "url": src.get("url")} for src in event.get("sources", [])],
+            geometries=sorted(event.get("geometry", []), key=lambda geo: geo.get("date") or ""),
+            closed=event.get("closed"),
+        )
+
+    @property
+    def latest_geometry(self):
+        return self.geometries[-1] if self.geometries else None
+
+    @property
+    def last_date(self):
+        geometry = self.latest_geometry
+        return geometry.get("date") if geometry else None
+
+    @property
+    def latest_point(self):
+        """
+        Returns (lat, lon) of the latest geometry (a polygon's first vertex), or None.
+        """
+        geometry = self.latest_geometry
+        if not geometry:
+            return None
+        coords = geometry.get("coordinates", [])
+        if geometry.get("type") == "Polygon" and coords and coords[0]:
+            coords = coords[0][0]
+        if len(coords) >= 2:
+            return coords[1], coords[0]
+        return None
+
+    @property
+    def source_url(self):
+        return self.sources[0]["url"] if self.sources else None
+
+    @property
+    def severity(self):
+        return max([EONET_SEVERITY_SCORES.get(cat, DEFAULT_EONET_SEVERITY) for cat in self.categories],
+                   default=DEFAULT_EONET_SEVERITY)
+
+    def is_recent(self, days):
+        if not self.last_date:
+            return False
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        return datetime.fromisoformat(self.last_date.replace("Z", "+00:00")) >= cutoff
+
+
+def _events_params(status):
+    return {"status": status, "days": STORE_DAYS, "bbox": ",".join(str(v) for v in US_BBOX)}
+
+
+def _parse_events(data):
+    events = [EonetEvent.from_api(event) for event in data.get("events", [])]
+    # Newest activity first
+    return sorted(events, key=lambda e: e.last_date or "", reverse=True)
+
+
+_events = {}  # status -> (fetched_at, [EonetEvent])
+_events_lock = threading.Lock()
+
+
+def _fresh_events(status):
+    cached = _events.get(status)
+    if cached and time.time() - cached[0] < REFRESH_INTERVAL_SECONDS:
+        return cached[1]
+    return None
+
+
+def _stale_events_or_raise(status, e):
+    # Keep serving the last fetch while EONET is unreachable
+    cached = _events.get(status)
+    if cached is None:
+        raise e
+    print(f"Serving EONET events from {int(time.time() - cached[0])}s ago: {e}")
+    return cached[1]
+
+
+def get_eonet_events(status="open"):
+    """
+    Returns the US EONET events with the given status ('open' or 'closed'), newest first.
+    """
+    events = _fresh_events(status)
+    if events is not None:
+        return events
+    with _events_lock:
+        events = _fresh_events(status)
+        if events is not None:
+            return events
+        try:
+            response = http_get(EONET_EVENTS_URL, params=_events_params(status))
+            response.raise_for_status()
+            events = _parse_events(response.json())
+        except Exception as e:
+            return _stale_events_or_raise(status, e)
+        _events[status] = (time.time(), events)
+        return events
+
+
+@coalesce
+async def get_eonet_events_async(status="open"):
+    """
+    Async variant of get_eonet_events. Concurrent refreshes for a status share one request.
+    """
+    events = _fresh_events(status)
+    if events is not None:
+        return events
+    try:
+        response = await async_http_get(EONET_EVENTS_URL, params=_events_params(status))
+        response.raise_for_status()
+        events = _parse_events(response.json())
+    except Exception as e:
+        return _stale_events_or_raise(status, e)
+    _events[status] = (time.time(), events)
+    return events
+
+
+def events_for_map(events):
+    """
+    Converts events into the point entries the heatmap draws.
+    """
+    map_events = []
+    for event in events:
+        point = event.latest_point
+        if point is None:
+            continue
+        lat, lon = point
+        map_events.append({
+            "lat": lat,
+            "lon": lon,
+            "severity": event.severity,
+            "location": event.title,
+            "text": f"NASA EONET Alert: {event.title}. Source: {event.source_url or 'N/A'}",
+            "source": "NASA EONET"
+        })
+    return map_events
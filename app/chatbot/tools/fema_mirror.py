@@ -0,0 +1,153 @@
+"""
+Local mirror of the OpenFEMA datasets the chatbot and scanner query.
+
+OpenFEMA datasets change slowly, so instead of hitting the live API on every
+chat turn and scan cell they can be mirrored into local Parquet files:
+
+    python -m app.chatbot.tools.fema_mirror sync          # incremental sync
+    python -m app.chatbot.tools.fema_mirror sync --full   # re-download everything
+
+The first sync downloads each dataset in full. Later syncs only pull records
+whose lastRefresh is newer than the newest one already mirrored, and upsert
+them by record id. Records FEMA deletes upstream are only dropped by a --full
+sync, so schedule one occasionally.
+"""
+import argparse
+import datetime
+import json
+import os
+
+import pandas as pd
+
+from app.chatbot.tools import openfema
+
+MIRROR_DIR = os.path.join("data", "fema_mirror")
+SYNC_STATE_FILE = os.path.join(MIRROR_DIR, "sync_state.json")
+PAGE_SIZE = 10000  # OpenFEMA's maximum $top
+# Mirrors older than this are ignored and the tools fall back to the live API
+MIRROR_MAX_AGE_SECONDS = 2 * 86400
+
+DATASETS = {
+    "DisasterDeclarationsSummaries": "https://www.fema.gov/api/open/v2/DisasterDeclarationsSummaries",
+    "HousingAssistanceOwners": "https://www.fema.gov/api/open/v2/HousingAssistanceOwners",
+}
+
+_loaded = {}
+
+
+def _dataset_path(name):
+    return os.path.join(MIRROR_DIR, f"{name}.parquet")
+
+
+def load_sync_state():
+    if os.path.exists(SYNC_STATE_FILE):
+        try:
+            with open(SYNC_STATE_FILE, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable FEMA mirror state: {e}")
+    return {}
+
+
+def _fetch_records(name, filter_query=None):
+    """
+    Downloads every record of a dataset (optionally filtered), page by page.
+    """
+    records = []
+    # Bulk pages are large and must not go through the response cache
+    pages = openfema.iter_openfema_records(DATASETS[name], name, filter_query=filter_query, orderby="id",
+                                           page_size=PAGE_SIZE, timeout=120, use_cache=False)
+    for record in pages:
+        records.append(record)
+        if len(records) % PAGE_SIZE == 0:
+            print(f"{name}: fetched {len(records)} records...")
+    return records
+
+
+def sync_dataset(name, full=False):
+    """
+    Brings the local mirror of one dataset up to date.
+
+    Returns:
+        int: Number of records fetched from OpenFEMA.
+    """
+    os.makedirs(MIRROR_DIR, exist_ok=True)
+    state = load_sync_state()
+    path = _dataset_path(name)
+    last_refresh = state.get(name, {}).get("last_refresh")
+    incremental = not full and last_refresh and os.path.exists(path)
+
+    filter_query = f"lastRefresh gt '{last_refresh}'" if incremental else None
+    records = _fetch_records(name, filter_query)
+    fetched = pd.DataFrame(records)
+
+    if incremental:
+        existing = pd.read_parquet(path)
+        df = pd.concat([existing, fetched], ignore_index=True) if not fetched.empty else existing
+        df = df.drop_duplicates(subset="id", keep="last")
+    else:
+        df = fetched
+
+    tmp_path = f"{path}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    state[name] = {
+        "last_refresh": df["lastRefresh"].max() if "lastRefresh" in df.columns and not df.empty else last_refresh,
+        "synced_at": datetime.datetime.now().isoformat(),
+        "rows": len(df),
+    }
+    tmp_state = f"{SYNC_STATE_FILE}.tmp"
+    with open(tmp_state, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_state, SYNC_STATE_FILE)
+    print(f"{name}: {len(fetched)} records fetched, {len(df)} mirrored.")
+    return len(fetched)
+
+
+def load_dataset(name):
+    """
+    Returns the mirrored dataset as a DataFrame, or None if there is no recent mirror.
+    The frame is kept in memory until the Parquet file changes.
+    """
+    path = _dataset_path(name)
+    if not os.path.exists(path):
+        return None
+
+    synced_at = load_sync_state().get(name, {}).get("synced_at")
+    if not synced_at:
+        return None
+    age = (datetime.datetime.now() - datetime.datetime.fromisoformat(synced_at)).total_seconds()
+    if age > MIRROR_MAX_AGE_SECONDS:
+        return None
+
+    mtime = os.path.getmtime(path)
+    cached = _loaded.get(name)
+    if cached is None or cached[0] != mtime:
+        _loaded[name] = (mtime, _add_derived_columns(name, pd.read_parquet(path)))
+    return _loaded[name][1]
+
+
+def _add_derived_columns(name, df):
+    # Normalized county names, computed once per load instead of on every county query
+    if name == "DisasterDeclarationsSummaries" and "designatedArea" in df.columns:
+        df["area_key"] = df["designatedArea"].map(openfema._area_key)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mirror OpenFEMA datasets locally.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    sync_parser = subparsers.add_parser("sync", help="Download new or updated records.")
+    sync_parser.add_argument("--full", action="store_true", help="Re-download the datasets from scratch.")
+    sync_parser.add_argument("--dataset", choices=sorted(DATASETS), action="append",
+                             help="Only sync this dataset (can be repeated).")
+    args = parser.parse_args()
+
+    if args.command == "sync":
+        for name in args.dataset or DATASETS:
+            sync_dataset(name, full=args.full)
+
+
+if __name__ == "__main__":
+    main()
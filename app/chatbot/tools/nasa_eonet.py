@@ -1,10 +1,13 @@
-import requests
-import streamlit as st
+from app.chatbot.tools.eonet_store import get_eonet_events, get_eonet_events_async
+from app.singleflight import coalesce
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
+@coalesce
 def get_nasa_eonet_events(limit=10, days=20, status='open'):
     """
     Fetch natural events from the NASA EONET v3 API.
+
+    Served from the shared EONET store (see eonet_store.py), which the heatmap
+    also reads, so this does not make a request of its own.
     
     Args:
         limit (int): Maximum number of events to return.
@@ -15,61 +18,23 @@ def get_nasa_eonet_events(limit=10, days=20, status='open'):
         str: A formatted summary of the latest events.
     """
     try:
-        url = "https://eonet.gsfc.nasa.gov/api/v3/events"
-        params = {
-            "limit": limit,
-            "days": days,
-            "status": status
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
+        events = get_eonet_events(status)
+        return summarize_eonet_events(select_events(events, limit, days), days, status)
         
-        data = response.json()
-        events = data.get("events", [])
-        
-        if not events:
-            return {
-                "summary": f"No {status} natural events found in the last {days} days.",
-                "visuals": None
-            }
-            
-        summaries = []
-        map_data = []
-        for event in events:
-            title = event.get("title", "Unknown Event")
-            categories = ", ".join([cat.get("title", "") for cat in event.get("categories", [])])
-            source = ", ".join([src.get("id", "") for src in event.get("sources", [])])
-            link = event.get("sources", [{}])[0].get("url", "No source link available")
-            
-            # Get latest geometry (location)
-            geometries = event.get("geometry", [])
-            location_info = "Location data unavailable"
-            lat, lon = None, None
-            if geometries:
-                latest_geo = geometries[0]
-                coords = latest_geo.get("coordinates", [])
-                date = latest_geo.get("date", "Unknown Date")
-                if len(coords) >= 2:
-                    lon, lat = coords[0], coords[1]
-                    location_info = f"Coordinates: {lat}, {lon} (Lat/Lon) at {date}"
-                    map_data.append({"lat": lat, "lon": lon, "name": title})
-            
-            summaries.append(
-                f"Event: {title}\n"
-                f"Categories: {categories}\n"
-                f"Source: {source}\n"
-                f"{location_info}\n"
-                f"More info: {link}"
-            )
-            
+    except Exception as e:
         return {
-            "summary": "\n\n---\n\n".join(summaries),
-            "visuals": {
-                "type": "map",
-                "data": map_data
-            } if map_data else None
+            "summary": f"Error fetching NASA EONET events: {str(e)}",
+            "visuals": None
         }
+
+@coalesce
+async def get_nasa_eonet_events_async(limit=10, days=20, status='open'):
+    """
+    Async variant of get_nasa_eonet_events; returns the same dict shape.
+    """
+    try:
+        events = await get_eonet_events_async(status)
+        return summarize_eonet_events(select_events(events, limit, days), days, status)
         
     except Exception as e:
         return {
@@ -77,6 +42,53 @@ def get_nasa_eonet_events(limit=10, days=20, status='open'):
             "visuals": None
         }
 
+def select_events(events, limit, days):
+    """
+    The newest `limit` events with activity in the last `days` days.
+    """
+    return [event for event in events if event.is_recent(days)][:limit]
+
+def summarize_eonet_events(events, days, status):
+    """
+    Build the chatbot summary and map for a list of EonetEvent records.
+    """
+    if not events:
+        return {
+            "summary": f"No {status} natural events found in the last {days} days.",
+            "visuals": None
+        }
+        
+    summaries = []
+    map_data = []
+    for event in events:
+        categories = ", ".join(event.categories)
+        source = ", ".join([src["id"] for src in event.sources])
+        link = event.source_url or "No source link available"
+        
+        # Get latest geometry (location)
+        location_info = "Location data unavailable"
+        point = event.latest_point
+        if point:
+            lat, lon = point
+            location_info = f"Coordinates: {lat}, {lon} (Lat/Lon) at {event.last_date or 'Unknown Date'}"
+            map_data.append({"lat": lat, "lon": lon, "name": event.title})
+        
+        summaries.append(
+            f"Event: {event.title}\n"
+            f"Categories: {categories}\n"
+            f"Source: {source}\n"
+            f"{location_info}\n"
+            f"More info: {link}"
+        )
+        
+    return {
+        "summary": "\n\n---\n\n".join(summaries),
+        "visuals": {
+            "type": "map",
+            "data": map_data
+        } if map_data else None
+    }
+
 if __name__ == "__main__":
     # Test fetch
     print(get_nasa_eonet_events(limit=3))
@@ -1,10 +1,49 @@
-import requests
-import streamlit as st
+from app.chatbot.tools.nws_snapshot import get_alert_snapshot, get_alert_snapshot_async
+from app.memo import memoize
+from app.singleflight import coalesce
 
-@st.cache_data
+def summarize_nws_alerts(data, lat, lon):
+    """
+    Build the chatbot summary and map for an NWS alerts GeoJSON response.
+    """
+    features = data.get("features", [])
+    
+    if not features:
+        return {
+            "summary": f"No active NWS alerts for the location ({lat}, {lon}).",
+            "visuals": None
+        }
+        
+    alert_summaries = []
+    map_data = [{"lat": lat, "lon": lon, "name": "Query Location"}]
+    for feature in features:
+        properties = feature.get("properties", {})
+        event = properties.get("event", "Unknown Event")
+        headline = properties.get("headline", "No Headline")
+        severity = properties.get("severity", "Unknown Severity")
+        area = properties.get("areaDesc", "Unknown Area")
+        description = properties.get("description", "No Description")
+        
+        alert_summaries.append(
+            f"Event: {event}\nSeverity: {severity}\nArea: {area}\nHeadline: {headline}"
+        )
+        
+    return {
+        "summary": "\n\n---\n\n".join(alert_summaries),
+        "visuals": {
+            "type": "map",
+            "data": map_data
+        }
+    }
+
+@memoize(ttl=60, backend="sqlite")  # Alerts change quickly, refresh every minute
+@coalesce
 def get_nws_alerts(lat, lon):
     """
     Fetch active weather alerts from the National Weather Service (NWS) API for a given location.
+
+    Answered from the nationwide alert snapshot (see nws_snapshot.py), so no
+    request is made per location.
     
     Args:
         lat (float): Latitude of the location.
@@ -14,45 +53,24 @@ def get_nws_alerts(lat, lon):
         str: A summary of active alerts or a "no alerts" message.
     """
     try:
-        # User-Agent is required by NWS API
-        headers = {
-            "User-Agent": "FlashFloodPredictionApp/1.0 (contact: dominick@example.com)"
-        }
-        url = f"https://api.weather.gov/alerts/active?point={lat},{lon}"
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        snapshot = get_alert_snapshot()
+        return summarize_nws_alerts({"features": snapshot.alerts_at(lat, lon)}, lat, lon)
         
-        data = response.json()
-        features = data.get("features", [])
-        
-        if not features:
-            return {
-                "summary": f"No active NWS alerts for the location ({lat}, {lon}).",
-                "visuals": None
-            }
-            
-        alert_summaries = []
-        map_data = [{"lat": lat, "lon": lon, "name": "Query Location"}]
-        for feature in features:
-            properties = feature.get("properties", {})
-            event = properties.get("event", "Unknown Event")
-            headline = properties.get("headline", "No Headline")
-            severity = properties.get("severity", "Unknown Severity")
-            area = properties.get("areaDesc", "Unknown Area")
-            description = properties.get("description", "No Description")
-            
-            alert_summaries.append(
-                f"Event: {event}\nSeverity: {severity}\nArea: {area}\nHeadline: {headline}"
-            )
-            
+    except Exception as e:
         return {
-            "summary": "\n\n---\n\n".join(alert_summaries),
-            "visuals": {
-                "type": "map",
-                "data": map_data
-            }
+            "summary": f"Error fetching NWS alerts: {str(e)}",
+            "visuals": None
         }
+
+@memoize(ttl=60, backend="sqlite")
+@coalesce
+async def get_nws_alerts_async(lat, lon):
+    """
+    Async variant of get_nws_alerts; returns the same dict shape.
+    """
+    try:
+        snapshot = await get_alert_snapshot_async()
+        return summarize_nws_alerts({"features": snapshot.alerts_at(lat, lon)}, lat, lon)
         
     except Exception as e:
         return {
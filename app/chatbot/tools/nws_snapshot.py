@@ -0,0 +1,266 @@
+"""
+Nationwide snapshot of active NWS alerts with a spatial index.
+
+Instead of calling /alerts/active?point= once per coordinate, every active
+alert in the US is fetched in one request and its polygon is put in a shapely
+STRtree, so point, bulk-point and H3-cell queries are answered locally. Many
+alerts (e.g. winter storm or heat advisories) carry no polygon of their own and
+only list the forecast/county zones they cover; those are resolved through the
+zone geometries, which are fetched once and cached (zones almost never change).
+
+The snapshot is refreshed when it is older than SNAPSHOT_MAX_AGE_SECONDS.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import h3
+from shapely import STRtree
+from shapely.geometry import Point, Polygon, shape
+from shapely.ops import unary_union
+
+from app.transport import http_get, async_http_get, run_in_thread, POOL_MAXSIZE_PER_HOST
+
+ACTIVE_ALERTS_URL = "https://api.weather.gov/alerts/active"
+SNAPSHOT_MAX_AGE_SECONDS = 180
+
+_zone_geometries = {}  # zone URL -> shapely geometry (None if the zone has none)
+_snapshot = None
+_snapshot_lock = threading.Lock()
+_async_snapshot_locks = weakref.WeakKeyDictionary()  # event loop -> asyncio.Lock
+_refresh_thread = None
+_refresh_thread_lock = threading.Lock()
+
+
+def alert_geometry(feature, zone_geometries):
+    """
+    Returns the area an alert covers: its own polygon, or the union of its affected zones.
+
+    Returns:
+        shapely geometry|None: None if the alert cannot be placed on the map.
+    """
+    if feature.get("geometry"):
+        return shape(feature["geometry"])
+    zones = feature.get("properties", {}).get("affectedZones", [])
+    geometries = [zone_geometries[zone] for zone in zones if zone_geometries.get(zone) is not None]
+    return unary_union(geometries) if geometries else None
+
+
+def _cell_polygon(cell):
+    # h3 returns (lat, lng) pairs; shapely wants (x=lon, y=lat)
+    return Polygon([(lng, lat) for lat, lng in h3.cell_to_boundary(cell)])
+
+
+class AlertSnapshot:
+    """
+    All active NWS alerts at one point in time, indexed by the area they cover.
+    """
+    def __init__(self, features, zone_geometries=None, fetched_at=None):
+        self.features = features
+        self.fetched_at = fetched_at or time.time()
+        self.unlocated = 0  # alerts with neither a polygon nor a known zone
+        self._indexed = []
+        self._geometries = []
+        for feature in features:
+            geometry = alert_geometry(feature, zone_geometries or {})
+            if geometry is None or geometry.is_empty:
+                self.unlocated += 1
+                continue
+            self._geometries.append(geometry)
+            self._indexed.append(feature)
+        self._tree = STRtree(self._geometries)
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def located_alerts(self):
+        """
+        Returns (feature, geometry) for every alert that could be placed on the map.
+        """
+        return list(zip(self._indexed, self._geometries))
+
+    def _query(self, geometries):
+        matches = [[] for _ in geometries]
+        if not self._indexed or not geometries:
+            return matches
+        input_idx, alert_idx = self._tree.query(geometries, predicate="intersects")
+        for i, a in sorted(zip(input_idx.tolist(), alert_idx.tolist())):
+            matches[i].append(self._indexed[a])
+        return matches
+
+    def alerts_at(self, lat, lon):
+        """
+        Returns the alerts covering a point, in the order NWS listed them.
+        """
+        return self.alerts_at_points([(lat, lon)])[0]
+
+    def alerts_at_points(self, points):
+        """
+        Returns the alerts covering each (lat, lon) point, as one list per point.
+        """
+        return self._query([Point(lon, lat) for lat, lon in points])
+
+    def alerts_in_cell(self, cell):
+        """
+        Returns the alerts overlapping an H3 cell.
+        """
+        return self.alerts_in_cells([cell])[0]
+
+    def alerts_in_cells(self, cells):
+        """
+        Returns the alerts overlapping each H3 cell, as one list per cell.
+        """
+        return self._query([_cell_polygon(cell) for cell in cells])
+
+
+def _missing_zones(features):
+    zones = set()
+    for feature in features:
+        if not feature.get("geometry"):
+            zones.update(feature.get("properties", {}).get("affectedZones", []))
+    return [zone for zone in zones if zone not in _zone_geometries]
+
+
+def _zone_geometry(data):
+    geometry = data.get("geometry")
+    return shape(geometry) if geometry else None
+
+
+def _fetch_zone_geometry(zone_url):
+    response = http_get(zone_url)
+    response.raise_for_status()
+    return _zone_geometry(response.json())
+
+
+async def _fetch_zone_geometry_async(zone_url):
+    response = await async_http_get(zone_url)
+    response.raise_for_status()
+    return _zone_geometry(response.json())
+
+
+def _remember_zone(zone_url, geometry=None, error=None):
+    # Failed lookups are not remembered, so the next snapshot retries them
+    if error is not None:
+        print(f"Could not resolve NWS zone {zone_url}: {error}")
+    else:
+        _zone_geometries[zone_url] = geometry
+
+
+def load_alert_snapshot():
+    """
+    Fetches every active alert (plus any zone geometries not seen yet) and builds a snapshot.
+    """
+    response = http_get(ACTIVE_ALERTS_URL)
+    response.raise_for_status()
+    features = response.json().get("features", [])
+
+    missing = _missing_zones(features)
+    if missing:
+        with ThreadPoolExecutor(max_workers=POOL_MAXSIZE_PER_HOST) as pool:
+            # copy_context carries the caller's deadline into the worker threads
+            futures = {zone: pool.submit(contextvars.copy_context().run, _fetch_zone_geometry, zone)
+                       for zone in missing}
+        for zone, future in futures.items():
+            error = future.exception()
+            _remember_zone(zone, None if error else future.result(), error)
+    return AlertSnapshot(features, _zone_geometries)
+
+
+async def load_alert_snapshot_async():
+    """
+    Async variant of load_alert_snapshot.
+    """
+    response = await async_http_get(ACTIVE_ALERTS_URL)
+    response.raise_for_status()
+    # Parsing the nationwide feed and building the STRtree block, so they run off the event loop
+    features = await run_in_thread(lambda: response.json().get("features", []))
+
+    missing = _missing_zones(features)
+    results = await asyncio.gather(*(_fetch_zone_geometry_async(zone) for zone in missing), return_exceptions=True)
+    for zone, result in zip(missing, results):
+        if isinstance(result, Exception):
+            _remember_zone(zone, error=result)
+        else:
+            _remember_zone(zone, result)
+    return await run_in_thread(AlertSnapshot, features, dict(_zone_geometries))
+
+
+def _fresh_snapshot(max_age):
+    if _snapshot is not None and _snapshot.age < max_age:
+        return _snapshot
+    return None
+
+
+def _stale_snapshot_or_raise(e):
+    # Keep answering from the last snapshot while the API is unreachable
+    if _snapshot is None:
+        raise e
+    print(f"Serving NWS alert snapshot from {int(_snapshot.age)}s ago: {e}")
+    return _snapshot
+
+
+def get_alert_snapshot(max_age=SNAPSHOT_MAX_AGE_SECONDS):
+    """
+    Returns the shared alert snapshot, reloading it once it is older than max_age seconds.
+    """
+    global _snapshot
+    snapshot = _fresh_snapshot(max_age)
+    if snapshot is not None:
+        return snapshot
+    with _snapshot_lock:
+        snapshot = _fresh_snapshot(max_age)
+        if snapshot is not None:
+            return snapshot
+        try:
+            _snapshot = load_alert_snapshot()
+        except Exception as e:
+            return _stale_snapshot_or_raise(e)
+        return _snapshot
+
+
+def peek_alert_snapshot(max_age=SNAPSHOT_MAX_AGE_SECONDS):
+    """
+    Returns the last loaded snapshot (None before the first load) without waiting on the API.
+    A stale or missing snapshot is reloaded in a background thread for later callers.
+    """
+    global _refresh_thread
+    if _fresh_snapshot(max_age) is None:
+        with _refresh_thread_lock:
+            if _refresh_thread is None or not _refresh_thread.is_alive():
+                _refresh_thread = threading.Thread(target=_refresh_in_background, args=(max_age,),
+                                                   name="nws-snapshot-refresh", daemon=True)
+                _refresh_thread.start()
+    return _snapshot
+
+
+def _refresh_in_background(max_age):
+    try:
+        get_alert_snapshot(max_age)
+    except Exception as e:
+        print(f"Background NWS snapshot refresh failed: {e}")
+
+
+async def get_alert_snapshot_async(max_age=SNAPSHOT_MAX_AGE_SECONDS):
+    """
+    Async variant of get_alert_snapshot.
+    """
+    global _snapshot
+    snapshot = _fresh_snapshot(max_age)
+    if snapshot is not None:
+        return snapshot
+    loop = asyncio.get_running_loop()
+    lock = _async_snapshot_locks.setdefault(loop, asyncio.Lock())
+    async with lock:
+        # Conversations that waited on the lock get the snapshot the first one loaded
+        snapshot = _fresh_snapshot(max_age)
+        if snapshot is not None:
+            return snapshot
+        try:
+            _snapshot = await load_alert_snapshot_async()
+        except Exception as e:
+            return _stale_snapshot_or_raise(e)
+        return _snapshot
@@ -1,128 +1,431 @@
-from numpy import rint
-import requests
+import re
+from app.transport import http_get, async_http_get, run_in_thread
+from app.chatbot.tools import fema_mirror
+from app.singleflight import coalesce
 import json
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 
-def get_fema_disaster_declarations(state=None, county=None, days=360):
+DECLARATIONS_URL = "https://www.fema.gov/api/open/v2/DisasterDeclarationsSummaries"
+
+def format_designated_area(county):
     """
-    Fetch disaster declarations from OpenFEMA.
+    Format a county name the way OpenFEMA's designatedArea field spells it.
     """
-    base_url = "https://www.fema.gov/api/open/v2/DisasterDeclarationsSummaries"
-    
-    # Calculate date filter
-    # Use a longer window by default if none specified
+    # Format county as 'County Name (County)' for exact match
+    if "County" in county:
+        county_name = county.replace(" County", "")
+        return f"{county_name} (County)"
+    elif "Parish" in county:
+        county_name = county.replace(" Parish", "")
+        return f"{county_name} (Parish)"
+    return county
+
+@dataclass
+class FemaDeclaration:
+    """
+    One row of DisasterDeclarationsSummaries (one declared area of one disaster).
+    """
+    disaster_number: int
+    declaration_date: str
+    title: str
+    incident_type: str
+    state: str
+    designated_area: str
+
+    @classmethod
+    def from_api(cls, record):
+        return cls(
+            disaster_number=record.get('disasterNumber'),
+            declaration_date=(record.get('declarationDate') or 'N/A')[:10],
+            title=record.get('declarationTitle') or 'N/A',
+            incident_type=record.get('incidentType') or 'N/A',
+            state=(record.get('state') or '').upper(),
+            designated_area=record.get('designatedArea') or '',
+        )
+
+def distinct_disasters(declarations, limit=None):
+    """
+    Keep the first record of each disaster number, since one disaster is declared for many counties.
+    """
+    seen_disasters = set()
+    distinct = []
+    for dec in declarations:
+        if dec.disaster_number in seen_disasters:
+            continue
+        seen_disasters.add(dec.disaster_number)
+        distinct.append(dec)
+        if limit and len(distinct) >= limit:
+            break
+    return distinct
+
+def summarize_fema_declarations(declarations, state=None, county=None):
+    """
+    Build the chatbot summary for a list of FemaDeclaration records (newest first).
+    """
+    if not declarations:
+        return {
+            "summary": f"No recent FEMA disaster declarations found for {state or ''} {county or ''}.",
+            "visuals": None
+        }
+
+    result = "Recent FEMA Disaster Declarations:\n"
+    for dec in distinct_disasters(declarations, limit=5):
+        result += f"- {dec.declaration_date}: {dec.title} (Type: {dec.incident_type}, ID: {dec.disaster_number})\n"
+
+    return {
+        "summary": result,
+        "visuals": None # Generic declarations don't need a specific map/chart yet
+    }
+
+# Only the fields FemaDeclaration reads are requested ($select)
+DECLARATION_FIELDS = ["disasterNumber", "declarationDate", "declarationTitle", "incidentType", "state", "designatedArea"]
+DEFAULT_PAGE_SIZE = 100
+
+def _page_params(filter_query=None, select=None, orderby=None, top=DEFAULT_PAGE_SIZE, skip=0):
+    params = {"$top": top, "$skip": skip}
+    if filter_query:
+        params["$filter"] = filter_query
+    if select:
+        params["$select"] = ",".join(select)
+    if orderby:
+        params["$orderby"] = orderby
+    return params
+
+def iter_openfema_records(url, dataset, filter_query=None, select=None, orderby=None,
+                          page_size=DEFAULT_PAGE_SIZE, timeout=None, use_cache=True):
+    """
+    Stream the records of an OpenFEMA query, fetching $top/$skip pages only as they are consumed.
+
+    Args:
+        url (str): Dataset endpoint, e.g. DECLARATIONS_URL.
+        dataset (str): Name of the dataset (the key the records are returned under).
+        filter_query (str): Optional OData $filter expression.
+        select (list[str]): Optional fields to return ($select); all fields if omitted.
+        orderby (str): Optional $orderby expression.
+        page_size (int): Records per request (OpenFEMA allows up to 10000).
+        timeout (float): Optional timeout override per request.
+        use_cache (bool): Set False to bypass the HTTP disk cache.
+
+    Yields:
+        dict: One raw record at a time.
+    """
+    skip = 0
+    while True:
+        params = _page_params(filter_query, select, orderby, page_size, skip)
+        response = http_get(url, params=params, timeout=timeout, use_cache=use_cache)
+        response.raise_for_status()
+        page = response.json().get(dataset, [])
+        yield from page
+        if len(page) < page_size:
+            return
+        skip += page_size
+
+async def aiter_openfema_records(url, dataset, filter_query=None, select=None, orderby=None,
+                                 page_size=DEFAULT_PAGE_SIZE, timeout=None, use_cache=True):
+    """
+    Async variant of iter_openfema_records.
+    """
+    skip = 0
+    while True:
+        params = _page_params(filter_query, select, orderby, page_size, skip)
+        response = await async_http_get(url, params=params, timeout=timeout, use_cache=use_cache)
+        response.raise_for_status()
+        page = response.json().get(dataset, [])
+        for record in page:
+            yield record
+        if len(page) < page_size:
+            return
+        skip += page_size
+
+def _declarations_filter(state=None, county=None, days=360):
     date_limit = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%dT00:00:00.000Z')
     filters = [f"declarationDate ge '{date_limit}'"]
-    
     if state:
         filters.append(f"state eq '{state.upper()}'")
     if county:
-        # Format county as 'County Name (County)' for exact match
-        if "County" in county:
-            county_name = county.replace(" County", "")
-            designated_area = f"{county_name} (County)"
-        elif "Parish" in county:
-            county_name = county.replace(" Parish", "")
-            designated_area = f"{county_name} (Parish)"
-        else:
-            designated_area = county
-        filters.append(f"designatedArea eq '{designated_area}'")
-        
-    filter_query = " and ".join(filters)
-    url = f"{base_url}?$filter={filter_query}&$top=10&$orderby=declarationDate desc"
-    
+        filters.append(f"designatedArea eq '{format_designated_area(county)}'")
+    return " and ".join(filters)
+
+def _declarations_page_size(distinct):
+    # A disaster usually covers a handful of counties; asking for a few rows per
+    # wanted disaster normally needs one page for a statewide query
+    return min(max(distinct * 4, 10), 1000)
+
+def _query_declarations_mirror(df, state=None, county=None, days=360, distinct=5):
+    """
+    Same query as get_fema_declaration_records, answered from the local mirror.
+    """
+    date_limit = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%dT00:00:00.000Z')
+    mask = df['declarationDate'] >= date_limit
+    if state:
+        mask &= df['state'] == state.upper()
+    rows = df[mask]
+    if county:
+        # load_dataset precomputes area_key; other frames only normalize the rows left after the mask
+        keys = rows['area_key'] if 'area_key' in rows.columns else rows['designatedArea'].map(_area_key)
+        rows = rows[keys == _area_key(county)]
+    rows = rows.sort_values('declarationDate', ascending=False).drop_duplicates('disasterNumber')
+    return [FemaDeclaration.from_api(dec) for dec in rows.head(distinct).to_dict('records')]
+
+def _declarations_from_mirror(state=None, county=None, days=360, distinct=5):
+    # Returns None without a recent mirror. Reading and querying the frame blocks,
+    # so async callers run this in a worker thread
+    mirror = fema_mirror.load_dataset('DisasterDeclarationsSummaries')
+    if mirror is None:
+        return None
+    return _query_declarations_mirror(mirror, state, county, days, distinct)
+
+@coalesce
+def get_fema_declaration_records(state=None, county=None, days=360, distinct=5):
+    """
+    Fetch the latest distinct disasters declared for a state or county, as typed records.
+
+    Pages through the declarations newest first with only the needed fields
+    selected, and stops as soon as `distinct` different disaster numbers have
+    been seen, so disasters covering many counties cannot crowd out older ones.
+    Answered from the local mirror (see fema_mirror.py) when one is synced,
+    otherwise from the live API.
+
+    Unlike get_fema_disaster_declarations, request errors are raised rather than
+    folded into a summary string, so callers can tell "no declarations" from "failed".
+
+    Args:
+        state (str): Two-letter state code.
+        county (str): Optional county name.
+        days (int): How far back to look.
+        distinct (int): Number of distinct disasters to return.
+
+    Returns:
+        list[FemaDeclaration]: One record per disaster, newest first.
+    """
+    declarations = _declarations_from_mirror(state, county, days, distinct)
+    if declarations is not None:
+        return declarations
+
+    records = iter_openfema_records(
+        DECLARATIONS_URL, 'DisasterDeclarationsSummaries',
+        filter_query=_declarations_filter(state, county, days),
+        select=DECLARATION_FIELDS,
+        orderby="declarationDate desc,id",
+        page_size=_declarations_page_size(distinct),
+    )
+    return distinct_disasters((FemaDeclaration.from_api(dec) for dec in records), limit=distinct)
+
+@coalesce
+async def get_fema_declaration_records_async(state=None, county=None, days=360, distinct=5):
+    """
+    Async variant of get_fema_declaration_records.
+    """
+    declarations = await run_in_thread(_declarations_from_mirror, state, county, days, distinct)
+    if declarations is not None:
+        return declarations
+
+    declarations = []
+    seen_disasters = set()
+    records = aiter_openfema_records(
+        DECLARATIONS_URL, 'DisasterDeclarationsSummaries',
+        filter_query=_declarations_filter(state, county, days),
+        select=DECLARATION_FIELDS,
+        orderby="declarationDate desc,id",
+        page_size=_declarations_page_size(distinct),
+    )
+    async for record in records:
+        dec = FemaDeclaration.from_api(record)
+        if dec.disaster_number in seen_disasters:
+            continue
+        seen_disasters.add(dec.disaster_number)
+        declarations.append(dec)
+        if len(declarations) >= distinct:
+            await records.aclose()
+            break
+    return declarations
+
+@coalesce
+def get_fema_disaster_declarations(state=None, county=None, days=360):
+    """
+    Fetch disaster declarations from OpenFEMA.
+    """
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        declarations = data.get('DisasterDeclarationsSummaries', [])
-        if not declarations:
-            return {
-                "summary": f"No recent FEMA disaster declarations found for {state or ''} {county or ''}.",
-                "visuals": None
-            }
-        
-        # Deduplicate by disaster number since multiple counties can be in one declaration
-        seen_disasters = set()
-        result = "Recent FEMA Disaster Declarations:\n"
-        count = 0
-        for dec in declarations:
-            dec_id = dec.get('disasterNumber')
-            if dec_id in seen_disasters:
-                continue
-            seen_disasters.add(dec_id)
-            
-            date = dec.get('declarationDate', 'N/A')[:10]
-            title = dec.get('declarationTitle', 'N/A')
-            incident = dec.get('incidentType', 'N/A')
-            result += f"- {date}: {title} (Type: {incident}, ID: {dec_id})\n"
-            count += 1
-            if count >= 5: break
-            
+        declarations = get_fema_declaration_records(state=state, county=county, days=days)
+        return summarize_fema_declarations(declarations, state, county)
+    except Exception as e:
         return {
-            "summary": result,
-            "visuals": None # Generic declarations don't need a specific map/chart yet
+            "summary": f"Error fetching FEMA declarations: {str(e)}",
+            "visuals": None
         }
+
+@coalesce
+async def get_fema_disaster_declarations_async(state=None, county=None, days=360):
+    """
+    Async variant of get_fema_disaster_declarations; returns the same dict shape.
+    """
+    try:
+        declarations = await get_fema_declaration_records_async(state=state, county=county, days=days)
+        return summarize_fema_declarations(declarations, state, county)
     except Exception as e:
         return {
             "summary": f"Error fetching FEMA declarations: {str(e)}",
             "visuals": None
         }
 
-def get_fema_assistance_data(state, county=None):
+@coalesce
+def fetch_national_fema_declarations(days=30, page_size=1000):
     """
-    Fetch summary assistance data to gauge community need using the Housing Assistance Owners (v2) dataset.
+    Fetch every disaster declaration in the US from the last `days` days.
+
+    Follows $skip pages until a short page comes back, so a full scan needs one
+    or a few requests instead of one per county.
+
+    Returns:
+        list[FemaDeclaration]: Declarations, newest first.
     """
-    base_url = "https://www.fema.gov/api/open/v2/HousingAssistanceOwners"
-    
+    date_limit = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%dT00:00:00.000Z')
+    records = iter_openfema_records(
+        DECLARATIONS_URL, 'DisasterDeclarationsSummaries',
+        filter_query=f"declarationDate ge '{date_limit}'",
+        select=DECLARATION_FIELDS,
+        orderby="declarationDate desc,id",
+        page_size=page_size,
+        # Bulk pages are large, so allow longer than the host default
+        timeout=30,
+    )
+    return [FemaDeclaration.from_api(dec) for dec in records]
+
+def _area_key(name):
+    """
+    Normalize 'Davidson', 'Davidson County' and 'Davidson (County)' to the same key.
+    """
+    name = re.sub(r"\s*\(.*\)$", "", name or "")
+    name = re.sub(r"\s+(County|Parish)$", "", name)
+    return name.strip().lower()
+
+class FemaDeclarationIndex:
+    """
+    In-memory index of prefetched declarations keyed by state and designatedArea.
+    """
+    def __init__(self, declarations):
+        self.by_state = defaultdict(list)
+        self.by_area = defaultdict(list)
+        ordered = sorted(declarations, key=lambda d: d.declaration_date, reverse=True)
+        for dec in ordered:
+            self.by_state[dec.state].append(dec)
+            self.by_area[(dec.state, _area_key(dec.designated_area))].append(dec)
+
+    def lookup(self, state, county=None):
+        """
+        Returns the declarations for a state, or for one county in it, newest first.
+        """
+        state = (state or '').upper()
+        if county:
+            return self.by_area.get((state, _area_key(county)), [])
+        return self.by_state.get(state, [])
+
+    def __len__(self):
+        return sum(len(decs) for decs in self.by_state.values())
+
+ASSISTANCE_URL = "https://www.fema.gov/api/open/v2/HousingAssistanceOwners"
+ASSISTANCE_FIELDS = ["disasterNumber", "state", "county", "city", "zipCode",
+                     "validRegistrations", "totalApprovedIhpAmount"]
+
+def _assistance_params(state, county=None):
     filters = [f"state eq '{state.upper()}'"]
     if county:
         filters.append(f"substringof('{county}', county)")
         
-    filter_query = " and ".join(filters)
     # Order by disasterNumber descending to get most recent aid data
-    url = f"{base_url}?$filter={filter_query}&$top=10&$orderby=disasterNumber desc"
+    return _page_params(" and ".join(filters), ASSISTANCE_FIELDS, "disasterNumber desc", top=10)
+
+def _query_assistance_mirror(df, state, county=None, limit=10):
+    """
+    Same query as _assistance_params, answered from the local mirror.
+    """
+    mask = df['state'] == state.upper()
+    if county:
+        mask &= df['county'].fillna('').str.contains(county, case=False, regex=False)
+    rows = df[mask].sort_values('disasterNumber', ascending=False).head(limit)
+    return rows.to_dict('records')
+
+def summarize_fema_assistance(summaries, state, county=None):
+    """
+    Build the chatbot summary and chart for HousingAssistanceOwners records.
+    """
+    if not summaries:
+        return {
+            "summary": f"No FEMA housing assistance data found for {state} {county or ''}.",
+            "visuals": None
+        }
+        
+    result = f"Recent FEMA Housing Assistance Data (Owners) for {state}:\n"
+    chart_data = []
+    # Records are by Zip code, so we aggregate or show top zip codes
+    for item in summaries[:5]:
+        county_name = item.get('county', 'Unknown County')
+        city = item.get('city', 'Unknown City')
+        zip_code = item.get('zipCode', 'N/A')
+        approved = item.get('totalApprovedIhpAmount', 0)
+        valid_reg = item.get('validRegistrations', 0)
+        disaster = item.get('disasterNumber', 'N/A')
+        
+        if approved > 0 or valid_reg > 0:
+            label = f"{city} ({zip_code})"
+            result += f"- {label}, {county_name}: ${approved:,.2f} approved for {valid_reg} registrations (Disaster: {disaster}).\n"
+            chart_data.append({
+                "Location": label,
+                "Approved Funding ($)": approved,
+                "Registrations": valid_reg
+            })
     
+    return {
+        "summary": result,
+        "visuals": {
+            "type": "chart",
+            "data": chart_data
+        } if chart_data else None
+    }
+
+def _assistance_from_mirror(state, county=None):
+    # Returns None without a recent mirror; blocking like _declarations_from_mirror
+    mirror = fema_mirror.load_dataset('HousingAssistanceOwners')
+    if mirror is None:
+        return None
+    return _query_assistance_mirror(mirror, state, county)
+
+@coalesce
+def get_fema_assistance_data(state, county=None):
+    """
+    Fetch summary assistance data to gauge community need using the Housing Assistance Owners (v2) dataset.
+    """
     try:
-        response = requests.get(url, timeout=10)
+        summaries = _assistance_from_mirror(state, county)
+        if summaries is not None:
+            return summarize_fema_assistance(summaries, state, county)
+
+        response = http_get(ASSISTANCE_URL, params=_assistance_params(state, county))
         response.raise_for_status()
         data = response.json()
-        
-        summaries = data.get('HousingAssistanceOwners', [])
-        if not summaries:
-            return {
-                "summary": f"No FEMA housing assistance data found for {state} {county or ''}.",
-                "visuals": None
-            }
-            
-        result = f"Recent FEMA Housing Assistance Data (Owners) for {state}:\n"
-        chart_data = []
-        # Records are by Zip code, so we aggregate or show top zip codes
-        for item in summaries[:5]:
-            county_name = item.get('county', 'Unknown County')
-            city = item.get('city', 'Unknown City')
-            zip_code = item.get('zipCode', 'N/A')
-            approved = item.get('totalApprovedIhpAmount', 0)
-            valid_reg = item.get('validRegistrations', 0)
-            disaster = item.get('disasterNumber', 'N/A')
-            
-            if approved > 0 or valid_reg > 0:
-                label = f"{city} ({zip_code})"
-                result += f"- {label}, {county_name}: ${approved:,.2f} approved for {valid_reg} registrations (Disaster: {disaster}).\n"
-                chart_data.append({
-                    "Location": label,
-                    "Approved Funding ($)": approved,
-                    "Registrations": valid_reg
-                })
-        
+        return summarize_fema_assistance(data.get('HousingAssistanceOwners', []), state, county)
+    except Exception as e:
         return {
-            "summary": result,
-            "visuals": {
-                "type": "chart",
-                "data": chart_data
-            } if chart_data else None
+            "summary": f"Error fetching FEMA assistance data: {str(e)}",
+            "visuals": None
         }
+
+@coalesce
+async def get_fema_assistance_data_async(state, county=None):
+    """
+    Async variant of get_fema_assistance_data; returns the same dict shape.
+    """
+    try:
+        summaries = await run_in_thread(_assistance_from_mirror, state, county)
+        if summaries is not None:
+            return summarize_fema_assistance(summaries, state, county)
+
+        response = await async_http_get(ASSISTANCE_URL, params=_assistance_params(state, county))
+        response.raise_for_status()
+        data = response.json()
+        return summarize_fema_assistance(data.get('HousingAssistanceOwners', []), state, county)
     except Exception as e:
         return {
             "summary": f"Error fetching FEMA assistance data: {str(e)}",
@@ -6,8 +6,9 @@ import uuid
 import datetime
 import json
 import os
+import tempfile
 import h3
-import requests
+from app.chatbot.tools.eonet_store import get_eonet_events, events_for_map
 
 FLOODING_ICONS = {
     "💧 Water/Need": "tint",
@@ -51,70 +52,53 @@ def load_scan_cache():
             with open(SCAN_CACHE_FILE, "r") as f:
                 cache = json.load(f)
                 if "scan_results" in cache and "last_scan_time" in cache:
-                    cache["last_scan_time"] = datetime.datetime.fromisoformat(cache["last_scan_time"])
+                    if cache["last_scan_time"]:
+                        cache["last_scan_time"] = datetime.datetime.fromisoformat(cache["last_scan_time"])
                     return cache
         except:
             pass
     return {"scan_results": [], "last_scan_time": None}
 
+def write_json_atomic(path, data):
+    """
+    Writes JSON to a temp file next to `path` and renames it into place,
+    so readers never see a half-written file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
 def save_scan_cache(scan_results, last_scan_time):
     cache = {
         "scan_results": scan_results,
         "last_scan_time": last_scan_time.isoformat() if last_scan_time else None
     }
-    with open(SCAN_CACHE_FILE, "w") as f:
-        json.dump(cache, f)
+    write_json_atomic(SCAN_CACHE_FILE, cache)
+
+def dedupe_scan_results(scan_results):
+    """
+    Keeps the latest scan result per source and cell (or per text for non-cell results),
+    so e.g. an NWS alert and a FEMA declaration for the same cell are both kept.
+    """
+    unique_res = {}
+    for r in scan_results:
+        key = (r.get('source'), r.get('cell') or r.get('text'))
+        unique_res[key] = r
+    return list(unique_res.values())
 
-@st.cache_data(ttl=3600)
 def fetch_nasa_eonet_events_for_map():
     """
-    Fetch open events from NASA EONET for the heatmap.
+    Fetch open events from NASA EONET for the heatmap, from the store the chatbot tool also uses.
     """
     try:
-        url = "https://eonet.gsfc.nasa.gov/api/v3/events"
-        params = {"status": "open", "limit": 50}
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        nasa_events = []
-        # Severity mapping based on EONET categories
-        SEVERITY_MAPPING = {
-            "Severe Storms": 10,
-            "Wildfires": 9,
-            "Floods": 9,
-            "Earthquakes": 10,
-            "Volcanoes": 8,
-            "Landslides": 7,
-            "Temp Extremes": 6,
-            "Sea and Lake Ice": 4,
-            "Drought": 5,
-        }
-        
-        for event in data.get("events", []):
-            geometries = event.get("geometry", [])
-            categories = event.get("categories", [])
-            
-            # Determine max severity based on categories
-            severity = 5 # Default base
-            for cat in categories:
-                cat_title = cat.get("title")
-                if cat_title in SEVERITY_MAPPING:
-                    severity = max(severity, SEVERITY_MAPPING[cat_title])
-            
-            if geometries:
-                latest_geo = geometries[0]
-                coords = latest_geo.get("coordinates", [])
-                if len(coords) >= 2:
-                    nasa_events.append({
-                        "lat": coords[1],
-                        "lon": coords[0],
-                        "severity": severity,
-                        "location": event.get("title", "NASA Alert"),
-                        "text": f"NASA EONET Alert: {event.get('title')}. Source: {event.get('sources', [{}])[0].get('url', 'N/A')}",
-                        "source": "NASA EONET"
-                    })
-        return nasa_events
+        return events_for_map(get_eonet_events("open"))
     except Exception as e:
         print(f"Error fetching NASA EONET for map: {e}")
         return []
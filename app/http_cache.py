@@ -0,0 +1,169 @@
+"""
+Disk-backed HTTP cache for the upstream data APIs.
+
+Responses are stored in SQLite so they survive Streamlit restarts and are
+shared with the headless scan worker. Each source has an explicit TTL policy;
+a response's own Cache-Control can shorten it (max-age, no-cache) or opt out
+of caching entirely (no-store). Stale entries keep their ETag/Last-Modified
+so they can be revalidated with a conditional GET, and an unchanged resource
+then costs a 304 instead of a full body.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlencode, urlparse
+
+HTTP_CACHE_FILE = os.path.join("data", "caches", "http_cache.sqlite")
+
+# (host, path prefix, TTL in seconds). The first matching rule wins; hosts
+# without a rule are not cached.
+CACHE_POLICIES = [
+    ("api.weather.gov", "/alerts", 60),
+    ("api.weather.gov", "/zones", 7 * 86400),  # zone boundaries almost never change
+    ("api.weather.gov", "", 300),
+    ("eonet.gsfc.nasa.gov", "", 900),
+    ("www.fema.gov", "", 3600),
+]
+
+# Entries this long past expiry are deleted instead of kept for revalidation
+PRUNE_AFTER_SECONDS = 7 * 86400
+
+# Headers that describe the wire encoding rather than the (decoded) cached body
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+def get_cache_policy(url):
+    """
+    Returns the TTL policy in seconds for a URL, or None if it should not be cached.
+    """
+    parsed = urlparse(url)
+    for host, path_prefix, ttl in CACHE_POLICIES:
+        if parsed.hostname == host and parsed.path.startswith(path_prefix):
+            return ttl
+    return None
+
+
+def get_cache_key(url, params=None):
+    """
+    Canonical key for a GET: the URL plus its query parameters in a stable order.
+    """
+    if not params:
+        return url
+    query = urlencode(sorted((str(k), str(v)) for k, v in params.items()))
+    return f"{url}{'&' if '?' in url else '?'}{query}"
+
+
+def get_ttl(headers, policy_ttl):
+    """
+    Combines the source's TTL policy with the response's Cache-Control header.
+
+    Returns:
+        int|None: Seconds the response stays fresh (0 = revalidate every time),
+                  or None if the response must not be stored.
+    """
+    cache_control = (headers.get("Cache-Control") or "").lower()
+    if "no-store" in cache_control:
+        return None
+    if "no-cache" in cache_control:
+        return 0
+    match = re.search(r"max-age=(\d+)", cache_control)
+    if match:
+        return min(policy_ttl, int(match.group(1)))
+    return policy_ttl
+
+
+class HttpCache:
+    """
+    SQLite store of cached GET responses, safe to share between threads.
+    """
+    def __init__(self, path=HTTP_CACHE_FILE):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, status INTEGER, headers TEXT, body BLOB, "
+                "etag TEXT, last_modified TEXT, stored_at REAL, expires_at REAL)"
+            )
+            self._conn.execute("DELETE FROM responses WHERE expires_at < ?",
+                               (time.time() - PRUNE_AFTER_SECONDS,))
+
+    def get(self, key):
+        """
+        Returns the cached entry for a key as a dict (with a "fresh" flag), or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body, etag, last_modified, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        status, headers, body, etag, last_modified, expires_at = row
+        return {
+            "status": status,
+            "headers": json.loads(headers),
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": time.time() < expires_at,
+        }
+
+    def put(self, key, status, headers, body, ttl):
+        headers = {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS}
+        validators = {k.lower(): v for k, v in headers.items()}
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, status, json.dumps(headers), body, validators.get("etag"),
+                 validators.get("last-modified"), now, now + ttl),
+            )
+
+    def touch(self, key, ttl):
+        """
+        Marks an entry fresh again after the server answered 304 Not Modified.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE responses SET stored_at = ?, expires_at = ? WHERE key = ?",
+                               (now, now + ttl, key))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+
+def get_conditional_headers(entry):
+    """
+    Returns the If-None-Match / If-Modified-Since headers to revalidate an entry.
+    """
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """
+    Returns the process-wide HttpCache, opening it on first use.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = HttpCache()
+    return _cache
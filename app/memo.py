@@ -0,0 +1,224 @@
+"""
+Framework-neutral memoization for tools and geospatial helpers.
+
+    @memoize(ttl=60, backend="sqlite")
+    def get_nws_alerts(lat, lon): ...
+
+Replaces st.cache_data / st.cache_resource so these modules import without
+Streamlit and keep their caches outside the Streamlit server:
+
+- backend="memory": per-process LRU (maxsize entries per function). Use it for
+  objects that should not be copied or can't be pickled (models, GeoDataFrames).
+- backend="sqlite": pickled results in MEMO_CACHE_FILE, shared by the UI and
+  headless workers and kept across restarts.
+
+Arguments are hashed (JSON when possible, pickle otherwise) together with the
+function's module and name. ttl is in seconds; None means until evicted.
+Hit/miss counts per function are available from get_memo_stats(). Coroutine
+functions can be memoized too; the result of the await is what gets cached.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from app.transport import run_in_thread
+
+MEMO_CACHE_FILE = os.path.join("data", "caches", "memo.sqlite")
+DEFAULT_MAXSIZE = 256
+# Disk entries not written for this long are dropped when the store is opened, even without a TTL
+PRUNE_AFTER_SECONDS = 7 * 86400
+
+_MISSING = object()
+
+
+class MemoryBackend:
+    """
+    Thread-safe LRU of (value, expires_at) entries.
+    """
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires_at = entry
+            if expires_at is not None and time.time() >= expires_at:
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl if ttl is not None else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self, prefix=""):
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+
+class SqliteBackend:
+    """
+    SQLite store of pickled results, safe to share between threads and processes.
+    """
+    def __init__(self, path=None):
+        path = path or MEMO_CACHE_FILE
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS memo (key TEXT PRIMARY KEY, value BLOB, stored_at REAL, expires_at REAL)"
+            )
+            now = time.time()
+            self._conn.execute("DELETE FROM memo WHERE expires_at < ? OR stored_at < ?",
+                               (now, now - PRUNE_AFTER_SECONDS))
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM memo WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and time.time() >= row[1]):
+            return _MISSING
+        try:
+            return pickle.loads(row[0])
+        except Exception as e:
+            print(f"Ignoring unreadable memo entry {key}: {e}")
+            return _MISSING
+
+    def set(self, key, value, ttl):
+        try:
+            blob = pickle.dumps(value)
+        except Exception as e:
+            print(f"Not caching {key} on disk: {e}")
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO memo VALUES (?, ?, ?, ?)",
+                               (key, blob, now, now + ttl if ttl is not None else None))
+
+    def clear(self, prefix=""):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM memo WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+
+
+_sqlite_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_sqlite_backend(path=None):
+    """
+    Returns the process-wide SqliteBackend for a file, opening it on first use.
+    """
+    path = path or MEMO_CACHE_FILE
+    with _backends_lock:
+        if path not in _sqlite_backends:
+            _sqlite_backends[path] = SqliteBackend(path)
+        return _sqlite_backends[path]
+
+
+def hash_arguments(args, kwargs):
+    """
+    Stable hash of call arguments: JSON for plain data, pickle for anything else.
+    """
+    try:
+        payload = json.dumps([args, sorted(kwargs.items())], sort_keys=True).encode("utf-8")
+    except (TypeError, ValueError):
+        payload = pickle.dumps((args, sorted(kwargs.items())))
+    return hashlib.sha256(payload).hexdigest()
+
+
+_stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+_stats_lock = threading.Lock()
+
+
+def _count(name, outcome):
+    with _stats_lock:
+        _stats[name][outcome] += 1
+
+
+def memoize(ttl=None, backend="memory", maxsize=DEFAULT_MAXSIZE):
+    """
+    Decorator that caches a function's results by its arguments.
+
+    Args:
+        ttl (float): Seconds a result stays valid; None keeps it until evicted.
+        backend (str): "memory" (per-process LRU) or "sqlite" (shared on disk).
+        maxsize (int): Entries kept by the memory backend.
+
+    The wrapper gets a cache_clear() method.
+    """
+    if backend not in ("memory", "sqlite"):
+        raise ValueError(f"Unknown memo backend: {backend}")
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        memory = MemoryBackend(maxsize) if backend == "memory" else None
+
+        def store():
+            # Looked up per call so tests (and workers) can point the disk store elsewhere
+            return memory or get_sqlite_backend()
+
+        if inspect.iscoroutinefunction(func):
+            async def call_store(method, *args):
+                # The SQLite store can wait on locks, which must not stall the event loop
+                if memory is not None:
+                    return method(*args)
+                return await run_in_thread(method, *args)
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = f"{name}:{hash_arguments(args, kwargs)}"
+                value = await call_store(store().get, key)
+                if value is not _MISSING:
+                    _count(name, "hits")
+                    return value
+                _count(name, "misses")
+                value = await func(*args, **kwargs)
+                await call_store(store().set, key, value, ttl)
+                return value
+
+            async_wrapper.cache_clear = lambda: store().clear(f"{name}:")
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = f"{name}:{hash_arguments(args, kwargs)}"
+            value = store().get(key)
+            if value is not _MISSING:
+                _count(name, "hits")
+                return value
+            _count(name, "misses")
+            value = func(*args, **kwargs)
+            store().set(key, value, ttl)
+            return value
+
+        wrapper.cache_clear = lambda: store().clear(f"{name}:")
+        return wrapper
+
+    return decorator
+
+
+def get_memo_stats():
+    """
+    Returns {function name: {"hits", "misses"}} counted in this process.
+    """
+    with _stats_lock:
+        return {name: dict(counts) for name, counts in _stats.items()}
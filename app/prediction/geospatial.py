@@ -1,7 +1,7 @@
 import h3
 import json
 import math
-import streamlit as st
+from app.memo import memoize
 import geopandas as gpd
 from shapely.geometry import Point, Polygon
 
@@ -13,7 +13,7 @@ def get_h3_cell(lat, lon, resolution=6):
     """
     return h3.latlng_to_cell(lat, lon, resolution)
 
-@st.cache_resource
+@memoize()
 def get_gis_data():
     """
     Loads and caches GIS shapefiles into memory.
@@ -37,7 +37,7 @@ def get_gis_data():
                 _ = _gis_cache[key].sindex
                 
     except Exception as e:
-        st.error(f"Error loading GIS data: {e}")
+        print(f"Error loading GIS data: {e}")
         # Fallback to empty GDFs to prevent crashes
         if "states" not in _gis_cache: _gis_cache["states"] = gpd.GeoDataFrame(columns=['geometry', 'NAME', 'STUSPS'])
         if "counties" not in _gis_cache: _gis_cache["counties"] = gpd.GeoDataFrame(columns=['geometry', 'NAME'])
@@ -45,12 +45,21 @@ def get_gis_data():
 
     return _gis_cache
 
-@st.cache_data
 def get_h3_location_bundles(h3_indexes):
     """
     Takes an array of H3 cell indexes and returns an array of location bundles.
     """
     gis_data = get_gis_data()
+    if gis_data["states"].empty or gis_data["counties"].empty:
+        # Bundles without boundaries are all "Unknown"; never put those in the shared disk cache
+        return _build_location_bundles(h3_indexes, gis_data)
+    return _cached_location_bundles(h3_indexes)
+
+@memoize(ttl=7 * 86400, backend="sqlite")  # Boundaries are static
+def _cached_location_bundles(h3_indexes):
+    return _build_location_bundles(h3_indexes, get_gis_data())
+
+def _build_location_bundles(h3_indexes, gis_data):
     states_gdf = gis_data["states"]
     counties_gdf = gis_data["counties"]
     cities_gdf = gis_data["cities"]
@@ -114,7 +123,7 @@ def get_h3_location_bundles(h3_indexes):
         
     return bundles
 
-@st.cache_data
+@memoize(backend="sqlite")
 def fill_global_grid(scan_results_json, resolution=3):
     """
     Generates a dense grid of H3 cells and predicts severity for each using IDW.
@@ -216,7 +225,7 @@ def fill_global_grid(scan_results_json, resolution=3):
         
     return filled_data
 
-@st.cache_data
+@memoize(backend="sqlite")
 def get_h3_geojson(cell_data_json):
     """
     Converts aggregated H3 cell data to GeoJSON for Folium.
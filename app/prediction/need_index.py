@@ -0,0 +1,183 @@
+"""
+County-level need index built from FEMA housing assistance.
+
+HousingAssistanceOwners has one row per ZIP code and disaster. This batch job
+rolls it up per county (approved IHP dollars, valid registrations, how recent
+the disasters were) into one score per county FIPS code:
+
+    python -m app.prediction.need_index build
+
+Data comes from the local OpenFEMA mirror when it is synced (see
+app/chatbot/tools/fema_mirror.py), otherwise from a paged download. County
+names are matched to FIPS codes through DisasterDeclarationsSummaries, which
+also supplies each disaster's declaration date. The result is a small Parquet
+table that get_county_need and top_need_counties answer from memory.
+"""
+import argparse
+import datetime
+import math
+import os
+
+import pandas as pd
+
+from app.chatbot.tools import fema_mirror, openfema
+
+NEED_INDEX_FILE = os.path.join("data", "caches", "county_need_index.parquet")
+BULK_PAGE_SIZE = 10000
+# Assistance from a disaster declared this many days ago counts half as much as today's
+RECENCY_HALF_LIFE_DAYS = 365
+DOLLAR_WEIGHT = 0.6
+REGISTRATION_WEIGHT = 0.4
+
+DECLARATION_INDEX_FIELDS = ["disasterNumber", "declarationDate", "state", "designatedArea",
+                            "fipsStateCode", "fipsCountyCode"]
+
+_loaded = None  # (path, mtime, {fips: row})
+
+
+def _fetch_dataset(name, url, select):
+    # Bulk pages are large and must not go through the response cache
+    records = openfema.iter_openfema_records(url, name, select=select, orderby="id", page_size=BULK_PAGE_SIZE,
+                                             timeout=120, use_cache=False)
+    return pd.DataFrame(list(records), columns=select)
+
+
+def load_assistance():
+    df = fema_mirror.load_dataset("HousingAssistanceOwners")
+    if df is None:
+        print("No recent HousingAssistanceOwners mirror, downloading...")
+        df = _fetch_dataset("HousingAssistanceOwners", openfema.ASSISTANCE_URL, openfema.ASSISTANCE_FIELDS)
+    return df
+
+
+def load_declarations():
+    df = fema_mirror.load_dataset("DisasterDeclarationsSummaries")
+    if df is None:
+        print("No recent DisasterDeclarationsSummaries mirror, downloading...")
+        df = _fetch_dataset("DisasterDeclarationsSummaries", fema_mirror.DATASETS["DisasterDeclarationsSummaries"],
+                            DECLARATION_INDEX_FIELDS)
+    return df
+
+
+def _fips(state_code, county_code):
+    return f"{int(state_code):02d}{int(county_code):03d}"
+
+
+def build_need_index(assistance, declarations, today=None):
+    """
+    Aggregates assistance rows into one need score per county.
+
+    Args:
+        assistance (DataFrame): HousingAssistanceOwners rows.
+        declarations (DataFrame): DisasterDeclarationsSummaries rows.
+        today (datetime.date): Reference date for recency (defaults to today).
+
+    Returns:
+        DataFrame: One row per county FIPS with approved_dollars, registrations,
+                   disasters, last_declaration and need_index (0-10), highest need first.
+    """
+    today = today or datetime.date.today()
+    declarations = declarations.dropna(subset=["fipsStateCode", "fipsCountyCode"]).copy()
+    declarations["area_key"] = declarations["designatedArea"].map(openfema._area_key)
+    declarations["fips"] = [_fips(s, c) for s, c in zip(declarations["fipsStateCode"], declarations["fipsCountyCode"])]
+    county_fips = declarations.drop_duplicates(["state", "area_key"]).set_index(["state", "area_key"])["fips"]
+    declared_on = pd.to_datetime(declarations.groupby("disasterNumber")["declarationDate"].min(), utc=True).dt.date
+
+    rows = assistance.copy()
+    rows["area_key"] = rows["county"].map(openfema._area_key)
+    rows = rows.join(county_fips, on=["state", "area_key"], how="inner")
+    rows["declared_on"] = rows["disasterNumber"].map(declared_on)
+    rows = rows.dropna(subset=["declared_on"])
+    if rows.empty:
+        return pd.DataFrame(columns=["fips", "state", "county", "approved_dollars", "registrations", "disasters",
+                                     "last_declaration", "need_index"])
+
+    age_days = rows["declared_on"].map(lambda d: (today - d).days).clip(lower=0)
+    rows["decay"] = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+    rows["approved"] = rows["totalApprovedIhpAmount"].fillna(0)
+    rows["registrations"] = rows["validRegistrations"].fillna(0)
+    rows["recent_approved"] = rows["approved"] * rows["decay"]
+    rows["recent_registrations"] = rows["registrations"] * rows["decay"]
+
+    counties = rows.groupby("fips").agg(
+        state=("state", "first"),
+        county=("county", "first"),
+        approved_dollars=("approved", "sum"),
+        registrations=("registrations", "sum"),
+        disasters=("disasterNumber", "nunique"),
+        last_declaration=("declared_on", "max"),
+        recent_approved=("recent_approved", "sum"),
+        recent_registrations=("recent_registrations", "sum"),
+    ).reset_index()
+
+    # Log scale so one catastrophic county doesn't flatten everyone else to zero
+    def scaled(column):
+        values = counties[column].map(math.log1p)
+        top = values.max()
+        return values / top if top > 0 else values * 0
+
+    score = DOLLAR_WEIGHT * scaled("recent_approved") + REGISTRATION_WEIGHT * scaled("recent_registrations")
+    counties["need_index"] = (10 * score).round(2)
+    counties["last_declaration"] = counties["last_declaration"].map(lambda d: d.isoformat())
+    counties["registrations"] = counties["registrations"].astype(int)
+    counties = counties.drop(columns=["recent_approved", "recent_registrations"])
+    return counties.sort_values("need_index", ascending=False).reset_index(drop=True)
+
+
+def save_need_index(counties, path=None):
+    path = path or NEED_INDEX_FILE
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    counties.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def load_need_index(path=None):
+    """
+    Returns {fips: county row} from the saved index (empty if it hasn't been built).
+    Kept in memory until the file changes.
+    """
+    global _loaded
+    path = path or NEED_INDEX_FILE
+    if not os.path.exists(path):
+        return {}
+    mtime = os.path.getmtime(path)
+    if _loaded is None or _loaded[:2] != (path, mtime):
+        df = pd.read_parquet(path)
+        _loaded = (path, mtime, {row["fips"]: row for row in df.to_dict("records")})
+    return _loaded[2]
+
+
+def get_county_need(fips_code):
+    """
+    Returns the need index row for a county FIPS code, or None if unknown.
+    """
+    if not fips_code:
+        return None
+    return load_need_index().get(str(fips_code).zfill(5))
+
+
+def top_need_counties(state=None, limit=10):
+    """
+    Returns the counties with the highest need index, optionally within one state (2-letter code).
+    """
+    rows = load_need_index().values()
+    if state:
+        rows = [row for row in rows if row["state"] == state.upper()]
+    return sorted(rows, key=lambda row: row["need_index"], reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the county need index from FEMA housing assistance.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("build", help="Rebuild the index from the mirror or OpenFEMA.")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        counties = build_need_index(load_assistance(), load_declarations())
+        save_need_index(counties)
+        print(f"Saved need index for {len(counties)} counties to {NEED_INDEX_FILE}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Rasterizes active NWS alerts into H3 cells for the heatmap.
+
+Each located alert in the nationwide snapshot (app/chatbot/tools/nws_snapshot.py)
+is polyfilled into cells at the heatmap resolution and scored on the same 0-10
+scale as the FEMA scan results. Polyfills are cached per alert id and reused
+until the alert is updated, so a refresh only polyfills new or changed alerts.
+"""
+import h3
+
+from app.chatbot.tools.nws_snapshot import get_alert_snapshot, peek_alert_snapshot
+
+HEATMAP_RESOLUTION = 2  # Matches the scan cells from scan_planner.get_us_scan_cells
+NWS_SOURCE = "NWS"
+
+NWS_SEVERITY_SCORES = {
+    "Extreme": 10,
+    "Severe": 8,
+    "Moderate": 5,
+    "Minor": 3,
+    "Unknown": 2,
+}
+# Alerts for something already happening weigh more than ones for later
+NWS_URGENCY_ADJUSTMENTS = {
+    "Immediate": 0,
+    "Expected": -1,
+    "Future": -2,
+    "Past": -3,
+    "Unknown": -1,
+}
+
+# alert id -> (sent timestamp, resolution, cells)
+_polyfill_cache = {}
+
+
+def score_alert(properties):
+    """
+    Maps an alert's NWS severity and urgency onto the heatmap's 0-10 scale.
+    """
+    severity = NWS_SEVERITY_SCORES.get(properties.get("severity"), NWS_SEVERITY_SCORES["Unknown"])
+    adjustment = NWS_URGENCY_ADJUSTMENTS.get(properties.get("urgency"), NWS_URGENCY_ADJUSTMENTS["Unknown"])
+    return max(0, min(10, severity + adjustment))
+
+
+def polyfill_alert(feature, geometry, resolution=HEATMAP_RESOLUTION):
+    """
+    Returns the H3 cells an alert's area covers, reusing the cached polyfill if the alert is unchanged.
+    """
+    properties = feature.get("properties", {})
+    alert_id = feature.get("id") or properties.get("id")
+    sent = properties.get("sent")
+    cached = _polyfill_cache.get(alert_id)
+    if cached and cached[0] == sent and cached[1] == resolution:
+        return cached[2]
+
+    cells = h3.geo_to_cells(geometry, resolution)
+    if not cells:
+        # Areas smaller than a cell contain no cell center; use the cell they fall in
+        point = geometry.representative_point()
+        cells = [h3.latlng_to_cell(point.y, point.x, resolution)]
+
+    if alert_id:
+        _polyfill_cache[alert_id] = (sent, resolution, cells)
+    return cells
+
+
+def build_nws_cell_results(snapshot, resolution=HEATMAP_RESOLUTION):
+    """
+    Turns an alert snapshot into heatmap scan results, one per cell, keeping the most severe alert.
+    """
+    cell_results = {}
+    for feature, geometry in snapshot.located_alerts():
+        properties = feature.get("properties", {})
+        severity = score_alert(properties)
+        for cell in polyfill_alert(feature, geometry, resolution):
+            current = cell_results.get(cell)
+            if current and current["severity"] >= severity:
+                continue
+            cell_results[cell] = {
+                "severity": severity,
+                "location": properties.get("areaDesc", "Unknown Area"),
+                "text": f"NWS {properties.get('event', 'Alert')}: {properties.get('headline') or 'No Headline'}",
+                "cell": cell,
+                "source": NWS_SOURCE,
+            }
+
+    # Forget polyfills of alerts that have expired
+    active_ids = {feature.get("id") or feature.get("properties", {}).get("id") for feature in snapshot.features}
+    for alert_id in list(_polyfill_cache):
+        if alert_id not in active_ids:
+            del _polyfill_cache[alert_id]
+
+    return list(cell_results.values())
+
+
+def get_nws_cell_results(resolution=HEATMAP_RESOLUTION, wait=True):
+    """
+    Returns heatmap cell results for all active NWS alerts, or None if no alerts could be loaded.
+
+    Args:
+        wait (bool): False uses whatever snapshot is loaded and refreshes a stale one in
+            the background (for page renders); None is returned until the first load finishes.
+    """
+    try:
+        snapshot = get_alert_snapshot() if wait else peek_alert_snapshot()
+        if snapshot is None:
+            return None
+        return build_nws_cell_results(snapshot, resolution)
+    except Exception as e:
+        print(f"Error ingesting NWS alerts: {e}")
+        return None
+
+
+def merge_nws_results(scan_results, nws_results):
+    """
+    Replaces the NWS entries in a list of scan results with a fresh set.
+    Other entries are left alone; if nws_results is None the old NWS entries are kept.
+    """
+    if nws_results is None:
+        return scan_results
+    return [r for r in scan_results if r.get("source") != NWS_SOURCE] + nws_results
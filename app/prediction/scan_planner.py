@@ -0,0 +1,132 @@
+import h3
+from app.chatbot.tools.ddg_search import get_news_search
+from app.prediction.geospatial import get_h3_location_bundles
+from app.prediction.scanner import us_state_to_abbrev
+
+GENERAL_SCAN_QUERY = "active natural disasters US major emergency"
+
+
+def get_lookup_keys(bundle):
+    """
+    Returns the ordered (state, county) FEMA lookups scan_bundle_news tries for a bundle.
+    The last key has county None and stands for the statewide fallback.
+    """
+    state_abbr = us_state_to_abbrev.get(bundle.get('state', "Unknown"))
+    if not state_abbr:
+        return []
+    keys = [(state_abbr, county) for county in bundle.get('counties', [])[:3]]
+    keys.append((state_abbr, None))
+    return keys
+
+
+def build_scan_plan(bundles):
+    """
+    Groups location bundles that would run the exact same lookup sequence.
+
+    Neighbouring resolution-2 cells usually resolve to the same state and
+    counties, so the plan has far fewer groups than there are cells.
+
+    Returns:
+        list: [{"lookups": [(state, county), ...], "bundles": [bundle, ...]}, ...]
+    """
+    groups = {}
+    for bundle in bundles:
+        keys = tuple(get_lookup_keys(bundle))
+        groups.setdefault(keys, []).append(bundle)
+    return [{"lookups": list(keys), "bundles": members} for keys, members in groups.items()]
+
+
+class ScanPlanRunner:
+    """
+    Runs a scan plan so each distinct (state, county) lookup happens once,
+    then maps the result back to every cell that needs it.
+    """
+    def __init__(self, scanner):
+        self.scanner = scanner
+        self.lookup_results = {}
+        self.naive_queries = 0
+
+    def lookup(self, key):
+        # Plans restored from a JSON checkpoint carry keys as lists
+        key = tuple(key)
+        if key not in self.lookup_results:
+            state_abbr, county = key
+            self.lookup_results[key] = self.scanner.find_declarations(state_abbr, county)
+        return self.lookup_results[key]
+
+    def run_group(self, group):
+        """
+        Scores one plan group.
+
+        Returns:
+            list: One scan result per bundle in the group.
+        """
+        declarations = []
+        tried = 0
+        for key in group["lookups"]:
+            tried += 1
+            declarations = self.lookup(key)
+            if declarations:
+                break
+
+        # Without the plan every bundle would have issued the same lookups itself
+        self.naive_queries += tried * len(group["bundles"])
+        return [self.scanner.build_bundle_result(bundle, declarations) for bundle in group["bundles"]]
+
+    @property
+    def queries_run(self):
+        return len(self.lookup_results)
+
+    @property
+    def queries_saved(self):
+        return max(0, self.naive_queries - self.queries_run)
+
+    def summary(self):
+        return f"Ran {self.queries_run} FEMA lookups instead of {self.naive_queries} ({self.queries_saved} saved)."
+
+
+def get_us_scan_cells(resolution=2):
+    """
+    Returns the H3 cells covering the continental US bounding box.
+    """
+    # Define US Bounding Box (Roughly)
+    min_lat, max_lat = 24, 50
+    min_lon, max_lon = -125, -66
+    us_outline = [(min_lat, min_lon), (max_lat, min_lon),
+                  (max_lat, max_lon), (min_lat, max_lon)]
+    polygon = h3.LatLngPoly(us_outline)
+    return h3.polygon_to_cells(polygon, resolution)
+
+
+def build_scan_queries(resolution=2):
+    """
+    Builds the full scan: one general news query followed by one item per plan group.
+    Every item is plain JSON so a scan can be checkpointed and resumed.
+    """
+    queries = [{"type": "general", "query": GENERAL_SCAN_QUERY}]
+
+    # Resolve location bundles for all cells, then group cells that share
+    # the same (state, county) lookups so each one only runs once
+    bundles = get_h3_location_bundles(get_us_scan_cells(resolution))
+    for group in build_scan_plan(bundles):
+        queries.append({"type": "group", "group": group})
+    return queries
+
+
+def run_scan_query(q_item, scanner, plan_runner):
+    """
+    Runs one scan query item and returns its scan results.
+    """
+    if q_item['type'] == 'general':
+        raw_news = get_news_search(q_item['query'])
+        texts = [line.strip() for line in raw_news.split("\n\n") if line.strip()]
+        return scanner.scan_texts(texts)
+
+    return [res for res in plan_runner.run_group(q_item['group']) if res['severity'] >= 0]
+
+
+def describe_scan_query(q_item):
+    if q_item['type'] == 'general':
+        return f"Global: {q_item['query']}"
+    group = q_item['group']
+    return f"Cells: {len(group['bundles'])} in {group['bundles'][0].get('state', 'Unknown')}"
@@ -0,0 +1,187 @@
+"""
+Headless disaster scan worker.
+
+Runs the heatmap scan outside Streamlit so page loads never block on it:
+
+    python -m app.prediction.scan_worker            # scan once if the cache is stale
+    python -m app.prediction.scan_worker --force    # scan even if the cache is fresh
+    python -m app.prediction.scan_worker --every 30 # keep rescanning every 30 minutes
+    python -m app.prediction.scan_worker --budget 10 # stop after 10 minutes, resume next run
+
+Progress is checkpointed to disk after every few query items, so a crashed or
+killed worker resumes where it stopped. Finished results are published
+atomically to the scan cache, which the home page only reads.
+
+Each run has a time budget (SCAN_TIME_BUDGET_SECONDS, or --budget). Upstream
+calls get at most the remaining budget as their timeout; once it is spent the
+worker saves its checkpoint and exits, and the next run picks up from there.
+"""
+import argparse
+import datetime
+import json
+import os
+import time
+
+from app.common import load_scan_cache, save_scan_cache, write_json_atomic, dedupe_scan_results
+from app.prediction.scanner import DisasterScanner
+from app.prediction.scan_planner import ScanPlanRunner, build_scan_queries, run_scan_query, describe_scan_query
+from app.prediction.nws_ingest import get_nws_cell_results, merge_nws_results
+from app.resilience import deadline, remaining_time
+
+SCAN_CHECKPOINT_FILE = "scan_checkpoint.json"
+SCAN_INTERVAL_SECONDS = 1800  # Matches the 30 minute cache window on the home page
+CHECKPOINT_EVERY = 5
+# A checkpoint older than this belongs to an abandoned scan and is restarted from scratch
+CHECKPOINT_MAX_AGE_SECONDS = 6 * 3600
+# The home page treats a worker as running if its checkpoint was written this recently
+WORKER_HEARTBEAT_SECONDS = 600
+# A single run stops (and checkpoints) after this long, so a slow upstream can't stall the worker
+SCAN_TIME_BUDGET_SECONDS = 25 * 60
+
+
+def load_checkpoint(path=SCAN_CHECKPOINT_FILE):
+    """
+    Returns the saved scan progress, or None if there is no usable checkpoint.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            checkpoint = json.load(f)
+        checkpoint["started_at"] = datetime.datetime.fromisoformat(checkpoint["started_at"])
+        checkpoint["updated_at"] = datetime.datetime.fromisoformat(checkpoint["updated_at"])
+        return checkpoint
+    except Exception as e:
+        print(f"Ignoring unreadable scan checkpoint {path}: {e}")
+        return None
+
+
+def save_checkpoint(checkpoint, path=SCAN_CHECKPOINT_FILE):
+    data = dict(checkpoint)
+    data["started_at"] = checkpoint["started_at"].isoformat()
+    data["updated_at"] = datetime.datetime.now().isoformat()
+    write_json_atomic(path, data)
+
+
+def get_worker_status(path=SCAN_CHECKPOINT_FILE):
+    """
+    Returns {"index", "total", "updated_at"} for a scan a worker is actively running, else None.
+    """
+    checkpoint = load_checkpoint(path)
+    if not checkpoint:
+        return None
+    age = (datetime.datetime.now() - checkpoint["updated_at"]).total_seconds()
+    if age > WORKER_HEARTBEAT_SECONDS:
+        return None
+    return {
+        "index": checkpoint["index"],
+        "total": len(checkpoint["queries"]),
+        "updated_at": checkpoint["updated_at"],
+    }
+
+
+def is_cache_fresh(max_age_seconds=SCAN_INTERVAL_SECONDS):
+    last_scan_time = load_scan_cache()["last_scan_time"]
+    if not last_scan_time:
+        return False
+    return (datetime.datetime.now() - last_scan_time).total_seconds() < max_age_seconds
+
+
+def run_scan(checkpoint_path=SCAN_CHECKPOINT_FILE, force=False, budget_seconds=SCAN_TIME_BUDGET_SECONDS):
+    """
+    Runs (or resumes) one full scan and publishes it to the scan cache.
+
+    Args:
+        checkpoint_path (str): Path of the progress checkpoint file.
+        force (bool): Scan even if the scan cache is still fresh.
+        budget_seconds (float): Time budget for this run; when it runs out, progress
+                                is checkpointed and the scan is left for the next run.
+
+    Returns:
+        bool: True if a scan was run to completion, False if the cache was still fresh
+              or the budget ran out first.
+    """
+    if not force and is_cache_fresh():
+        print("Scan cache is still fresh, skipping scan.")
+        return False
+
+    with deadline(budget_seconds):
+        return _run_scan(checkpoint_path)
+
+
+def _run_scan(checkpoint_path):
+
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint:
+        age = (datetime.datetime.now() - checkpoint["started_at"]).total_seconds()
+        if age > CHECKPOINT_MAX_AGE_SECONDS:
+            print("Discarding stale scan checkpoint.")
+            checkpoint = None
+
+    if checkpoint:
+        print(f"Resuming scan at item {checkpoint['index']} of {len(checkpoint['queries'])}.")
+    else:
+        print("Building scan plan...")
+        checkpoint = {
+            "started_at": datetime.datetime.now(),
+            "index": 0,
+            "queries": build_scan_queries(),
+            "scan_results": [],
+        }
+        save_checkpoint(checkpoint, checkpoint_path)
+
+    scanner = DisasterScanner()
+    scanner.prefetch_fema(days=30)
+    plan_runner = ScanPlanRunner(scanner)
+
+    queries = checkpoint["queries"]
+    for i in range(checkpoint["index"], len(queries)):
+        if remaining_time() == 0:
+            checkpoint["scan_results"] = dedupe_scan_results(checkpoint["scan_results"])
+            save_checkpoint(checkpoint, checkpoint_path)
+            print(f"Scan time budget spent at item {i} of {len(queries)}; the next run resumes here.")
+            return False
+        q_item = queries[i]
+        print(f"[{i + 1}/{len(queries)}] {describe_scan_query(q_item)}")
+        checkpoint["scan_results"].extend(run_scan_query(q_item, scanner, plan_runner))
+        checkpoint["index"] = i + 1
+
+        if (i + 1) % CHECKPOINT_EVERY == 0:
+            checkpoint["scan_results"] = dedupe_scan_results(checkpoint["scan_results"])
+            save_checkpoint(checkpoint, checkpoint_path)
+
+    # Keep alerts the chatbot posted to the cache while the scan was running
+    posted_alerts = [r for r in load_scan_cache()["scan_results"] if r.get("source") == "Chatbot"]
+    scan_results = posted_alerts + dedupe_scan_results(checkpoint["scan_results"])
+    scan_results = merge_nws_results(scan_results, get_nws_cell_results())
+    save_scan_cache(scan_results, datetime.datetime.now())
+    os.remove(checkpoint_path)
+    print(f"Published {len(scan_results)} scan results. {plan_runner.summary()}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the disaster heatmap scan outside Streamlit.")
+    parser.add_argument("--force", action="store_true", help="Scan even if the scan cache is still fresh.")
+    parser.add_argument("--checkpoint", default=SCAN_CHECKPOINT_FILE, help="Path of the progress checkpoint file.")
+    parser.add_argument("--every", type=float, default=None,
+                        help="Keep running and rescan every N minutes instead of exiting after one scan.")
+    parser.add_argument("--budget", type=float, default=SCAN_TIME_BUDGET_SECONDS / 60,
+                        help="Stop a run after N minutes, keeping its progress for the next run.")
+    args = parser.parse_args()
+
+    while True:
+        try:
+            run_scan(checkpoint_path=args.checkpoint, force=args.force, budget_seconds=args.budget * 60)
+        except Exception as e:
+            # Progress up to the last checkpoint is kept, the next run resumes from it
+            print(f"Scan failed: {e}")
+            if args.every is None:
+                raise
+        if args.every is None:
+            break
+        time.sleep(args.every * 60)
+
+
+if __name__ == "__main__":
+    main()
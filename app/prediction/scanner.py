@@ -1,11 +1,32 @@
-import streamlit as st
+from app.memo import memoize
 import re
-import torch
-from transformers import pipeline
-from app.chatbot.tools.openfema import get_fema_disaster_declarations
+from app.chatbot.tools.openfema import (
+    get_fema_declaration_records,
+    fetch_national_fema_declarations,
+    distinct_disasters,
+    FemaDeclarationIndex,
+)
 
-@st.cache_resource
+# Severity (0-10) of a FEMA declaration by its incidentType
+FEMA_SEVERITY_SCORES = {
+    'Flood': 8,
+    'Hurricane': 10,
+    'Tornado': 9,
+    'Earthquake': 10,
+    'Fire': 9,
+    'Severe Storm': 7,
+    'Winter Storm': 6,
+    'Drought': 5,
+    'Other': 4
+}
+
+@memoize()
 def get_classifier():
+    # torch and transformers take several seconds to import, so they are only
+    # loaded here, the first time a text actually needs classifying.
+    import torch
+    from transformers import pipeline
+
     # Using a small, fast zero-shot classification model
     # This is locally instantiated and doesn't need an API key for classification
     return pipeline(
@@ -14,9 +35,19 @@ def get_classifier():
         device=0 if torch.cuda.is_available() else -1
     )
 
+@memoize(ttl=1800)
+def get_fema_declaration_index(days=30):
+    """
+    Fetches the national declarations once per scan window and indexes them.
+    """
+    declarations = fetch_national_fema_declarations(days=days)
+    print(f"Prefetched {len(declarations)} FEMA declarations from the last {days} days.")
+    return FemaDeclarationIndex(declarations)
+
 class DisasterScanner:
     def __init__(self):
-        self.classifier = get_classifier()
+        self._classifier = None
+        self.fema_index = None
         self.candidate_labels = ["Critical Disaster", "Moderate Warning", "General Information", "Not Disaster Related"]
         # Fast keyword pre-filter to avoid constant LLM inference
         self.disaster_keywords = [
@@ -24,6 +55,15 @@ class DisasterScanner:
             "fire", "wildfire", "emergency", "evacuation", "warning", "watch",
             "damage", "victim", "rescue", "disaster", "alert", "danger"
         ]
+
+    @property
+    def classifier(self):
+        """
+        The zero-shot pipeline, loaded on first use so FEMA-only scans never import torch.
+        """
+        if self._classifier is None:
+            self._classifier = get_classifier()
+        return self._classifier
         
     def get_severity_score(self, text):
         """
@@ -96,6 +136,48 @@ class DisasterScanner:
             
         return results
 
+    def prefetch_fema(self, days=30):
+        """
+        Loads the national FEMA declarations so scan_bundle_news can score bundles in memory.
+        Falls back to per-bundle API queries if the bulk fetch fails.
+        """
+        try:
+            self.fema_index = get_fema_declaration_index(days)
+        except Exception as e:
+            print(f"Error prefetching FEMA declarations: {e}")
+            self.fema_index = None
+        return self.fema_index
+
+    def find_declarations(self, state_abbr, county=None):
+        """
+        Returns the recent FEMA declarations for a state or county as FemaDeclaration records.
+        A failed lookup is logged and treated as no declarations.
+        """
+        if self.fema_index is not None:
+            return self.fema_index.lookup(state_abbr, county)
+        try:
+            return get_fema_declaration_records(state=state_abbr, county=county, days=30)
+        except Exception as e:
+            print(f"Error fetching FEMA declarations for {state_abbr} {county or ''}: {e}")
+            return []
+
+    def score_declarations(self, declarations):
+        """
+        Returns (severity, top declaration) for the most severe of the latest distinct disasters.
+        """
+        disasters = distinct_disasters(declarations, limit=5)
+        if not disasters:
+            return 0, None
+
+        max_severity = 0
+        top_disaster = disasters[0]
+        for disaster in disasters:
+            severity = FEMA_SEVERITY_SCORES.get(disaster.incident_type, 4)
+            if severity > max_severity:
+                max_severity = severity
+                top_disaster = disaster
+        return max_severity, top_disaster
+
     def scan_bundle_news(self, bundle):
         counties = bundle.get('counties', [])[:3]
         state = bundle.get('state', "Unknown")
@@ -104,74 +186,32 @@ class DisasterScanner:
         if not state_abbr or state_abbr == "Unknown":
             return self._empty_response(bundle)
 
-        fema_data = ""
-
         # Try county-specific queries first, then fall back to state
-        if counties:
-            for county in counties:
-                fema_result = get_fema_disaster_declarations(state=state_abbr, county=county, days=30)
-                fema_data = fema_result.get("summary", "") if isinstance(fema_result, dict) else fema_result
-                if not ("No recent FEMA disaster declarations found" in fema_data or "Error" in fema_data):
-                    break
-        
-        # If no county-specific results, try state-wide
-        if not fema_data or "No recent FEMA disaster declarations found" in fema_data or "Error" in fema_data:
-            fema_result = get_fema_disaster_declarations(state=state_abbr, days=30)
-            fema_data = fema_result.get("summary", "") if isinstance(fema_result, dict) else fema_result
+        declarations = []
+        for county in counties:
+            declarations = self.find_declarations(state_abbr, county)
+            if declarations:
+                break
 
-        if "No recent FEMA disaster declarations found" in fema_data or "Error" in fema_data:
-            return self._empty_response(bundle)
+        if not declarations:
+            declarations = self.find_declarations(state_abbr)
 
-        # Parse the FEMA data to extract disaster info
-        lines = fema_data.split('\n')
-        disasters = []
-        for line in lines:
-            if line.startswith('- '):
-                # Extract date, title, type, id
-                parts = line[2:].split(': ')
-                if len(parts) >= 2:
-                    date = parts[0]
-                    rest = ': '.join(parts[1:])
-                    # Extract incident type
-                    if '(Type: ' in rest:
-                        title_part, type_part = rest.split(' (Type: ')
-                        incident_type = type_part.split(',')[0]
-                        disasters.append({
-                            'date': date,
-                            'title': title_part,
-                            'type': incident_type
-                        })
+        return self.build_bundle_result(bundle, declarations)
 
-        if not disasters:
+    def build_bundle_result(self, bundle, declarations):
+        """
+        Turns the declarations found for a bundle into a heatmap scan result.
+        """
+        max_severity, top_disaster = self.score_declarations(declarations)
+        if top_disaster is None:
             return self._empty_response(bundle)
 
-        # Determine severity based on disaster types
-        severity_scores = {
-            'Flood': 8,
-            'Hurricane': 10,
-            'Tornado': 9,
-            'Earthquake': 10,
-            'Fire': 9,
-            'Severe Storm': 7,
-            'Winter Storm': 6,
-            'Drought': 5,
-            'Other': 4
-        }
-
-        max_severity = 0
-        top_disaster = disasters[0]
-        for disaster in disasters:
-            incident_type = disaster['type']
-            severity = severity_scores.get(incident_type, 4)
-            if severity > max_severity:
-                max_severity = severity
-                top_disaster = disaster
-
-        top_text = f"{top_disaster['title']} (Type: {top_disaster['type']}, Date: {top_disaster['date']})"
+        counties = bundle.get('counties', [])[:3]
+        top_text = f"{top_disaster.title} (Type: {top_disaster.incident_type}, Date: {top_disaster.declaration_date})"
 
         output = {
             "severity": max_severity,
-            "location": ", ".join(counties) if counties else state,
+            "location": ", ".join(counties) if counties else bundle.get('state', "Unknown"),
             "text": top_text,
             "cell": bundle.get('h3')
         }
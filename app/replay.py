@@ -0,0 +1,264 @@
+"""
+Record and replay of upstream API traffic, for offline benchmarks and load tests.
+
+Set REPLAY_MODE to switch every external call of the app into one of:
+
+    REPLAY_MODE=record   # call the real APIs and save each response as a fixture
+    REPLAY_MODE=replay   # answer every call from the fixtures, never touch the network
+
+Fixtures are JSON files under REPLAY_DIR (default tests/fixtures/replay), one
+per request, grouped by host. REPLAY_LATENCY adds that many seconds to each
+replayed response to simulate upstream latency.
+
+Covered are the shared HTTP layer in app/transport.py (OpenFEMA, NWS, EONET),
+the pooled OpenAI clients for Novita (app/chatbot/llm_client.py), and
+DuckDuckGo searches (ddgs has its own HTTP stack, so whole search calls are
+recorded instead).
+
+Requests are matched on method, URL and body, never on headers, so API keys
+do not end up in fixtures. Dates and years are masked so fixtures recorded on
+one day still match the date filters computed on another. Chat completions only
+match on model, messages and stream, so editing a tool description does not
+invalidate recorded sessions.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import re
+import time
+from urllib.parse import urlsplit, urlencode, parse_qsl
+
+import httpx
+import requests
+
+DEFAULT_FIXTURE_DIR = os.path.join("tests", "fixtures", "replay")
+
+# Headers that describe the wire encoding (the stored body is decoded) or must not be saved
+_SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+_CHAT_KEY_FIELDS = ("model", "messages", "stream")
+_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}(T[0-9:.]+(Z|[+-]\d{2}:?\d{2})?)?|(?<![\d.])(19|20)\d{2}(?![\d.])")
+
+
+class MissingFixtureError(LookupError):
+    """
+    Raised in replay mode when no fixture was recorded for a request.
+    """
+
+
+def get_mode():
+    """
+    Returns "record", "replay" or None.
+    """
+    mode = os.environ.get("REPLAY_MODE", "").strip().lower()
+    return mode if mode in ("record", "replay") else None
+
+
+def is_replaying():
+    return get_mode() == "replay"
+
+
+def is_recording():
+    return get_mode() == "record"
+
+
+def get_fixture_dir():
+    return os.environ.get("REPLAY_DIR") or DEFAULT_FIXTURE_DIR
+
+
+def get_latency():
+    try:
+        return float(os.environ.get("REPLAY_LATENCY", 0))
+    except ValueError:
+        return 0.0
+
+
+def _key_body(body):
+    if not body:
+        return ""
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    if isinstance(data, dict) and "messages" in data:
+        data = {k: data[k] for k in _CHAT_KEY_FIELDS if k in data}
+        data["messages"] = [_message_key(m) for m in data.get("messages", [])]
+    return json.dumps(data, sort_keys=True)
+
+
+def _message_key(message):
+    # Only what the model sees; the SDK's serialization of extra (null) fields varies between versions
+    key = {k: message[k] for k in ("role", "content", "tool_call_id", "name") if message.get(k)}
+    if message.get("tool_calls"):
+        key["tool_calls"] = [{"id": call.get("id"), "function": call.get("function")} for call in message["tool_calls"]]
+    return key
+
+
+def request_key(method, url, body=None):
+    """
+    Stable fixture key for a request: query parameters are sorted and dates masked.
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    normalized = f"{method.upper()} {parts.scheme}://{parts.netloc}{parts.path}?{query}\n{_key_body(body)}"
+    return hashlib.sha1(_DATE_PATTERN.sub("<date>", normalized).encode("utf-8")).hexdigest()
+
+
+def _fixture_path(kind, key):
+    return os.path.join(get_fixture_dir(), kind, f"{key[:20]}.json")
+
+
+def load_fixture(kind, key, description=""):
+    path = _fixture_path(kind, key)
+    if not os.path.exists(path):
+        raise MissingFixtureError(f"No replay fixture for {description or key} ({path})")
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_fixture(kind, key, fixture):
+    path = _fixture_path(kind, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(fixture, f, indent=2, sort_keys=True)
+
+
+def _encode_body(content):
+    try:
+        return {"body": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(fixture):
+    if "body_base64" in fixture:
+        return base64.b64decode(fixture["body_base64"])
+    return fixture.get("body", "").encode("utf-8")
+
+
+def _response_fixture(method, url, status, headers, content):
+    fixture = {
+        "request": {"method": method, "url": url},
+        "status": status,
+        "headers": {k: v for k, v in headers.items() if k.lower() not in _SKIPPED_HEADERS},
+    }
+    fixture.update(_encode_body(content))
+    return fixture
+
+
+def _prepared_url(url, params):
+    return requests.Request("GET", url, params=params).prepare().url
+
+
+def replay_http(url, params=None):
+    """
+    Returns the recorded GET response as a cache-style entry ({"status", "headers", "body"}).
+    """
+    full_url = _prepared_url(url, params)
+    fixture = load_fixture(urlsplit(full_url).hostname, request_key("GET", full_url), f"GET {full_url}")
+    time.sleep(get_latency())
+    return {"status": fixture["status"], "headers": fixture["headers"], "body": _decode_body(fixture)}
+
+
+def record_http(url, params, status, headers, content):
+    full_url = _prepared_url(url, params)
+    save_fixture(urlsplit(full_url).hostname, request_key("GET", full_url),
+                 _response_fixture("GET", full_url, status, headers, content))
+
+
+def _replayed_httpx_response(request):
+    fixture = load_fixture(request.url.host, request_key(request.method, str(request.url), request.content),
+                           f"{request.method} {request.url}")
+    return httpx.Response(fixture["status"], headers=fixture["headers"], content=_decode_body(fixture), request=request)
+
+
+def _record_httpx_response(request, response, content):
+    save_fixture(request.url.host, request_key(request.method, str(request.url), request.content),
+                 _response_fixture(request.method, str(request.url), response.status_code, response.headers, content))
+    headers = {k: v for k, v in response.headers.items() if k.lower() not in _SKIPPED_HEADERS}
+    return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """
+    httpx transport that records through, or replays instead of, the wrapped transport.
+    """
+    def __init__(self, inner):
+        self._inner = inner
+
+    def handle_request(self, request):
+        request.read()
+        if is_replaying():
+            time.sleep(get_latency())
+            return _replayed_httpx_response(request)
+        response = self._inner.handle_request(request)
+        try:
+            content = response.read()
+        finally:
+            response.close()
+        return _record_httpx_response(request, response, content)
+
+    def close(self):
+        self._inner.close()
+
+
+class AsyncReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Async variant of ReplayTransport.
+    """
+    def __init__(self, inner):
+        self._inner = inner
+
+    async def handle_async_request(self, request):
+        await request.aread()
+        if is_replaying():
+            await asyncio.sleep(get_latency())
+            return _replayed_httpx_response(request)
+        response = await self._inner.handle_async_request(request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        return _record_httpx_response(request, response, content)
+
+    async def aclose(self):
+        await self._inner.aclose()
+
+
+def wrap_transport(transport):
+    """
+    Returns the transport wrapped for recording/replaying, or unchanged when neither is on.
+    """
+    return ReplayTransport(transport) if get_mode() else transport
+
+
+def wrap_async_transport(transport):
+    """
+    Async variant of wrap_transport.
+    """
+    return AsyncReplayTransport(transport) if get_mode() else transport
+
+
+def replay_call(kind, params, func):
+    """
+    Records or replays a whole call (for clients we can't hook at the HTTP layer).
+
+    Args:
+        kind (str): Fixture group, e.g. "ddg".
+        params (dict): JSON-serializable arguments that identify the call.
+        func (callable): Makes the real call; its result must be JSON-serializable.
+    """
+    mode = get_mode()
+    if mode is None:
+        return func()
+    key = request_key("CALL", f"call://{kind}", json.dumps(params, sort_keys=True))
+    if mode == "replay":
+        fixture = load_fixture(kind, key, f"{kind} {params}")
+        time.sleep(get_latency())
+        return fixture["result"]
+    result = func()
+    save_fixture(kind, key, {"request": params, "result": result})
+    return result
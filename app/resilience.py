@@ -0,0 +1,234 @@
+"""
+Circuit breakers and deadline budgets for upstream calls.
+
+Circuit breakers: each upstream host gets a breaker that opens after
+FAILURE_THRESHOLD consecutive failures (timeouts, connection errors, 5xx/429).
+While open, calls to that host fail immediately with CircuitOpenError instead
+of waiting out their timeout. After RESET_TIMEOUT_SECONDS one probe call is
+let through (half-open); its outcome closes the breaker or opens it again.
+
+Rate limits: a TokenBucket spaces out calls to upstreams that throttle
+aggressive clients (DuckDuckGo), waiting for a token instead of getting
+rate-limited.
+
+Deadlines: a scan or chat turn can run under `with deadline(seconds):`. Every
+upstream call made inside it (in this thread, in asyncio tasks, or in threads
+started with copy_context) gets at most the remaining budget as its timeout,
+and fails with DeadlineExceeded once the budget is spent.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT_SECONDS = 30
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling an upstream whose circuit breaker is open.
+    """
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when the surrounding time budget has run out before a call could start.
+    """
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one upstream host.
+    """
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.rejected = 0  # calls failed fast while open
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Raises CircuitOpenError if the call must not go out.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self.rejected += 1
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open after {self.failures} failures)")
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def release(self):
+        """
+        Ends a call without an outcome (e.g. the caller gave up), freeing the half-open probe slot.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    print(f"Circuit for {self.name} opened after {self.failures} failures.")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def call(self, func, failures=(Exception,)):
+        """
+        Runs func() through the breaker.
+
+        Args:
+            func (callable): The upstream call.
+            failures (tuple): Exception types that count as the upstream failing;
+                              other exceptions are re-raised without counting.
+        """
+        self.before_call()
+        try:
+            result = func()
+        except failures:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Not a verdict on the upstream (no results, cancellation, Ctrl-C): leave the state alone
+            self.release()
+            raise
+        self.record_success()
+        return result
+
+
+class RateLimited(Exception):
+    """
+    Raised when a TokenBucket can't hand out a token within the allowed wait.
+    """
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter: `rate` tokens per second, at most `capacity` saved up for bursts.
+    """
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, max_wait):
+        # Takes a token (possibly going into debt) and returns how long to wait before using it
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if wait > max_wait:
+                raise RateLimited(f"No request slot within {max_wait:.0f}s (next in {wait:.1f}s)")
+            self.tokens -= 1
+            return wait
+
+    def acquire(self, max_wait):
+        """
+        Blocks until a token is available.
+
+        Args:
+            max_wait (float): Longest acceptable wait in seconds, further capped by
+                              the current deadline budget.
+
+        Raises:
+            RateLimited: If the wait would be longer than that.
+        """
+        wait = self._reserve(budget_timeout(max_wait))
+        if wait:
+            time.sleep(wait)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name):
+    """
+    Returns the process-wide breaker for an upstream (usually its hostname).
+    """
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def get_circuit_states():
+    """
+    Returns {upstream: {"state", "failures", "rejected"}} for monitoring.
+    """
+    with _breakers_lock:
+        return {name: {"state": b.state, "failures": b.failures, "rejected": b.rejected}
+                for name, b in _breakers.items()}
+
+
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+def deadline(seconds):
+    """
+    Runs the block under a time budget. Nested budgets can only shorten the outer one.
+    """
+    return deadline_at(time.monotonic() + seconds)
+
+
+@contextmanager
+def deadline_at(at):
+    """
+    Like deadline, but with an absolute time.monotonic() value, so several
+    blocks (e.g. the steps of a streamed chat turn) can share one budget.
+    """
+    current = _deadline.get()
+    token = _deadline.set(at if current is None else min(current, at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time():
+    """
+    Seconds left in the current budget (never negative), or None if there is no budget.
+    """
+    at = _deadline.get()
+    if at is None:
+        return None
+    return max(0.0, at - time.monotonic())
+
+
+def budget_timeout(timeout):
+    """
+    Caps a call's timeout to the remaining budget.
+
+    Raises:
+        DeadlineExceeded: If the budget is already spent.
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return timeout
+    if remaining <= 0:
+        raise DeadlineExceeded("Time budget exhausted before the call could start")
+    return min(timeout, remaining) if timeout else remaining
@@ -0,0 +1,139 @@
+"""
+Request coalescing ("singleflight") for the data tools.
+
+Memoization (app/memo.py) only helps once a call has finished; until then,
+every session asking the same question runs its own upstream request.
+Functions wrapped with @coalesce share one in-flight call per set of arguments:
+the first caller runs it, and callers arriving while it runs wait for and
+return the same result (or exception). Nothing is cached after the call finishes, which is left to
+@memoize and the HTTP cache.
+
+@coalesce also works on coroutine functions: concurrent awaits with the same
+arguments on one event loop share a single task. Every caller awaits it
+shielded, so a caller being cancelled never cancels the call for the others.
+"""
+import asyncio
+import functools
+import inspect
+import threading
+from collections import defaultdict
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Tracks in-flight calls by key and counts how many were coalesced.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = defaultdict(lambda: {"calls": 0, "coalesced": 0})
+
+    def do(self, name, key, func, *args, **kwargs):
+        """
+        Runs func(*args, **kwargs) unless a call with the same key is already running,
+        in which case that call's result is returned instead.
+        """
+        with self._lock:
+            self._stats[name]["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self._stats[name]["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, name, key, func, *args, **kwargs):
+        """
+        Async variant of do: awaits func(*args, **kwargs) unless the same call is
+        already running on this event loop, in which case its result is awaited instead.
+        """
+        loop = asyncio.get_running_loop()
+        key = (loop, key)
+        with self._lock:
+            self._stats[name]["calls"] += 1
+            task = self._calls.get(key)
+            if task is None:
+                # Its own task, so it keeps running for the others if the caller that started it goes away
+                task = self._calls[key] = asyncio.ensure_future(func(*args, **kwargs))
+                task.add_done_callback(lambda _: self._forget(key))
+            else:
+                self._stats[name]["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key):
+        with self._lock:
+            del self._calls[key]
+
+    def stats(self):
+        """
+        Returns {function name: {"calls", "coalesced"}} counted since startup.
+        """
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._stats.items()}
+
+
+_flights = SingleFlight()
+
+
+def coalesce(func):
+    """
+    Decorator: concurrent calls with identical arguments share one execution.
+    Put it below @memoize so cache hits never reach it.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                return await func(*args, **kwargs)
+            return await _flights.do_async(name, key, func, *args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (name, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable arguments can't be matched, just run the call
+            return func(*args, **kwargs)
+        return _flights.do(name, key, func, *args, **kwargs)
+
+    return wrapper
+
+
+def get_coalescing_stats():
+    """
+    Returns how many calls each coalesced function received and how many of them
+    waited on another caller's request instead of making their own.
+    """
+    return _flights.stats()
@@ -0,0 +1,347 @@
+"""
+Shared HTTP transport for the data tools (OpenFEMA, NWS, NASA EONET).
+
+All upstream calls go through one pooled requests.Session, so connections and
+TLS sessions are kept alive and reused across calls instead of paying a
+handshake per request. Idempotent GETs are retried with jittered exponential
+backoff on 429/5xx responses.
+
+Responses from the public data APIs are also kept in a disk cache (see
+app/http_cache.py) so warm restarts do not refetch them.
+
+Each upstream host sits behind a circuit breaker, and calls made under a
+deadline (see app/resilience.py) get at most the remaining budget as their
+timeout. While a host's breaker is open, or once the budget is spent, calls
+fail fast (or fall back to a stale cached copy) instead of waiting.
+
+With REPLAY_MODE set, every call is recorded to or replayed from fixture
+files instead (see app/replay.py).
+
+Async callers get the same behaviour from a shared httpx.AsyncClient (one per
+event loop), with a semaphore bounding how many requests are in flight.
+"""
+import asyncio
+import random
+import threading
+import weakref
+from urllib.parse import urlparse
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util import Retry
+
+from app import replay
+from app.resilience import get_circuit_breaker, budget_timeout, remaining_time, CircuitOpenError, DeadlineExceeded
+from app.http_cache import get_cache_policy, get_cache_key, get_ttl, get_conditional_headers, get_http_cache
+
+# User-Agent is required by the NWS API
+USER_AGENT = "FlashFloodPredictionApp/1.0 (contact: dominick@example.com)"
+
+DEFAULT_TIMEOUT = 10
+# Per-host timeouts in seconds
+HOST_TIMEOUTS = {
+    "www.fema.gov": 15,
+    "api.weather.gov": 10,
+    "eonet.gsfc.nasa.gov": 15,
+}
+
+POOL_HOSTS = 10  # Number of per-host connection pools kept alive
+POOL_MAXSIZE_PER_HOST = 8  # Max concurrent connections to any single host
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 0.5
+ASYNC_MAX_CONCURRENCY = 16  # Max in-flight async requests per event loop
+
+_session = None
+_no_retry_session = None
+_session_lock = threading.Lock()
+# httpx.AsyncClient and asyncio.Semaphore are bound to the loop they were created on
+_async_clients = weakref.WeakKeyDictionary()
+_async_semaphores = weakref.WeakKeyDictionary()
+
+
+def _build_retry():
+    retry_args = dict(
+        total=3,
+        connect=3,
+        read=2,
+        status=3,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    try:
+        return Retry(backoff_jitter=0.5, **retry_args)
+    except TypeError:
+        # urllib3 < 2 has no jitter option
+        return Retry(**retry_args)
+
+
+def _build_session(max_retries):
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_HOSTS,
+        pool_maxsize=POOL_MAXSIZE_PER_HOST,
+        pool_block=True,
+        max_retries=max_retries,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept-Encoding": "gzip, deflate",
+    })
+    return session
+
+
+def get_session(retries=True):
+    """
+    Returns the process-wide pooled session, creating it on first use.
+
+    Args:
+        retries (bool): False returns a pooled session whose adapter never retries,
+            for calls that must finish within a deadline.
+    """
+    global _session, _no_retry_session
+    if retries and _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session(_build_retry())
+    if not retries and _no_retry_session is None:
+        with _session_lock:
+            if _no_retry_session is None:
+                _no_retry_session = _build_session(Retry(total=0, raise_on_status=False))
+    return _session if retries else _no_retry_session
+
+
+def get_timeout(url):
+    """
+    Returns the configured timeout for the URL's host.
+    """
+    return HOST_TIMEOUTS.get(urlparse(url).hostname, DEFAULT_TIMEOUT)
+
+
+def _prepare_cached_request(url, params, headers, use_cache):
+    """
+    Looks the request up in the disk cache.
+
+    Returns:
+        tuple: (cache key, policy TTL, cached entry, request headers). The key is
+               None when the URL is not cacheable.
+    """
+    # Record/replay runs must see exactly the recorded responses
+    policy_ttl = get_cache_policy(url) if use_cache and not replay.get_mode() else None
+    if policy_ttl is None:
+        return None, None, None, headers
+    key = get_cache_key(url, params)
+    entry = get_http_cache().get(key)
+    request_headers = dict(headers or {})
+    if entry:
+        request_headers.update(get_conditional_headers(entry))
+    return key, policy_ttl, entry, request_headers
+
+
+def _store_response(key, policy_ttl, entry, status_code, headers, content):
+    """
+    Updates the disk cache from an upstream response.
+
+    Returns:
+        bool: True if the server answered 304 and the cached entry should be served.
+    """
+    if status_code == 304 and entry:
+        # A 304 only carries changed headers; the stored Cache-Control still applies otherwise
+        merged_headers = CaseInsensitiveDict(entry["headers"])
+        merged_headers.update(headers)
+        get_http_cache().touch(key, get_ttl(merged_headers, policy_ttl) or 0)
+        return True
+    if status_code == 200:
+        ttl = get_ttl(headers, policy_ttl)
+        if ttl is not None:
+            get_http_cache().put(key, status_code, dict(headers), content, ttl)
+    return False
+
+
+def _record_outcome(breaker, status_code):
+    # Rate limiting and server errors that survived the retries count against the host
+    if status_code in RETRY_STATUSES:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+
+def _requests_response(url, entry):
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.reason = "OK"
+    response.url = url
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response._content = entry["body"]
+    response.encoding = "utf-8"
+    response.from_cache = True
+    return response
+
+
+def _httpx_response(url, entry):
+    return httpx.Response(
+        entry["status"],
+        headers=entry["headers"],
+        content=entry["body"],
+        request=httpx.Request("GET", url),
+    )
+
+
+def http_get(url, params=None, headers=None, timeout=None, use_cache=True):
+    """
+    GET a URL through the shared session.
+
+    Responses from sources with a cache policy are served from the disk cache
+    while fresh and revalidated with a conditional GET once stale. If the
+    upstream is unreachable, a stale cached copy is served instead of failing.
+
+    Args:
+        url (str): The URL to fetch.
+        params (dict): Optional query parameters.
+        headers (dict): Optional extra headers for this request.
+        timeout (float): Optional timeout override; defaults to the host's timeout.
+        use_cache (bool): Set False to bypass the disk cache.
+
+    Returns:
+        requests.Response: The response (status is not checked).
+    """
+    if replay.is_replaying():
+        return _requests_response(url, replay.replay_http(url, params))
+
+    response = _cached_get(url, params, headers, timeout, use_cache)
+    if replay.is_recording():
+        replay.record_http(url, params, response.status_code, response.headers, response.content)
+    return response
+
+
+def _cached_get(url, params, headers, timeout, use_cache):
+    key, policy_ttl, entry, request_headers = _prepare_cached_request(url, params, headers, use_cache)
+    if entry and entry["fresh"]:
+        return _requests_response(url, entry)
+
+    breaker = get_circuit_breaker(urlparse(url).hostname)
+    try:
+        request_timeout = budget_timeout(timeout or get_timeout(url))
+        # The timeout applies per attempt, so adapter retries could overrun an active deadline several times
+        session = get_session() if remaining_time() is None else get_session(retries=False)
+        breaker.before_call()
+        try:
+            response = session.get(url, params=params, headers=request_headers, timeout=request_timeout)
+        except requests.RequestException:
+            breaker.record_failure()
+            raise
+        _record_outcome(breaker, response.status_code)
+    except (requests.RequestException, CircuitOpenError, DeadlineExceeded) as e:
+        if entry:
+            print(f"Serving stale cached response for {url}: {e}")
+            return _requests_response(url, entry)
+        raise
+
+    if key and _store_response(key, policy_ttl, entry, response.status_code, response.headers, response.content):
+        return _requests_response(url, entry)
+    return response
+
+
+def get_async_client():
+    """
+    Returns the shared httpx.AsyncClient for the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            headers={
+                "User-Agent": USER_AGENT,
+                "Accept-Encoding": "gzip, deflate",
+            },
+            limits=httpx.Limits(
+                max_connections=ASYNC_MAX_CONCURRENCY,
+                max_keepalive_connections=POOL_MAXSIZE_PER_HOST,
+            ),
+            transport=replay.wrap_async_transport(httpx.AsyncHTTPTransport(retries=2)),
+            follow_redirects=True,
+        )
+        _async_clients[loop] = client
+        _async_semaphores[loop] = asyncio.Semaphore(ASYNC_MAX_CONCURRENCY)
+    return client
+
+
+def _retry_delay(attempt, response=None):
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return RETRY_BACKOFF * (2 ** attempt) + random.uniform(0, RETRY_BACKOFF)
+
+
+async def async_http_get(url, params=None, headers=None, timeout=None, use_cache=True):
+    """
+    Async GET through the shared client, with the same retry, timeout and disk cache policy as http_get.
+
+    Returns:
+        httpx.Response: The response (status is not checked).
+    """
+    key, policy_ttl, entry, request_headers = _prepare_cached_request(url, params, headers, use_cache)
+    if entry and entry["fresh"]:
+        return _httpx_response(url, entry)
+
+    client = get_async_client()
+    semaphore = _async_semaphores[asyncio.get_running_loop()]
+    timeout = timeout or get_timeout(url)
+    breaker = get_circuit_breaker(urlparse(url).hostname)
+
+    try:
+        budget_timeout(timeout)
+        breaker.before_call()
+        try:
+            for attempt in range(RETRY_ATTEMPTS + 1):
+                async with semaphore:
+                    response = await client.get(url, params=params, headers=request_headers,
+                                                timeout=budget_timeout(timeout))
+                if response.status_code not in RETRY_STATUSES or attempt == RETRY_ATTEMPTS:
+                    break
+                await asyncio.sleep(_retry_delay(attempt, response))
+        except httpx.TransportError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # The caller's budget ran out (or the task was cancelled) between attempts: not the host's fault
+            breaker.release()
+            raise
+        _record_outcome(breaker, response.status_code)
+    except (httpx.TransportError, CircuitOpenError, DeadlineExceeded) as e:
+        if entry:
+            print(f"Serving stale cached response for {url}: {e}")
+            return _httpx_response(url, entry)
+        raise
+
+    if key and _store_response(key, policy_ttl, entry, response.status_code, response.headers, response.content):
+        return _httpx_response(url, entry)
+    return response
+
+
+async def run_in_thread(func, *args, **kwargs):
+    """
+    Runs a blocking call (e.g. a client library without async support) in a
+    worker thread, counted against the same concurrency bound as async_http_get.
+    """
+    get_async_client()
+    async with _async_semaphores[asyncio.get_running_loop()]:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+
+async def close_async_client():
+    """
+    Closes the running loop's client, e.g. before the loop shuts down.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.pop(loop, None)
+    _async_semaphores.pop(loop, None)
+    if client is not None:
+        await client.aclose()
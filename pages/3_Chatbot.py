@@ -1,9 +1,10 @@
 import streamlit as st
-from app.chatbot.chatbot import DisasterAgent
+from app.chatbot.async_agent import SyncDisasterAgent
 from app.chatbot.tools.ddg_search import get_search, get_news_search
 from app.chatbot.tools.nws_alerts import get_nws_alerts
 from app.chatbot.tools.openfema import get_fema_disaster_declarations, get_fema_assistance_data
 from app.chatbot.tools.nasa_eonet import get_nasa_eonet_events
+from app.chatbot.tools.county_need import get_county_need_index
 import app.initialize as session_init
 from st_supabase_connection import SupabaseConnection
 from typing import Generator
@@ -51,7 +52,7 @@ def load_county_data():
 
 def get_agent():
     if "agent" not in st.session_state:
-        st.session_state.agent = DisasterAgent(
+        st.session_state.agent = SyncDisasterAgent(
             model_id=st.session_state.hf_model_id,
             api_token=st.session_state.hf_api_key,
             tools={
@@ -60,7 +61,8 @@ def get_agent():
                 "get_nws_alerts": get_nws_alerts,
                 "get_fema_disaster_declarations": get_fema_disaster_declarations,
                 "get_fema_assistance_data": get_fema_assistance_data,
-                "get_nasa_eonet_events": get_nasa_eonet_events
+                "get_nasa_eonet_events": get_nasa_eonet_events,
+                "get_county_need_index": get_county_need_index
             }
         )
     return st.session_state.agent
@@ -104,7 +104,7 @@ If any field cannot be determined from the transcription, use reasonable default
 - severity: 5
 """
                 
-                response = chatbot.get_response(prompt)
+                response = chatbot.get_response(prompt, tools=[])
                 
                 # Extract JSON from response
                 try:
@@ -0,0 +1,82 @@
+import pytest
+
+from app import http_cache, memo, resilience
+from app.chatbot.tools import ddg_store, eonet_store, fema_mirror, nws_snapshot
+from app.prediction import need_index
+
+
+@pytest.fixture(autouse=True)
+def isolated_http_cache(tmp_path, monkeypatch):
+    """
+    Gives every test its own empty HTTP disk cache instead of data/caches.
+    """
+    cache = http_cache.HttpCache(str(tmp_path / "http_cache.sqlite"))
+    monkeypatch.setattr(http_cache, "_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_fema_mirror(tmp_path, monkeypatch):
+    """
+    Points the OpenFEMA mirror at an empty directory so tests never read a real sync.
+    """
+    mirror_dir = tmp_path / "fema_mirror"
+    monkeypatch.setattr(fema_mirror, "MIRROR_DIR", str(mirror_dir))
+    monkeypatch.setattr(fema_mirror, "SYNC_STATE_FILE", str(mirror_dir / "sync_state.json"))
+    monkeypatch.setattr(fema_mirror, "_loaded", {})
+    return mirror_dir
+
+
+@pytest.fixture(autouse=True)
+def fresh_nws_snapshot(monkeypatch):
+    """
+    Starts every test without a loaded NWS alert snapshot or known zones.
+    """
+    monkeypatch.setattr(nws_snapshot, "_snapshot", None)
+    monkeypatch.setattr(nws_snapshot, "_zone_geometries", {})
+
+
+@pytest.fixture(autouse=True)
+def empty_eonet_store(monkeypatch):
+    """
+    Starts every test with nothing fetched into the EONET store.
+    """
+    monkeypatch.setattr(eonet_store, "_events", {})
+
+
+@pytest.fixture(autouse=True)
+def closed_circuit_breakers(monkeypatch):
+    """
+    Starts every test with all upstream circuit breakers closed.
+    """
+    monkeypatch.setattr(resilience, "_breakers", {})
+
+
+@pytest.fixture(autouse=True)
+def empty_ddg_store(monkeypatch):
+    """
+    Starts every test with no stored DuckDuckGo results and a full rate-limit bucket.
+    """
+    monkeypatch.setattr(ddg_store, "_queries", {})
+    monkeypatch.setattr(ddg_store, "_articles", {})
+    monkeypatch.setattr(ddg_store, "_bucket", ddg_store.TokenBucket(ddg_store.DDG_RATE_PER_SECOND, ddg_store.DDG_BURST))
+
+
+@pytest.fixture(autouse=True)
+def isolated_need_index(tmp_path, monkeypatch):
+    """
+    Points the county need index at a file that doesn't exist until a test builds it.
+    """
+    path = tmp_path / "county_need_index.parquet"
+    monkeypatch.setattr(need_index, "NEED_INDEX_FILE", str(path))
+    monkeypatch.setattr(need_index, "_loaded", None)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def isolated_memo_cache(tmp_path, monkeypatch):
+    """
+    Gives every test its own empty on-disk memo store.
+    """
+    monkeypatch.setattr(memo, "MEMO_CACHE_FILE", str(tmp_path / "memo.sqlite"))
+    monkeypatch.setattr(memo, "_sqlite_backends", {})
@@ -0,0 +1,219 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+from app.chatbot.chatbot import DisasterAgent
+from app.chatbot.tool_call_stream import ToolCallAccumulator
+
+
+def _tool_call(call_id, name, args):
+    return SimpleNamespace(id=call_id, type="function",
+                           function=SimpleNamespace(name=name, arguments=json.dumps(args)))
+
+
+class FakeCompletions:
+    """
+    First answer asks for all tools at once, the second answers in text.
+    """
+    def __init__(self, calls):
+        self.calls = calls
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs["messages"])
+        if len(self.requests) == 1:
+            message = SimpleNamespace(content=None, tool_calls=self.calls)
+        else:
+            message = SimpleNamespace(content="done", tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_tool_calls_run_concurrently_and_keep_their_order():
+    # Each tool waits until all three are running, so sequential execution would time out
+    barrier = threading.Barrier(3, timeout=5)
+
+    def slow(name):
+        def tool(**kwargs):
+            barrier.wait()
+            return {"summary": f"{name} result", "visuals": {"type": "map", "data": [name]}}
+        return tool
+
+    agent = DisasterAgent(tools={"get_rag_context": slow("rag"), "get_nws_alerts": slow("nws"),
+                                 "get_news_search": slow("news")})
+    completions = FakeCompletions([
+        _tool_call("call_0", "get_nws_alerts", {"lat": 36.16, "lon": -86.78}),
+        _tool_call("call_1", "get_news_search", {"query": "Nashville flood"}),
+        _tool_call("call_2", "get_rag_context", {"query": "flood safety"}),
+    ])
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    result = agent.get_response("Any floods in Nashville?", return_raw=True)
+    assert result["text"] == "done"
+    tool_messages = [m for m in completions.requests[1] if isinstance(m, dict) and m["role"] == "tool"]
+    assert [m["tool_call_id"] for m in tool_messages] == ["call_0", "call_1", "call_2"]
+    assert [m["content"] for m in tool_messages] == ["nws result", "news result", "rag result"]
+    assert len(result["visuals"]) == 3
+
+
+def test_unknown_tools_and_bad_arguments_become_error_messages():
+    agent = DisasterAgent(tools={"get_rag_context": lambda query: "ok"})
+    calls = [_tool_call("call_0", "no_such_tool", {}),
+             SimpleNamespace(id="call_1", type="function",
+                             function=SimpleNamespace(name="get_rag_context", arguments="{not json"))]
+    completions = FakeCompletions(calls)
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    agent.get_response("hi")
+    contents = [m["content"] for m in completions.requests[1] if isinstance(m, dict) and m["role"] == "tool"]
+    assert "not found" in contents[0]
+    assert "Invalid JSON" in contents[1]
+
+
+def _delta(index, call_id=None, name=None, arguments=None):
+    return SimpleNamespace(index=index, id=call_id, function=SimpleNamespace(name=name, arguments=arguments))
+
+
+def test_tool_calls_are_complete_once_their_json_closes_or_the_next_index_starts():
+    calls = ToolCallAccumulator()
+    assert calls.add(_delta(0, "call_0", "get_nws_alerts", "")) == []
+    assert calls.add(_delta(0, arguments='{"lat": 36.16, ')) == []
+    completed = calls.add(_delta(0, arguments='"lon": -86.78}'))
+    assert [c["id"] for c in completed] == ["call_0"]
+
+    # Arguments that never parse are handed out when the next call starts
+    assert calls.add(_delta(1, "call_1", "get_search", '{"query": "flood"')) == []
+    assert [c["id"] for c in calls.add(_delta(2, "call_2", "get_news_search", ""))] == ["call_1"]
+    assert [c["id"] for c in calls.finish()] == ["call_2"]
+    assert calls.finish() == []
+
+
+class FakeStream:
+    """
+    Streams one message's tool calls; the first tool must start before the second call's deltas are sent.
+    """
+    def __init__(self, started):
+        self.started = started
+
+    def chunk(self, content=None, tool_calls=None):
+        delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    def __iter__(self):
+        yield self.chunk(tool_calls=[_delta(0, "call_0", "get_nws_alerts", '{"lat": 36.16, "lon": -86.78}')])
+        assert self.started.wait(5), "first tool was not started while streaming"
+        yield self.chunk(tool_calls=[_delta(1, "call_1", "get_news_search", '{"query": "Nashville"}')])
+
+
+def test_stream_starts_tools_before_the_stream_ends():
+    started = threading.Event()
+
+    def nws(**kwargs):
+        started.set()
+        return "nws result"
+
+    agent = DisasterAgent(tools={"get_rag_context": lambda query: "", "get_nws_alerts": nws,
+                                 "get_news_search": lambda query: "news result"})
+    responses = [FakeStream(started), [FakeStream(started).chunk(content="done")]]
+    requests = []
+
+    def create(**kwargs):
+        requests.append(list(kwargs["messages"]))
+        return responses[len(requests) - 1]
+
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    events = list(agent.get_response_stream("Any floods in Nashville?", return_raw=True))
+
+    assert {"type": "text", "data": "done"} in events
+    assert [m["content"] for m in requests[1] if m["role"] == "tool"] == ["nws result", "news result"]
+
+
+def _offered_tools(agent, **kwargs):
+    requests = []
+
+    def create(**request):
+        requests.append(request)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok", tool_calls=None))])
+
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    agent.get_response("hi", **kwargs)
+    return [schema["function"]["name"] for schema in requests[0].get("tools", [])]
+
+
+def test_only_registered_tools_are_offered_and_requests_can_narrow_them():
+    agent = DisasterAgent(tools={"get_rag_context": lambda query: "", "get_nws_alerts": lambda lat, lon: "",
+                                 "my_unschematized_tool": lambda: ""})
+
+    # No post_disaster_alert without an implementation; registry order, not dict order
+    assert _offered_tools(agent) == ["get_nws_alerts", "get_dropped_tool_output", "get_rag_context"]
+    assert _offered_tools(agent, tools=["get_nws_alerts", "post_disaster_alert"]) == \
+        ["get_nws_alerts", "get_dropped_tool_output"]
+    assert _offered_tools(agent, tools=[]) == []
+
+
+def test_calls_to_tools_outside_the_requested_subset_are_rejected():
+    ran = []
+    agent = DisasterAgent(tools={"get_rag_context": lambda query: ran.append("rag") or "context",
+                                 "get_nws_alerts": lambda lat, lon: ran.append("nws") or "alerts"})
+    completions = FakeCompletions([_tool_call("call_0", "get_nws_alerts", {"lat": 36.16, "lon": -86.78}),
+                                   _tool_call("call_1", "get_rag_context", {"query": "floods"})])
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    agent.get_response("Any floods in Nashville?", tools=["get_rag_context"])
+
+    assert ran == ["rag"]
+    assert [m["content"] for m in completions.requests[1][-2:]] == \
+        ["Error: Tool 'get_nws_alerts' not found.", "context"]
+
+
+def test_side_effecting_tools_run_one_at_a_time():
+    running, overlaps, order = [0], [], []
+    lock = threading.Lock()
+
+    def post_disaster_alert(location, summary, severity):
+        with lock:
+            running[0] += 1
+            overlaps.append(running[0])
+        time.sleep(0.05)
+        order.append(location)
+        with lock:
+            running[0] -= 1
+        return "posted"
+
+    agent = DisasterAgent(tools={"get_rag_context": lambda query: "", "post_disaster_alert": post_disaster_alert})
+    completions = FakeCompletions([
+        _tool_call(f"call_{i}", "post_disaster_alert", {"location": city, "summary": "Flooding", "severity": 7})
+        for i, city in enumerate(["Nashville, TN", "Memphis, TN", "Knoxville, TN"])
+    ])
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    agent.get_response("Post alerts")
+    assert max(overlaps) == 1
+    assert order == ["Nashville, TN", "Memphis, TN", "Knoxville, TN"]
+
+
+def test_concurrent_alert_posts_keep_every_alert(tmp_path, monkeypatch):
+    from app import common
+    from app.chatbot.tools.bounty_tools import post_disaster_alert
+
+    monkeypatch.setattr(common, "SCAN_CACHE_FILE", str(tmp_path / "scan_cache.json"))
+    threads = [threading.Thread(target=post_disaster_alert, args=(f"City {i}", "Flooding", 5)) for i in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(common.load_scan_cache()["scan_results"]) == 10
+
+
+def test_waiting_on_a_tool_stops_at_the_turn_budget():
+    release = threading.Event()
+    agent = DisasterAgent(tools={"get_rag_context": lambda query: release.wait(5) and "late"})
+
+    started = time.monotonic()
+    future = agent._start_tool("get_rag_context", '{"query": "floods"}', started + 0.1, {"get_rag_context"})
+    content, visual = agent._wait_for_tool(future, "get_rag_context", started + 0.1)
+    release.set()
+
+    assert time.monotonic() - started < 1
+    assert content == "Error executing tool: 'get_rag_context' did not finish within the time budget."
+    assert visual is None
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from app.chatbot.async_agent import AsyncDisasterAgent, SyncDisasterAgent, get_async_tool
+from app.chatbot.tools import ddg_search, nws_alerts
+
+
+def _tool_call(call_id, name, args):
+    return SimpleNamespace(id=call_id, type="function",
+                           function=SimpleNamespace(name=name, arguments=json.dumps(args)))
+
+
+def _fake_client(create):
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_sync_tools_resolve_to_their_async_siblings():
+    assert get_async_tool(ddg_search.get_search) is ddg_search.get_search_async
+    assert get_async_tool(nws_alerts.get_nws_alerts) is nws_alerts.get_nws_alerts_async
+    assert get_async_tool(lambda query: "") is None
+
+
+def test_tool_calls_run_as_concurrent_tasks():
+    requests = []
+
+    async def create(**kwargs):
+        requests.append(list(kwargs["messages"]))
+        if len(requests) == 1:
+            message = SimpleNamespace(content=None, tool_calls=[
+                _tool_call("call_0", "get_nws_alerts", {"lat": 36.16, "lon": -86.78}),
+                _tool_call("call_1", "get_news_search", {"query": "Nashville flood"}),
+            ])
+        else:
+            message = SimpleNamespace(content="done", tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    async def run():
+        # Each tool waits for the other, so running them one after another would time out
+        barrier = asyncio.Barrier(2)
+
+        def slow(name):
+            async def tool(**kwargs):
+                await asyncio.wait_for(barrier.wait(), 5)
+                return {"summary": f"{name} result", "visuals": {"type": "map", "data": [name]}}
+            return tool
+
+        agent = AsyncDisasterAgent(tools={"get_rag_context": slow("rag"), "get_nws_alerts": slow("nws"),
+                                          "get_news_search": slow("news")})
+        agent.client = _fake_client(create)
+        return await agent.get_response("Any floods in Nashville?", return_raw=True)
+
+    result = asyncio.run(run())
+    assert result["text"] == "done"
+    assert [m["content"] for m in requests[1] if isinstance(m, dict) and m["role"] == "tool"] == \
+        ["nws result", "news result"]
+    assert len(result["visuals"]) == 2
+
+
+class FakeAsyncStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def _chunk(content=None, tool_calls=None):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content, tool_calls=tool_calls))])
+
+
+def test_sync_adapter_streams_from_the_shared_loop():
+    tool_delta = SimpleNamespace(index=0, id="call_0",
+                                 function=SimpleNamespace(name="get_rag_context", arguments='{"query": "floods"}'))
+    responses = [FakeAsyncStream([_chunk(tool_calls=[tool_delta])]),
+                 FakeAsyncStream([_chunk(content="do"), _chunk(content="ne")])]
+    requests = []
+
+    async def create(**kwargs):
+        requests.append(list(kwargs["messages"]))
+        return responses[len(requests) - 1]
+
+    # A blocking tool without an async sibling runs in a worker thread
+    agent = SyncDisasterAgent(tools={"get_rag_context": lambda query: f"guide on {query}"})
+    agent.agent.client = _fake_client(create)
+    events = list(agent.get_response_stream("Flood prep?", return_raw=True))
+
+    assert [e["data"] for e in events if e["type"] == "text"] == ["do", "ne"]
+    assert {"type": "status", "data": "Finished tool: get_rag_context"} in events
+    assert [m["content"] for m in requests[1] if m["role"] == "tool"] == ["guide on floods"]
+
+
+def test_side_effecting_tools_never_overlap():
+    running, overlaps = [], []
+
+    def post_disaster_alert(**kwargs):
+        running.append(1)
+        overlaps.append(len(running))
+        time.sleep(0.02)
+        running.pop()
+        return "posted"
+
+    agent = AsyncDisasterAgent(api_token="token", tools={"post_disaster_alert": post_disaster_alert})
+
+    async def main():
+        turn_ends = time.monotonic() + 10
+        return await asyncio.gather(*(agent._execute_tool_async("post_disaster_alert", "{}", turn_ends, {"post_disaster_alert"})
+                                      for _ in range(3)))
+
+    results = asyncio.run(main())
+    assert [content for content, _ in results] == ["posted"] * 3
+    assert overlaps == [1, 1, 1]
@@ -0,0 +1,85 @@
+import asyncio
+
+import httpx
+
+from app import transport
+from app.chatbot.tools.nws_alerts import get_nws_alerts_async
+from app.chatbot.tools.openfema import get_fema_disaster_declarations_async
+
+
+def mock_upstream(monkeypatch, handler):
+    monkeypatch.setattr(transport, "RETRY_BACKOFF", 0)
+    monkeypatch.setattr(transport.httpx, "AsyncHTTPTransport", lambda retries: httpx.MockTransport(handler))
+
+
+def test_async_tools_fan_out_with_same_shapes(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.host)
+        if request.url.host == "api.weather.gov":
+            return httpx.Response(200, json={"features": [{
+                "geometry": {"type": "Polygon", "coordinates": [[[-87, 36], [-86.5, 36], [-86.5, 36.5], [-87, 36.5], [-87, 36]]]},
+                "properties": {"event": "Flood Warning", "severity": "Severe", "areaDesc": "Davidson", "headline": "Flooding"}}]})
+        return httpx.Response(200, json={"DisasterDeclarationsSummaries": [{
+            "disasterNumber": 4810, "declarationDate": "2025-05-10T00:00:00.000Z",
+            "declarationTitle": "FLOODING", "incidentType": "Flood", "state": "TN", "designatedArea": "Knox (County)"}]})
+
+    mock_upstream(monkeypatch, handler)
+
+    async def fan_out():
+        try:
+            return await asyncio.gather(
+                get_nws_alerts_async(36.16, -86.78),
+                get_fema_disaster_declarations_async(state="TN"),
+                get_fema_disaster_declarations_async(state="KY"),
+            )
+        finally:
+            await transport.close_async_client()
+
+    nws, fema_tn, fema_ky = asyncio.run(fan_out())
+    assert sorted(calls) == ["api.weather.gov", "www.fema.gov", "www.fema.gov"]
+    assert "Flood Warning" in nws["summary"] and nws["visuals"]["type"] == "map"
+    assert "FLOODING (Type: Flood, ID: 4810)" in fema_tn["summary"]
+    assert set(fema_ky) == {"summary", "visuals"}
+
+
+def test_async_get_retries_server_errors(monkeypatch):
+    statuses = [503, 429, 200]
+
+    def handler(request):
+        return httpx.Response(statuses.pop(0), json={})
+
+    mock_upstream(monkeypatch, handler)
+
+    async def fetch():
+        try:
+            return await transport.async_http_get("https://www.fema.gov/api/open/v2/x")
+        finally:
+            await transport.close_async_client()
+
+    assert asyncio.run(fetch()).status_code == 200
+    assert statuses == []
+
+
+def test_async_tools_coalesce_and_memoize_like_the_sync_ones(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.host)
+        if request.url.host == "api.weather.gov":
+            return httpx.Response(200, json={"features": []})
+        return httpx.Response(200, json={"DisasterDeclarationsSummaries": []})
+
+    mock_upstream(monkeypatch, handler)
+
+    async def ask_twice():
+        try:
+            await asyncio.gather(*(get_fema_disaster_declarations_async(state="TN") for _ in range(3)))
+            await get_nws_alerts_async(36.16, -86.78)
+            await get_nws_alerts_async(36.16, -86.78)
+        finally:
+            await transport.close_async_client()
+
+    asyncio.run(ask_twice())
+    assert sorted(calls) == ["api.weather.gov", "www.fema.gov"]
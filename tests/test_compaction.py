@@ -0,0 +1,66 @@
+from app.chatbot import compaction
+from app.chatbot.compaction import ToolOutputCompactor, count_tokens
+
+
+def _result(title, body):
+    return f"Title: {title}\nSource: Example\nDate: 2025-06-01\nLink: https://example.org/{title}\nSnippet: {body}"
+
+
+def test_small_outputs_are_unchanged():
+    compactor = ToolOutputCompactor()
+    assert compactor.compact("get_news_search", "No recent results found for 'x'.") == "No recent results found for 'x'."
+
+
+def test_relevant_items_are_kept_and_the_rest_can_be_fetched():
+    compactor = ToolOutputCompactor(budgets={"get_news_search": 200})
+    filler = "lorem ipsum dolor sit amet " * 12
+    items = [_result(f"story{i}", filler) for i in range(6)]
+    items.insert(4, _result("flood", "Tennessee flooding closed roads. " + filler))
+    text = "\n\n".join(items)
+
+    compacted = compactor.compact("get_news_search", text, {"query": "Tennessee flooding"})
+    assert count_tokens(compacted) <= 200
+    assert "Tennessee flooding closed roads" in compacted
+    ref = compacted.split("ref '")[1].split("'")[0]
+
+    dropped = compactor.get_dropped(ref)
+    kept_and_dropped = compacted.count("Title:") + dropped.count("Title:")
+    assert kept_and_dropped == len(items)
+    assert "No left-out tool output" in compactor.get_dropped("unknown-1")
+
+
+def test_single_oversized_item_is_truncated(monkeypatch):
+    monkeypatch.setattr(compaction, "_encoding", False)
+    compactor = ToolOutputCompactor(default_budget=100)
+    text = "word " * 1000
+
+    compacted = compactor.compact("get_rag_context_other", text)
+    assert count_tokens(compacted) < 150
+    ref = compacted.split("ref '")[1].split("'")[0]
+    assert len(compacted.split("\n\n[")[0]) + len(compactor.get_dropped(ref)) == len(text)
+
+
+class ByteEncoding:
+    """
+    One token per UTF-8 byte, decoded the way tiktoken does (a cut character becomes U+FFFD).
+    """
+    def encode(self, text, disallowed_special=()):
+        return list(text.encode("utf-8"))
+
+    def decode_bytes(self, tokens):
+        return bytes(tokens)
+
+    def decode(self, tokens):
+        return bytes(tokens).decode("utf-8", errors="replace")
+
+
+def test_oversized_item_split_inside_a_character_loses_nothing(monkeypatch):
+    monkeypatch.setattr(compaction, "_encoding", ByteEncoding())
+    compactor = ToolOutputCompactor(default_budget=13)  # 7 bytes for the item: a cut inside an "é"
+    text = "é" * 40
+
+    compacted = compactor.compact("get_rag_context_other", text)
+    kept = compacted.split("\n\n[")[0]
+    ref = compacted.split("ref '")[1].split("'")[0]
+    assert "\ufffd" not in kept
+    assert kept + compactor.get_dropped(ref) == text
@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+from ddgs.exceptions import RatelimitException
+
+from app import resilience
+from app.chatbot.tools import ddg_store
+from app.chatbot.tools.ddg_search import get_news_search
+from app.resilience import RateLimited, TokenBucket
+
+
+class FakeDDGS:
+    calls = []
+
+    def __init__(self, timeout=None):
+        pass
+
+    def news(self, query, **kwargs):
+        FakeDDGS.calls.append(query)
+        return [
+            {"title": f"{query} story", "url": "https://www.example.org/a/?utm_source=ddg", "date": "2025-06-01",
+             "body": "Shelters open.", "source": "Example"},
+            {"title": "Same story again", "url": "https://example.org/a", "body": "Duplicate."},
+            {"title": "Other story", "url": "https://example.org/b", "body": "Roads closed."},
+        ]
+
+
+@pytest.fixture
+def fake_ddgs(monkeypatch):
+    FakeDDGS.calls = []
+    monkeypatch.setattr(ddg_store, "DDGS", FakeDDGS)
+    return FakeDDGS
+
+
+def test_results_are_deduplicated_by_url_and_sliced(fake_ddgs):
+    articles = ddg_store.search("news", "Tennessee flooding")
+    assert [a["url"] for a in articles] == ["https://www.example.org/a/?utm_source=ddg", "https://example.org/b"]
+
+    text = get_news_search("Tennessee flooding", max_results=1)
+    assert "Tennessee flooding story" in text
+    assert "Other story" not in text
+    assert len(fake_ddgs.calls) == 1
+
+
+def test_overlapping_queries_share_one_entry(fake_ddgs):
+    ddg_store.search("news", "Tennessee flooding")
+    ddg_store.search("news", "  flooding   TENNESSEE ")
+    assert len(fake_ddgs.calls) == 1
+    assert ddg_store.get_store_stats()["articles"] == 2
+
+
+def test_concurrent_searches_are_all_counted(fake_ddgs):
+    ddg_store.search("news", "Tennessee flooding")
+    before = ddg_store.get_store_stats()["searches"]
+
+    def search_many():
+        for _ in range(500):
+            ddg_store.search("news", "Tennessee flooding")
+
+    threads = [threading.Thread(target=search_many) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert ddg_store.get_store_stats()["searches"] - before == 4000
+
+
+def test_stale_results_are_served_when_rate_limited(fake_ddgs, monkeypatch):
+    ddg_store.search("news", "Tennessee flooding")
+    monkeypatch.setattr(ddg_store, "RESULT_TTL_SECONDS", 0)
+
+    def throttled(self, query, **kwargs):
+        raise RatelimitException("202 Ratelimit")
+
+    monkeypatch.setattr(FakeDDGS, "news", throttled)
+    assert len(ddg_store.search("news", "Tennessee flooding")) == 2
+    with pytest.raises(RatelimitException):
+        ddg_store.search("news", "Kentucky flooding")
+
+
+def test_token_bucket_waits_then_refuses(monkeypatch):
+    now = [100.0]
+    sleeps = []
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(resilience.time, "sleep", sleeps.append)
+    bucket = TokenBucket(rate=0.5, capacity=2)
+
+    bucket.acquire(max_wait=5)
+    bucket.acquire(max_wait=5)
+    assert sleeps == []
+    bucket.acquire(max_wait=5)
+    assert sleeps == [2.0]
+    with pytest.raises(RateLimited):
+        bucket.acquire(max_wait=3)
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, timezone
+
+from app.chatbot.tools import eonet_store
+from app.chatbot.tools.nasa_eonet import get_nasa_eonet_events
+from app.common import fetch_nasa_eonet_events_for_map
+
+
+def iso(days_ago):
+    return (datetime.now(timezone.utc) - timedelta(days=days_ago)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+EVENTS = {"events": [
+    {"id": "EONET_1", "title": "Wildfire in Oregon", "categories": [{"title": "Wildfires"}],
+     "sources": [{"id": "InciWeb", "url": "https://inciweb.example/1"}],
+     "geometry": [{"date": iso(3), "type": "Point", "coordinates": [-121.0, 44.0]},
+                  {"date": iso(1), "type": "Point", "coordinates": [-121.5, 44.5]}]},
+    {"id": "EONET_2", "title": "Old iceberg", "categories": [{"title": "Sea and Lake Ice"}],
+     "sources": [], "geometry": [{"date": iso(60), "type": "Polygon",
+                                  "coordinates": [[[-150.0, 60.0], [-149.0, 60.0], [-149.0, 61.0], [-150.0, 60.0]]]}]},
+]}
+
+
+class FakeResponse:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return EVENTS
+
+
+def test_map_and_chatbot_share_one_fetch(monkeypatch):
+    requests_made = []
+
+    def fake_get(url, params=None, **kwargs):
+        requests_made.append(params)
+        return FakeResponse()
+
+    monkeypatch.setattr(eonet_store, "http_get", fake_get)
+
+    map_events = fetch_nasa_eonet_events_for_map()
+    tool = get_nasa_eonet_events(limit=5, days=20)
+
+    assert len(requests_made) == 1
+    assert requests_made[0]["bbox"] == ",".join(str(v) for v in eonet_store.US_BBOX)
+    # The latest geometry is used and both events are on the map
+    assert map_events[0]["lat"] == 44.5 and map_events[0]["severity"] == 9
+    assert (map_events[1]["lat"], map_events[1]["lon"]) == (60.0, -150.0)
+    # The tool only lists events active within its window
+    assert "Wildfire in Oregon" in tool["summary"] and "iceberg" not in tool["summary"]
+    assert tool["visuals"]["data"] == [{"lat": 44.5, "lon": -121.5, "name": "Wildfire in Oregon"}]
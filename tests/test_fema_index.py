@@ -0,0 +1,74 @@
+from app.chatbot.tools.openfema import FemaDeclaration, FemaDeclarationIndex, summarize_fema_declarations
+from app.prediction.scanner import DisasterScanner
+
+API_ROWS = [
+    {"disasterNumber": 4800, "state": "TN", "designatedArea": "Davidson (County)",
+     "declarationDate": "2025-05-02T00:00:00.000Z", "declarationTitle": "SEVERE STORMS", "incidentType": "Severe Storm"},
+    {"disasterNumber": 4810, "state": "TN", "designatedArea": "Knox (County)",
+     "declarationDate": "2025-05-10T00:00:00.000Z", "declarationTitle": "FLOODING", "incidentType": "Flood"},
+    {"disasterNumber": 4820, "state": "LA", "designatedArea": "Orleans (Parish)",
+     "declarationDate": "2025-05-12T00:00:00.000Z", "declarationTitle": "HURRICANE", "incidentType": "Hurricane"},
+]
+DECLARATIONS = [FemaDeclaration.from_api(row) for row in API_ROWS]
+
+
+def test_index_lookup_by_state_and_area():
+    index = FemaDeclarationIndex(DECLARATIONS)
+    assert len(index) == 3
+    assert [d.disaster_number for d in index.lookup("tn")] == [4810, 4800]
+    assert [d.disaster_number for d in index.lookup("TN", "Davidson")] == [4800]
+    assert [d.disaster_number for d in index.lookup("TN", "Davidson County")] == [4800]
+    assert [d.disaster_number for d in index.lookup("LA", "Orleans Parish")] == [4820]
+    assert index.lookup("TN", "Shelby") == []
+    assert index.lookup("KY") == []
+
+
+def test_summary_is_built_from_records():
+    summary = summarize_fema_declarations(DECLARATIONS + DECLARATIONS[:1], "TN")["summary"]
+    assert summary.count("ID: 4800") == 1
+    assert "- 2025-05-10: FLOODING (Type: Flood, ID: 4810)" in summary
+    assert "No recent FEMA" in summarize_fema_declarations([], "TN")["summary"]
+
+
+def test_scan_bundle_uses_prefetched_index():
+    scanner = DisasterScanner()
+    scanner.fema_index = FemaDeclarationIndex(DECLARATIONS)
+
+    county_hit = scanner.scan_bundle_news({"h3": "a", "state": "Tennessee", "counties": ["Shelby", "Knox"]})
+    assert county_hit["severity"] == 8
+    assert "FLOODING" in county_hit["text"]
+
+    state_fallback = scanner.scan_bundle_news({"h3": "b", "state": "Tennessee", "counties": ["Shelby"]})
+    assert state_fallback["severity"] == 8
+
+    no_data = scanner.scan_bundle_news({"h3": "c", "state": "Kentucky", "counties": []})
+    assert no_data["severity"] == 0
+
+
+def test_records_page_until_enough_distinct_disasters(monkeypatch):
+    from app.chatbot.tools import openfema
+
+    # One disaster declared for 25 counties, then an older one
+    rows = [dict(API_ROWS[1], designatedArea=f"County {i} (County)") for i in range(25)] + [API_ROWS[0]]
+    requests_made = []
+
+    class FakeResponse:
+        def __init__(self, page):
+            self.page = page
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"DisasterDeclarationsSummaries": self.page}
+
+    def fake_get(url, params=None, **kwargs):
+        requests_made.append(params)
+        return FakeResponse(rows[params["$skip"]:params["$skip"] + params["$top"]])
+
+    monkeypatch.setattr(openfema, "http_get", fake_get)
+    records = openfema.get_fema_declaration_records(state="TN", distinct=2)
+
+    assert [r.disaster_number for r in records] == [4810, 4800]
+    assert [p["$skip"] for p in requests_made] == [0, 10, 20]
+    assert requests_made[0]["$select"].split(",") == openfema.DECLARATION_FIELDS
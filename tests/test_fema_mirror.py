@@ -0,0 +1,54 @@
+from app.chatbot.tools import fema_mirror, openfema
+from app.chatbot.tools.openfema import get_fema_declaration_records, get_fema_assistance_data
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def declaration(record_id, number, area, refreshed, date="2099-01-01T00:00:00.000Z"):
+    return {"id": record_id, "disasterNumber": number, "declarationDate": date,
+            "declarationTitle": "FLOODING", "incidentType": "Flood", "state": "TN",
+            "designatedArea": area, "lastRefresh": refreshed}
+
+
+def test_incremental_sync_upserts_and_serves_queries(monkeypatch):
+    pages = [
+        [declaration("a", 4810, "Knox (County)", "2025-05-01T00:00:00.000Z"),
+         declaration("b", 4811, "Davidson (County)", "2025-05-01T00:00:00.000Z")],
+        [declaration("b", 4811, "Davidson (County)", "2025-05-02T00:00:00.000Z", date="2099-02-01T00:00:00.000Z")],
+    ]
+    filters = []
+
+    def fake_get(url, params=None, **kwargs):
+        filters.append(params.get("$filter"))
+        return FakeResponse({"DisasterDeclarationsSummaries": pages.pop(0)})
+
+    monkeypatch.setattr(openfema, "http_get", fake_get)
+    assert fema_mirror.sync_dataset("DisasterDeclarationsSummaries") == 2
+    assert fema_mirror.sync_dataset("DisasterDeclarationsSummaries") == 1
+    assert filters == [None, "lastRefresh gt '2025-05-01T00:00:00.000Z'"]
+
+    df = fema_mirror.load_dataset("DisasterDeclarationsSummaries")
+    assert len(df) == 2
+    assert sorted(df["area_key"]) == ["davidson", "knox"]
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("should be answered from the mirror")
+
+    monkeypatch.setattr(openfema, "http_get", no_network)
+    records = get_fema_declaration_records(state="tn", county="Davidson County")
+    assert [(r.disaster_number, r.declaration_date) for r in records] == [(4811, "2099-02-01")]
+
+
+def test_assistance_falls_back_to_api_without_mirror(monkeypatch):
+    monkeypatch.setattr(openfema, "http_get", lambda url, params=None: FakeResponse({"HousingAssistanceOwners": []}))
+    assert fema_mirror.load_dataset("HousingAssistanceOwners") is None
+    assert "No FEMA housing assistance data" in get_fema_assistance_data("NC")["summary"]
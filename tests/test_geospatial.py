@@ -0,0 +1,19 @@
+import geopandas as gpd
+import h3
+
+from app.prediction import geospatial
+
+
+def test_bundles_from_a_failed_gis_load_are_not_cached(monkeypatch):
+    empty = {"states": gpd.GeoDataFrame(columns=["geometry", "NAME", "STUSPS"]),
+             "counties": gpd.GeoDataFrame(columns=["geometry", "NAME"]),
+             "cities": gpd.GeoDataFrame(columns=["geometry", "NAME"])}
+    monkeypatch.setattr(geospatial, "get_gis_data", lambda: empty)
+
+    def cached(h3_indexes):
+        raise AssertionError("degraded bundles must not reach the disk cache")
+
+    monkeypatch.setattr(geospatial, "_cached_location_bundles", cached)
+    cell = h3.latlng_to_cell(36.16, -86.78, 5)
+    assert geospatial.get_h3_location_bundles([cell]) == [
+        {"h3": cell, "state": "Unknown", "counties": [], "cities": [], "region": "Unknown"}]
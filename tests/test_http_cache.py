@@ -0,0 +1,60 @@
+import requests
+
+from app import transport
+
+FEMA_URL = "https://www.fema.gov/api/open/v2/DisasterDeclarationsSummaries"
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append(headers or {})
+        status, response_headers, body = self.responses.pop(0)
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(response_headers)
+        response._content = body
+        return response
+
+
+def test_fresh_responses_are_served_from_disk(monkeypatch):
+    session = FakeSession([(200, {"Cache-Control": "max-age=600"}, b'{"a": 1}')])
+    monkeypatch.setattr(transport, "get_session", lambda: session)
+
+    assert transport.http_get(FEMA_URL, params={"$top": 1}).json() == {"a": 1}
+    cached = transport.http_get(FEMA_URL, params={"$top": 1})
+    assert cached.json() == {"a": 1}
+    assert cached.from_cache
+    assert len(session.requests) == 1
+
+
+def test_stale_responses_are_revalidated_with_etag(monkeypatch):
+    session = FakeSession([
+        (200, {"ETag": '"v1"', "Cache-Control": "no-cache"}, b'{"a": 1}'),
+        (304, {}, b""),
+        (200, {"ETag": '"v2"', "Cache-Control": "no-cache"}, b'{"a": 2}'),
+    ])
+    monkeypatch.setattr(transport, "get_session", lambda: session)
+
+    assert transport.http_get(FEMA_URL).json() == {"a": 1}
+    assert transport.http_get(FEMA_URL).json() == {"a": 1}
+    assert session.requests[1]["If-None-Match"] == '"v1"'
+    assert transport.http_get(FEMA_URL).json() == {"a": 2}
+
+
+def test_no_store_and_uncached_hosts_always_hit_upstream(monkeypatch):
+    session = FakeSession([
+        (200, {"Cache-Control": "no-store"}, b"1"),
+        (200, {"Cache-Control": "no-store"}, b"2"),
+        (200, {}, b"3"),
+        (200, {}, b"4"),
+    ])
+    monkeypatch.setattr(transport, "get_session", lambda: session)
+
+    assert transport.http_get(FEMA_URL).content == b"1"
+    assert transport.http_get(FEMA_URL).content == b"2"
+    assert transport.http_get("https://example.com/").content == b"3"
+    assert transport.http_get("https://example.com/").content == b"4"
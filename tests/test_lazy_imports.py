@@ -0,0 +1,66 @@
+import ast
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+HEAVY_MODULES = ["torch", "transformers"]
+
+
+def get_main_app_imports():
+    """
+    Returns the app.* modules that Main.py imports at the top level.
+    """
+    with open(os.path.join(PROJECT_ROOT, "Main.py"), "r") as f:
+        tree = ast.parse(f.read())
+
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module and node.module.startswith("app"):
+            modules.append(node.module)
+        elif isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names if alias.name.startswith("app"))
+    return modules
+
+
+def get_loaded_heavy_modules(modules, heavy_modules=HEAVY_MODULES):
+    """
+    Imports the given modules in a fresh interpreter and returns which heavy modules got loaded.
+    """
+    code = (
+        "import sys\n"
+        f"for name in {modules!r}:\n"
+        "    __import__(name)\n"
+        f"print(','.join(m for m in {heavy_modules!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return [m for m in result.stdout.strip().splitlines()[-1].split(",") if m] if result.stdout.strip() else []
+
+
+def test_scanner_import_is_lightweight():
+    assert get_loaded_heavy_modules(["app.prediction.scanner"]) == []
+
+
+def test_home_page_import_graph_is_lightweight():
+    modules = get_main_app_imports()
+    assert "app.prediction.scanner" in modules
+    assert get_loaded_heavy_modules(modules) == []
+
+
+def test_tools_import_without_streamlit():
+    modules = ["app.chatbot.tools.nws_alerts", "app.chatbot.tools.openfema", "app.chatbot.tools.ddg_search",
+               "app.chatbot.tools.nasa_eonet", "app.prediction.geospatial", "app.prediction.scanner"]
+    assert get_loaded_heavy_modules(modules, ["streamlit"]) == []
+
+
+if __name__ == "__main__":
+    test_scanner_import_is_lightweight()
+    test_home_page_import_graph_is_lightweight()
+    print("No heavy imports on the home page import path.")
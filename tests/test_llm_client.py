@@ -0,0 +1,68 @@
+import asyncio
+
+from app.chatbot import llm_client
+from app.chatbot.async_agent import AsyncDisasterAgent
+from app.chatbot.chatbot import DisasterAgent, NOVITA_BASE_URL
+
+
+def test_agents_borrow_one_pooled_client_per_token(monkeypatch):
+    monkeypatch.delenv("REPLAY_MODE", raising=False)
+    first = DisasterAgent(api_token="token-a", tools={"get_rag_context": lambda query: ""})
+    second = DisasterAgent(api_token="token-a", tools={"get_rag_context": lambda query: ""})
+    other = DisasterAgent(api_token="token-b", tools={"get_rag_context": lambda query: ""})
+
+    assert first.client is second.client
+    assert other.client is not first.client
+    # Different tokens still share the connection pool to the same host
+    assert other.client._client is first.client._client
+
+
+def test_replay_mode_gets_its_own_client(monkeypatch):
+    monkeypatch.delenv("REPLAY_MODE", raising=False)
+    live = llm_client.get_llm_client(NOVITA_BASE_URL, "token-a")
+    monkeypatch.setenv("REPLAY_MODE", "replay")
+    assert llm_client.get_llm_client(NOVITA_BASE_URL, "token-a") is not live
+
+
+def test_async_clients_are_kept_per_event_loop(monkeypatch):
+    monkeypatch.delenv("REPLAY_MODE", raising=False)
+    agent = AsyncDisasterAgent(api_token="token-a", tools={"get_rag_context": lambda query: ""})
+
+    async def borrow():
+        return agent.client, agent.client
+
+    first, again = asyncio.run(borrow())
+    second, _ = asyncio.run(borrow())
+    assert first is again
+    assert second is not first
+
+
+def test_registry_keeps_token_digests_and_evicts_least_recently_used(monkeypatch):
+    monkeypatch.delenv("REPLAY_MODE", raising=False)
+    monkeypatch.setattr(llm_client, "MAX_CLIENTS", 2)
+    monkeypatch.setattr(llm_client, "_clients", llm_client.OrderedDict())
+
+    first = llm_client.get_llm_client(NOVITA_BASE_URL, "token-a")
+    llm_client.get_llm_client(NOVITA_BASE_URL, "token-b")
+    assert llm_client.get_llm_client(NOVITA_BASE_URL, "token-a") is first  # Now the most recently used
+    llm_client.get_llm_client(NOVITA_BASE_URL, "token-c")
+
+    assert len(llm_client._clients) == 2
+    assert not any("token-" in part for key in llm_client._clients for part in key if part)
+    assert llm_client.get_llm_client(NOVITA_BASE_URL, "token-a") is first
+    assert llm_client._client_key(NOVITA_BASE_URL, "token-b", llm_client.replay.get_mode()) not in llm_client._clients
+
+
+def test_closing_a_loops_async_clients(monkeypatch):
+    monkeypatch.delenv("REPLAY_MODE", raising=False)
+
+    async def borrow_and_close():
+        client = llm_client.get_async_llm_client(NOVITA_BASE_URL, "token-a")
+        await llm_client.close_async_llm_clients()
+        fresh = llm_client.get_async_llm_client(NOVITA_BASE_URL, "token-a")
+        await llm_client.close_async_llm_clients()
+        return client, fresh
+
+    closed, fresh = asyncio.run(borrow_and_close())
+    assert closed._client.is_closed
+    assert fresh is not closed
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+
+import pandas as pd
+import pytest
+
+from app import memo
+from app.memo import memoize, get_memo_stats
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_results_are_cached_by_arguments_until_ttl(backend, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(memo.time, "time", lambda: now[0])
+    calls = []
+
+    @memoize(ttl=60, backend=backend)
+    def lookup(state, county=None):
+        calls.append((state, county))
+        return {"state": state, "county": county}
+
+    assert lookup("TN", county="Davidson") == {"state": "TN", "county": "Davidson"}
+    assert lookup("TN", county="Davidson") == {"state": "TN", "county": "Davidson"}
+    lookup("TN")
+    assert len(calls) == 2
+
+    now[0] += 61
+    lookup("TN", county="Davidson")
+    assert len(calls) == 3
+
+    name = f"{lookup.__module__}.{lookup.__qualname__}"
+    assert get_memo_stats()[name]["hits"] >= 1
+
+    lookup.cache_clear()
+    lookup("TN")
+    assert len(calls) == 4
+
+
+def test_sqlite_results_survive_a_new_process_backend():
+    calls = []
+
+    @memoize(backend="sqlite")
+    def grid(scan_results_json):
+        calls.append(scan_results_json)
+        return [{"cell": "8226e7fffffffff", "severity": 7}]
+
+    grid("[]")
+    # A restarted server or a separate worker opens the same file again
+    memo._sqlite_backends.clear()
+    assert grid("[]") == [{"cell": "8226e7fffffffff", "severity": 7}]
+    assert len(calls) == 1
+
+
+def test_memory_backend_evicts_least_recently_used():
+    calls = []
+
+    @memoize(maxsize=2)
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    square(1), square(2), square(1), square(3)
+    square(1)
+    square(2)
+    assert calls == [1, 2, 3, 2]
+
+
+def test_unjsonable_arguments_are_hashed_with_pickle():
+    frame = pd.DataFrame({"a": [1, 2]})
+    assert memo.hash_arguments((frame,), {}) == memo.hash_arguments((frame.copy(),), {})
+
+
+def test_coroutine_results_are_cached():
+    calls = []
+
+    @memoize(ttl=60)
+    async def lookup(state):
+        calls.append(state)
+        return {"state": state}
+
+    async def main():
+        return await lookup("TN"), await lookup("TN")
+
+    assert asyncio.run(main()) == ({"state": "TN"}, {"state": "TN"})
+    assert calls == ["TN"]
+
+
+def test_coroutine_sqlite_lookups_run_off_the_event_loop(monkeypatch):
+    threads = []
+    backend = memo.get_sqlite_backend()
+    original_get = backend.get
+
+    def recording_get(key):
+        threads.append(threading.current_thread())
+        return original_get(key)
+
+    monkeypatch.setattr(backend, "get", recording_get)
+
+    @memoize(ttl=60, backend="sqlite")
+    async def lookup(state):
+        return {"state": state}
+
+    assert asyncio.run(lookup("TN")) == {"state": "TN"}
+    assert threads and threading.main_thread() not in threads
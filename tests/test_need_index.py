@@ -0,0 +1,54 @@
+import datetime
+
+import pandas as pd
+
+from app.chatbot.tools.county_need import get_county_need_index
+from app.prediction import need_index
+
+DECLARATIONS = pd.DataFrame([
+    {"disasterNumber": 4830, "declarationDate": "2025-06-02T00:00:00.000Z", "state": "TN",
+     "designatedArea": "Davidson (County)", "fipsStateCode": "47", "fipsCountyCode": "037"},
+    {"disasterNumber": 4830, "declarationDate": "2025-06-02T00:00:00.000Z", "state": "TN",
+     "designatedArea": "Williamson (County)", "fipsStateCode": "47", "fipsCountyCode": "187"},
+    {"disasterNumber": 4100, "declarationDate": "2020-03-05T00:00:00.000Z", "state": "TN",
+     "designatedArea": "Putnam (County)", "fipsStateCode": "47", "fipsCountyCode": "141"},
+])
+
+ASSISTANCE = pd.DataFrame([
+    {"disasterNumber": 4830, "state": "TN", "county": "Davidson (County)", "city": "Nashville", "zipCode": "37206",
+     "validRegistrations": 900, "totalApprovedIhpAmount": 4_000_000.0},
+    {"disasterNumber": 4830, "state": "TN", "county": "Davidson (County)", "city": "Nashville", "zipCode": "37207",
+     "validRegistrations": 100, "totalApprovedIhpAmount": 1_000_000.0},
+    {"disasterNumber": 4830, "state": "TN", "county": "Williamson (County)", "city": "Franklin", "zipCode": "37064",
+     "validRegistrations": 50, "totalApprovedIhpAmount": 200_000.0},
+    # Larger, but five years old
+    {"disasterNumber": 4100, "state": "TN", "county": "Putnam (County)", "city": "Cookeville", "zipCode": "38501",
+     "validRegistrations": 3000, "totalApprovedIhpAmount": 9_000_000.0},
+])
+
+
+def test_need_index_aggregates_by_fips_and_favors_recent_disasters():
+    counties = need_index.build_need_index(ASSISTANCE, DECLARATIONS, today=datetime.date(2025, 7, 1))
+
+    assert list(counties["fips"]) == ["47037", "47141", "47187"]
+    davidson = counties.iloc[0]
+    assert davidson["approved_dollars"] == 5_000_000
+    assert davidson["registrations"] == 1000
+    assert davidson["last_declaration"] == "2025-06-02"
+    assert davidson["need_index"] == 10
+
+
+def test_lookups_read_the_saved_table():
+    need_index.save_need_index(need_index.build_need_index(ASSISTANCE, DECLARATIONS, today=datetime.date(2025, 7, 1)))
+
+    assert need_index.get_county_need(47037)["county"] == "Davidson (County)"
+    assert need_index.get_county_need("99999") is None
+    assert [row["fips"] for row in need_index.top_need_counties("tn", limit=2)] == ["47037", "47141"]
+
+    result = get_county_need_index(state="TN", county="Williamson")
+    assert "FIPS 47187" in result["summary"]
+    assert result["visuals"]["data"][0]["Location"] == "Williamson (County), TN"
+
+
+def test_tool_explains_a_missing_index():
+    assert "has not been built" in get_county_need_index(state="TN")["summary"]
@@ -0,0 +1,49 @@
+import h3
+from shapely.geometry import box
+
+from app.chatbot.tools.nws_snapshot import AlertSnapshot
+from app.prediction import nws_ingest
+
+
+def alert(alert_id, bounds, severity, urgency="Immediate", sent="2025-05-10T12:00:00-05:00"):
+    lon0, lat0, lon1, lat1 = bounds
+    return {
+        "id": alert_id,
+        "geometry": box(lon0, lat0, lon1, lat1).__geo_interface__,
+        "properties": {"event": f"{severity} Alert", "severity": severity, "urgency": urgency,
+                       "areaDesc": "Somewhere", "headline": "Take cover", "sent": sent},
+    }
+
+
+def test_alerts_rasterize_to_cells_with_max_severity(monkeypatch):
+    polyfills = []
+    real_geo_to_cells = h3.geo_to_cells
+    monkeypatch.setattr(nws_ingest.h3, "geo_to_cells", lambda geo, res: polyfills.append(geo) or real_geo_to_cells(geo, res))
+
+    large = alert("a", (-100, 30, -90, 40), "Moderate")
+    small = alert("b", (-95.1, 35, -95, 35.1), "Extreme")
+    snapshot = AlertSnapshot([large, small])
+
+    results = nws_ingest.build_nws_cell_results(snapshot)
+    by_cell = {r["cell"]: r for r in results}
+    assert len(by_cell) == len(results) > 1
+    small_cell = h3.latlng_to_cell(35.05, -95.05, nws_ingest.HEATMAP_RESOLUTION)
+    assert by_cell[small_cell]["severity"] == 10
+    assert all(r["severity"] == 5 for cell, r in by_cell.items() if cell != small_cell)
+    assert all(r["source"] == "NWS" for r in results)
+
+    # Unchanged alerts are not polyfilled again; expired ones are forgotten
+    nws_ingest.build_nws_cell_results(AlertSnapshot([large]))
+    assert len(polyfills) == 2
+    assert set(nws_ingest._polyfill_cache) == {"a"}
+
+
+def test_score_and_merge():
+    assert nws_ingest.score_alert({"severity": "Severe", "urgency": "Future"}) == 6
+    assert nws_ingest.score_alert({}) == 1
+
+    fema = {"severity": 4, "cell": "822647fffffffff", "text": "FLOODING"}
+    old_nws = {"severity": 8, "cell": "822647fffffffff", "source": "NWS"}
+    new_nws = {"severity": 5, "cell": "82264ffffffffff", "source": "NWS"}
+    assert nws_ingest.merge_nws_results([fema, old_nws], [new_nws]) == [fema, new_nws]
+    assert nws_ingest.merge_nws_results([fema, old_nws], None) == [fema, old_nws]
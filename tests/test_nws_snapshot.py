@@ -0,0 +1,105 @@
+import asyncio
+import threading
+
+import h3
+
+from app.chatbot.tools import nws_snapshot
+
+ZONE_URL = "https://api.weather.gov/zones/forecast/TNZ027"
+
+
+def square(lon, lat, size=0.5):
+    return {"type": "Polygon", "coordinates": [[
+        [lon, lat], [lon + size, lat], [lon + size, lat + size], [lon, lat + size], [lon, lat]]]}
+
+
+FEATURES = [
+    {"geometry": square(-87, 36), "properties": {"event": "Flood Warning"}},
+    {"geometry": None, "properties": {"event": "Heat Advisory", "affectedZones": [ZONE_URL]}},
+    {"geometry": None, "properties": {"event": "Marine Warning", "affectedZones": []}},
+]
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def test_snapshot_resolves_zones_and_answers_locally(monkeypatch):
+    requested = []
+
+    def fake_get(url, **kwargs):
+        requested.append(url)
+        if url == ZONE_URL:
+            return FakeResponse({"geometry": square(-86.8, 36.1)})
+        return FakeResponse({"features": FEATURES})
+
+    monkeypatch.setattr(nws_snapshot, "http_get", fake_get)
+    snapshot = nws_snapshot.get_alert_snapshot()
+    assert nws_snapshot.get_alert_snapshot() is snapshot
+    assert sorted(requested) == [nws_snapshot.ACTIVE_ALERTS_URL, ZONE_URL]
+    assert snapshot.unlocated == 1
+
+    def events(alerts):
+        return [a["properties"]["event"] for a in alerts]
+
+    assert events(snapshot.alerts_at(36.2, -86.7)) == ["Flood Warning", "Heat Advisory"]
+    nashville, chicago = snapshot.alerts_at_points([(36.05, -86.95), (41.9, -87.6)])
+    assert events(nashville) == ["Flood Warning"]
+    assert chicago == []
+    assert events(snapshot.alerts_in_cell(h3.latlng_to_cell(36.25, -86.75, 5))) == ["Flood Warning", "Heat Advisory"]
+
+
+def test_stale_snapshot_is_served_when_refresh_fails(monkeypatch):
+    monkeypatch.setattr(nws_snapshot, "_snapshot", nws_snapshot.AlertSnapshot(FEATURES[:1], fetched_at=1))
+
+    def failing_get(url, **kwargs):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(nws_snapshot, "http_get", failing_get)
+    assert len(nws_snapshot.get_alert_snapshot().alerts_at(36.2, -86.7)) == 1
+
+
+def test_concurrent_async_refreshes_load_one_snapshot(monkeypatch):
+    loads = []
+
+    async def fake_load():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return nws_snapshot.AlertSnapshot(FEATURES[:1])
+
+    monkeypatch.setattr(nws_snapshot, "load_alert_snapshot_async", fake_load)
+
+    async def main():
+        return await asyncio.gather(*(nws_snapshot.get_alert_snapshot_async() for _ in range(5)))
+
+    snapshots = asyncio.run(main())
+    assert len(loads) == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+
+
+def test_peek_never_waits_and_refreshes_in_the_background(monkeypatch):
+    release = threading.Event()
+    loads = []
+
+    def slow_load():
+        loads.append(1)
+        release.wait(5)
+        return nws_snapshot.AlertSnapshot(FEATURES[:1])
+
+    monkeypatch.setattr(nws_snapshot, "load_alert_snapshot", slow_load)
+    monkeypatch.setattr(nws_snapshot, "_refresh_thread", None)
+
+    assert nws_snapshot.peek_alert_snapshot() is None
+    assert nws_snapshot.peek_alert_snapshot() is None  # The running refresh is not started twice
+    release.set()
+    nws_snapshot._refresh_thread.join(5)
+
+    assert nws_snapshot.peek_alert_snapshot() is nws_snapshot._snapshot is not None
+    assert len(loads) == 1
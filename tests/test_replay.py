@@ -0,0 +1,82 @@
+import os
+import time
+
+import pytest
+
+from app import replay, transport
+from app.chatbot.bounty_generator import DisasterBountyGenerator
+from app.chatbot.chatbot import DisasterAgent
+from app.chatbot.tools.ddg_search import get_news_search
+from app.chatbot.tools.eonet_store import get_eonet_events, events_for_map
+from app.chatbot.tools.nws_alerts import get_nws_alerts
+from app.chatbot.tools.nws_snapshot import get_alert_snapshot
+from app.chatbot.tools.openfema import fetch_national_fema_declarations, get_fema_disaster_declarations
+from app.prediction.nws_ingest import build_nws_cell_results
+from app.prediction.scan_planner import GENERAL_SCAN_QUERY
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "replay")
+
+
+@pytest.fixture
+def replaying(monkeypatch):
+    monkeypatch.setenv("REPLAY_MODE", "replay")
+    monkeypatch.setenv("REPLAY_DIR", FIXTURE_DIR)
+
+    def no_network():
+        raise AssertionError("replay mode must not open connections")
+
+    monkeypatch.setattr(transport, "get_session", no_network)
+
+
+def test_scan_upstreams_replay_offline(replaying):
+    assert len(fetch_national_fema_declarations(days=30)) == 5
+
+    snapshot = get_alert_snapshot()
+    assert snapshot.unlocated == 0  # the zone-only advisory is placed through its zone fixture
+    assert {r["severity"] for r in build_nws_cell_results(snapshot)} == {8}
+
+    assert [e["location"] for e in events_for_map(get_eonet_events("open"))][0].startswith("Synthetic Wildfire")
+    assert "Red Cross opens shelters" in get_news_search(GENERAL_SCAN_QUERY)
+
+
+def test_chat_sessions_replay_offline(replaying):
+    tools = {
+        "get_nws_alerts": get_nws_alerts,
+        "get_fema_disaster_declarations": get_fema_disaster_declarations,
+        "get_news_search": get_news_search,
+    }
+    agent = DisasterAgent(tools=dict(tools))
+
+    answer = agent.get_response("Are there any weather alerts for Nashville (36.16, -86.78)?", return_raw=True)
+    assert "Flash Flood Warning" in answer["text"]
+    assert answer["visuals"][0]["type"] == "map"
+    assert "disaster 4830" in agent.get_response("What FEMA disasters were declared in Tennessee recently?")
+    streamed = "".join(agent.get_response_stream("What is the latest news on floods in Tennessee?"))
+    assert streamed.startswith("Flooding has closed roads")
+
+    bounties = DisasterBountyGenerator().generate_bounties("47037", "I can drive and lift heavy boxes.", "Davidson County, TN")
+    assert [b["urgency"] for b in bounties] == [8]
+
+
+def test_replay_latency_and_missing_fixtures(replaying, monkeypatch):
+    monkeypatch.setenv("REPLAY_LATENCY", "0.05")
+    start = time.perf_counter()
+    fetch_national_fema_declarations(days=30)
+    assert time.perf_counter() - start >= 0.05
+
+    with pytest.raises(replay.MissingFixtureError):
+        transport.http_get("https://api.weather.gov/alerts/active", params={"area": "XX"})
+
+
+def test_record_then_replay_roundtrip(tmp_path, monkeypatch):
+    monkeypatch.setenv("REPLAY_DIR", str(tmp_path))
+    monkeypatch.setenv("REPLAY_MODE", "record")
+    monkeypatch.setattr(replay, "get_latency", lambda: 0)
+
+    assert replay.replay_call("ddg", {"query": "floods"}, lambda: [{"title": "recorded"}]) == [{"title": "recorded"}]
+
+    monkeypatch.setenv("REPLAY_MODE", "replay")
+    assert replay.replay_call("ddg", {"query": "floods"}, lambda: pytest.fail("should replay")) == [{"title": "recorded"}]
+    # Dates are masked, so a date filter computed on another day still matches
+    assert replay.request_key("GET", "https://x.gov/a?f=ge+'2025-01-01T00:00:00.000Z'&b=1") == \
+        replay.request_key("GET", "https://x.gov/a?b=1&f=ge+'2026-03-04T00:00:00.000Z'")
@@ -0,0 +1,135 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+import requests
+
+from app import resilience, transport
+from app.resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, budget_timeout, deadline
+
+FEMA_URL = "https://www.fema.gov/api/open/v2/DisasterDeclarationsSummaries"
+
+
+def test_breaker_opens_after_threshold_and_probes_after_reset(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("example.org", failure_threshold=2, reset_timeout=30)
+
+    def fail():
+        raise requests.ConnectionError("down")
+
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            breaker.call(fail)
+    assert breaker.state == resilience.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "never called")
+
+    # After the reset timeout exactly one probe goes out; a failed probe reopens the breaker
+    now[0] += 30
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == resilience.OPEN
+
+    now[0] += 30
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == resilience.CLOSED
+    assert breaker.failures == 0
+
+
+def test_exceptions_outside_failures_do_not_count():
+    breaker = CircuitBreaker("example.org", failure_threshold=1)
+
+    def no_results():
+        raise ValueError("No results found")
+
+    with pytest.raises(ValueError):
+        breaker.call(no_results, failures=(requests.ConnectionError,))
+    assert breaker.state == resilience.CLOSED
+
+
+def test_uncounted_exceptions_leave_failures_and_half_open_state_alone(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("example.org", failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    now[0] += 30
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    # A probe that neither succeeds nor fails keeps the breaker half-open and frees the probe slot
+    with pytest.raises(KeyboardInterrupt):
+        breaker.call(interrupted, failures=(requests.ConnectionError,))
+    assert breaker.state == resilience.HALF_OPEN
+    assert breaker.failures == 1
+    assert breaker.call(lambda: "ok") == "ok"
+
+
+def test_async_budget_running_out_does_not_count_against_the_host(monkeypatch):
+    def handler(request):
+        time.sleep(0.1)
+        return httpx.Response(503)
+
+    monkeypatch.setattr(transport, "RETRY_BACKOFF", 0)
+    monkeypatch.setattr(transport.httpx, "AsyncHTTPTransport", lambda retries: httpx.MockTransport(handler))
+
+    async def fetch():
+        try:
+            with deadline(0.05):
+                await transport.async_http_get(FEMA_URL, use_cache=False)
+        finally:
+            await transport.close_async_client()
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(fetch())
+    assert resilience.get_circuit_breaker("www.fema.gov").failures == 0
+
+
+def test_budget_caps_timeouts_and_raises_when_spent(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    assert budget_timeout(15) == 15
+
+    with deadline(10):
+        assert budget_timeout(15) == 10
+        assert budget_timeout(5) == 5
+        with deadline(60):
+            # Inner budgets can't extend the outer one
+            assert budget_timeout(15) == 10
+        now[0] += 10
+        with pytest.raises(DeadlineExceeded):
+            budget_timeout(15)
+    assert resilience.remaining_time() is None
+
+
+class FlakySession:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls += 1
+        if self.calls > 1:
+            raise requests.ConnectionError("upstream down")
+        response = requests.Response()
+        response.status_code = 200
+        response.headers.update({"Cache-Control": "no-cache"})
+        response._content = b'{"a": 1}'
+        return response
+
+
+def test_open_circuit_serves_stale_cache_without_calling_upstream(monkeypatch):
+    session = FlakySession()
+    monkeypatch.setattr(transport, "get_session", lambda: session)
+
+    assert transport.http_get(FEMA_URL).json() == {"a": 1}
+    for _ in range(resilience.FAILURE_THRESHOLD):
+        assert transport.http_get(FEMA_URL).json() == {"a": 1}
+    assert resilience.get_circuit_states()["www.fema.gov"]["state"] == resilience.OPEN
+
+    calls = session.calls
+    assert transport.http_get(FEMA_URL).json() == {"a": 1}
+    assert session.calls == calls
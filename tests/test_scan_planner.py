@@ -0,0 +1,39 @@
+from app.chatbot.tools.openfema import FemaDeclaration
+from app.prediction.scan_planner import build_scan_plan, ScanPlanRunner
+from app.prediction.scanner import DisasterScanner
+
+FLOOD = FemaDeclaration(4810, "2025-05-10", "FLOODING", "Flood", "TN", "Knox (County)")
+
+
+class CountingScanner(DisasterScanner):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def find_declarations(self, state_abbr, county=None):
+        self.calls.append((state_abbr, county))
+        return [FLOOD] if county == "Knox" else []
+
+
+def test_plan_groups_identical_lookups_and_reports_savings():
+    bundles = [
+        {"h3": "a", "state": "Tennessee", "counties": ["Knox"]},
+        {"h3": "b", "state": "Tennessee", "counties": ["Knox"]},
+        {"h3": "c", "state": "Tennessee", "counties": ["Shelby"]},
+        {"h3": "d", "state": "Tennessee", "counties": ["Shelby"]},
+        {"h3": "e", "state": "Unknown", "counties": []},
+    ]
+    plan = build_scan_plan(bundles)
+    assert len(plan) == 3
+
+    scanner = CountingScanner()
+    runner = ScanPlanRunner(scanner)
+    results = [res for group in plan for res in runner.run_group(group)]
+
+    assert sorted(res["cell"] for res in results) == ["a", "b", "c", "d", "e"]
+    assert {res["cell"]: res["severity"] for res in results}["b"] == 8
+    assert sorted(scanner.calls, key=str) == [("TN", "Knox"), ("TN", "Shelby"), ("TN", None)]
+    # a, b: 1 lookup each; c, d: county + statewide each; e: none
+    assert runner.naive_queries == 6
+    assert runner.queries_run == 3
+    assert runner.queries_saved == 3
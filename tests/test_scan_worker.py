@@ -0,0 +1,47 @@
+import pytest
+
+import app.prediction.scan_worker as scan_worker
+from app.common import load_scan_cache
+
+
+class FakeScanner:
+    def prefetch_fema(self, days=30):
+        return None
+
+
+def test_worker_resumes_from_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scan_worker, "CHECKPOINT_EVERY", 1)
+    monkeypatch.setattr(scan_worker, "DisasterScanner", FakeScanner)
+    monkeypatch.setattr(scan_worker, "get_nws_cell_results", lambda: None)
+    monkeypatch.setattr(scan_worker, "build_scan_queries",
+                        lambda: [{"type": "general", "query": f"q{i}"} for i in range(4)])
+
+    ran = []
+
+    def crash_on_third(q_item, scanner, plan_runner):
+        if q_item["query"] == "q2":
+            raise RuntimeError("worker killed")
+        ran.append(q_item["query"])
+        return [{"cell": q_item["query"], "severity": 5}]
+
+    monkeypatch.setattr(scan_worker, "run_scan_query", crash_on_third)
+    with pytest.raises(RuntimeError):
+        scan_worker.run_scan(force=True)
+
+    status = scan_worker.get_worker_status()
+    assert status["index"] == 2 and status["total"] == 4
+    assert load_scan_cache()["last_scan_time"] is None
+
+    def succeed(q_item, scanner, plan_runner):
+        ran.append(q_item["query"])
+        return [{"cell": q_item["query"], "severity": 5}]
+
+    monkeypatch.setattr(scan_worker, "run_scan_query", succeed)
+    assert scan_worker.run_scan(force=True)
+
+    assert ran == ["q0", "q1", "q2", "q3"]
+    cache = load_scan_cache()
+    assert sorted(r["cell"] for r in cache["scan_results"]) == ["q0", "q1", "q2", "q3"]
+    assert scan_worker.get_worker_status() is None
+    assert not scan_worker.run_scan()
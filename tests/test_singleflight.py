@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+
+from app.singleflight import SingleFlight, coalesce, get_coalescing_stats
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for coalesced callers"
+        time.sleep(0.005)
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    release = threading.Event()
+    executions = []
+
+    @coalesce
+    def slow_lookup(state, days=30):
+        executions.append(state)
+        release.wait(5)
+        return {"summary": f"{state} {days}"}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow_lookup("TN", days=30))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    # Wait until the four followers are parked on the leader's call
+    name = f"{__name__}.{slow_lookup.__qualname__}"
+    wait_until(lambda: get_coalescing_stats().get(name, {}).get("coalesced", 0) >= 4)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert executions == ["TN"]
+    assert results == [{"summary": "TN 30"}] * 5
+    assert get_coalescing_stats()[name] == {"calls": 5, "coalesced": 4}
+
+    # Once finished, the next call runs again (no caching)
+    slow_lookup("TN", days=30)
+    assert executions == ["TN", "TN"]
+
+
+def test_followers_receive_the_leaders_exception():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("upstream down")
+
+    def call():
+        try:
+            flights.do("f", ("f",), failing)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    wait_until(lambda: flights.stats().get("f", {}).get("coalesced", 0) >= 1)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2 and errors[0] is errors[1]
+
+
+def test_concurrent_awaits_share_one_execution():
+    executions = []
+
+    @coalesce
+    async def slow_lookup(state):
+        executions.append(state)
+        await asyncio.sleep(0.01)
+        return {"summary": state}
+
+    async def main():
+        return await asyncio.gather(*(slow_lookup("TN") for _ in range(5)), slow_lookup("KY"))
+
+    results = asyncio.run(main())
+    assert sorted(executions) == ["KY", "TN"]
+    assert results == [{"summary": "TN"}] * 5 + [{"summary": "KY"}]
+    assert get_coalescing_stats()[f"{__name__}.{slow_lookup.__qualname__}"] == {"calls": 6, "coalesced": 4}
+
+
+def test_cancelling_the_first_caller_leaves_the_shared_call_running():
+    @coalesce
+    async def slow_lookup(state):
+        await asyncio.sleep(0.05)
+        return {"summary": state}
+
+    async def main():
+        leader = asyncio.create_task(slow_lookup("TN"))
+        follower = asyncio.create_task(slow_lookup("TN"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return leader, await follower
+
+    leader, result = asyncio.run(main())
+    assert leader.cancelled()
+    assert result == {"summary": "TN"}
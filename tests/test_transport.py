@@ -0,0 +1,46 @@
+from app import transport
+from app.resilience import deadline
+
+
+def test_session_is_shared_and_pooled():
+    session = transport.get_session()
+    assert transport.get_session() is session
+
+    adapter = session.get_adapter("https://www.fema.gov/api/open/v2/DisasterDeclarationsSummaries")
+    assert adapter._pool_maxsize == transport.POOL_MAXSIZE_PER_HOST
+    assert adapter._pool_block
+    assert 429 in adapter.max_retries.status_forcelist
+    assert "gzip" in session.headers["Accept-Encoding"]
+
+
+def test_per_host_timeouts():
+    assert transport.get_timeout("https://api.weather.gov/alerts/active") == transport.HOST_TIMEOUTS["api.weather.gov"]
+    assert transport.get_timeout("https://example.com/") == transport.DEFAULT_TIMEOUT
+
+
+def test_calls_under_a_deadline_skip_adapter_retries(monkeypatch):
+    session = transport.get_session(retries=False)
+    assert transport.get_session(retries=False) is session
+    assert session.get_adapter("https://www.fema.gov/").max_retries.total == 0
+
+    used = []
+
+    class FailingSession:
+        def get(self, url, params=None, headers=None, timeout=None):
+            raise transport.requests.ConnectionError("upstream down")
+
+    def get_session(retries=True):
+        used.append(retries)
+        return FailingSession()
+
+    monkeypatch.setattr(transport, "get_session", get_session)
+    def fetch():
+        try:
+            transport.http_get("https://www.fema.gov/api/open/v2/x", use_cache=False)
+        except transport.requests.ConnectionError:
+            pass
+
+    fetch()
+    with deadline(5):
+        fetch()
+    assert used == [True, False]